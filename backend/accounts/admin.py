@@ -3,6 +3,7 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from .models import User
 from api.models import UserSubscription # Import from the 'api' app
+from api.admin_pagination import LargeTableAdminMixin, shop_filter_link
 
 # PhoneVerification admin removed
 
@@ -21,13 +22,15 @@ class UserSubscriptionInline(admin.StackedInline):
 
 # 2. Define a new UserAdmin
 @admin.register(User)
-class UserAdmin(BaseUserAdmin):
+class UserAdmin(LargeTableAdminMixin, BaseUserAdmin):
     # Add the subscription inline
     inlines = (UserSubscriptionInline,)
     
     # Show 'role' and 'shop' in the main user list
-    list_display = ('email', 'username', 'shop', 'role', 'is_staff', 'is_active')
-    list_filter = ('role', 'is_staff', 'is_active', 'shop')
+    list_display = ('email', 'username', shop_filter_link, 'role', 'is_staff', 'is_active')
+    list_filter = ('role', 'is_staff', 'is_active')
+    list_select_related = ('shop',)
+    autocomplete_fields = ('shop',)
     
     # Configure the fields shown in the user's detail page
     fieldsets = (
@@ -38,7 +41,7 @@ class UserAdmin(BaseUserAdmin):
         ('Permissions', {'fields': ('is_active', 'is_staff', 'is_superuser', 'groups', 'user_permissions')}),
         ('Important dates', {'fields': ('last_login', 'date_joined')}),
     )
-    search_fields = ('email', 'username', 'shop__name')
+    search_fields = ('^email', 'username')
     ordering = ('email',)
 
 # We no longer need the old loop, this is much better.
\ No newline at end of file
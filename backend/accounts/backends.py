@@ -7,6 +7,9 @@ from django.contrib.auth.backends import ModelBackend
 class EmailBackend(ModelBackend):
     def authenticate(self, request, username=None, password=None, **kwargs):
         UserModel = get_user_model()
+        if username is None:
+            # The JWT login serializer passes the USERNAME_FIELD (email) by name
+            username = kwargs.get(UserModel.USERNAME_FIELD)
 
         user = None
 
@@ -26,6 +29,9 @@ class EmailBackend(ModelBackend):
                 pass
 
         if user is None:
+            # Hash anyway so response time does not reveal unknown accounts
+            # (same as ModelBackend, which is no longer in the chain)
+            UserModel().set_password(password)
             return None
 
         if user.check_password(password) and self.user_can_authenticate(user):
@@ -0,0 +1,17 @@
+# backend/accounts/hashers.py
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """
+    Argon2id with cost parameters from settings (ARGON2_*).
+
+    Django's defaults (100 MiB, parallelism 8) are sized for a dedicated
+    box; a login burst on small sync workers needs a cheaper hash. Hashes
+    made with other parameters still verify and are re-hashed with these on
+    the next successful login (must_update compares the parameters).
+    """
+    time_cost = settings.ARGON2_TIME_COST
+    memory_cost = settings.ARGON2_MEMORY_COST
+    parallelism = settings.ARGON2_PARALLELISM
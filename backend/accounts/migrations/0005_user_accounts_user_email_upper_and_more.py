@@ -0,0 +1,24 @@
+# Generated by Django 6.0.3 on 2026-10-19 15:31
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_backfill_email_from_username'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('shops', '0008_shop_counter_quotation'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(django.db.models.functions.text.Upper('email'), name='accounts_user_email_upper'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(django.db.models.functions.text.Upper('username'), name='accounts_user_username_upper'),
+        ),
+    ]
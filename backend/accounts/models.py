@@ -2,6 +2,7 @@
 
 from django.contrib.auth.models import AbstractUser, UserManager
 from django.db import models
+from django.db.models.functions import Upper
 
 class CustomUserManager(UserManager):
     def get_by_natural_key(self, username):
@@ -36,6 +37,14 @@ class User(AbstractUser):
 
     objects = CustomUserManager() # Use the custom manager
 
+    class Meta(AbstractUser.Meta):
+        # email__iexact / username__iexact compile to UPPER(col) = UPPER(%s) on
+        # PostgreSQL, which the plain unique index on email cannot serve
+        indexes = [
+            models.Index(Upper('email'), name='accounts_user_email_upper'),
+            models.Index(Upper('username'), name='accounts_user_username_upper'),
+        ]
+
     def __str__(self):
         return f"{self.email} ({self.role})"
 
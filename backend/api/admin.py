@@ -1,6 +1,9 @@
 # backend/api/admin.py
 from django.contrib import admin
-from .models import SubscriptionPlan # Removed UserSubscription
+from django.utils import timezone
+
+from .admin_pagination import LargeTableAdminMixin
+from .models import SubscriptionPlan, WebhookEvent # Removed UserSubscription
 
 # This admin is great, keep it.
 @admin.register(SubscriptionPlan)
@@ -11,4 +14,25 @@ class SubscriptionPlanAdmin(admin.ModelAdmin):
     search_fields = ("name",)
 
 # We remove UserSubscriptionAdmin because it's
-# already an inline on the User page, which is better.
\ No newline at end of file
+# already an inline on the User page, which is better.
+
+
+@admin.register(WebhookEvent)
+class WebhookEventAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    """The Razorpay inbox; events are applied by manage.py process_webhooks."""
+    list_display = ("received_at", "event", "order_id", "status", "attempts", "next_attempt_at")
+    list_filter = ("status", "event")
+    search_fields = ("=event_id", "=order_id")
+    readonly_fields = [f.name for f in WebhookEvent._meta.fields]
+    ordering = ("-id",)
+    actions = ["retry_now"]
+
+    @admin.action(description="Retry now")
+    def retry_now(self, request, queryset):
+        updated = queryset.exclude(status="PROCESSED").update(
+            status="PENDING", attempts=0, next_attempt_at=timezone.now(),
+        )
+        self.message_user(request, f"{updated} events queued for the next worker run.")
+
+    def has_add_permission(self, request):
+        return False
@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class ApiConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'api'
+
+    def ready(self):
+        from . import versioning  # noqa: F401  (connects the version-bump receivers)
+        from . import tokens  # noqa: F401  (caches blacklisted refresh tokens)
+        from . import availability  # noqa: F401  (drops cached signup availability)
@@ -3,8 +3,9 @@ import json
 from datetime import timedelta
 from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 from rest_framework_simplejwt.views import TokenObtainPairView
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
 from rest_framework.response import Response
 from rest_framework import permissions, status
 from rest_framework.decorators import api_view, permission_classes
@@ -12,9 +13,13 @@ from rest_framework.views import APIView
 from rest_framework.throttling import AnonRateThrottle
 from rest_framework_simplejwt.token_blacklist.models import OutstandingToken, BlacklistedToken
 from api.throttles import LoginThrottle
+from api.tokens import CachedRefreshToken, mark_blacklisted
 
 User = get_user_model()
 
+# Refresh tokens (logged-in devices) a user may hold at once
+MAX_ACTIVE_SESSIONS = 3
+
 
 class CookieTokenObtainPairView(TokenObtainPairView):
     """
@@ -31,49 +36,54 @@ class CookieTokenObtainPairView(TokenObtainPairView):
         return super().finalize_response(request, response, *args, **kwargs)
 
     def post(self, request, *args, **kwargs):
-        # 1. Standard login logic
-        resp = super().post(request, *args, **kwargs)
-        
-        # 2. Extract tokens
-        refresh = resp.data.get("refresh")
-        access = resp.data.get("access")
-        if refresh:
-            serializer = self.get_serializer(data=request.data)
+        # 1. Authenticate once — the serializer already holds the user and tokens
+        serializer = self.get_serializer(data=request.data)
+        try:
             serializer.is_valid(raise_exception=True)
-            user = serializer.user
-            
-            # --- Enforce 3 Device Limit (Active Refresh Tokens) ---
-            # Get all tokens for this user that are NOT blacklisted
-            active_tokens = OutstandingToken.objects.filter(
-                user=user
-            ).exclude(
-                id__in=BlacklistedToken.objects.values_list('token_id', flat=True)
-            ).order_by('created_at')
-            
-            # If they have more than 3, blacklist the oldest ones
-            # (We check > 2 because 'refresh' hasn't been added to OutstandingToken yet usually, 
-            # or it might have just been added. Standard practice is to limit to 3 total.)
-            # Just to be safe and accurate, let's keep it to 3 tokens max.
-            token_count = active_tokens.count()
-            if token_count > 3:
-                # Blacklist the oldest tokens to bring count down to 3
-                tokens_to_kill = active_tokens[:(token_count - 3)]
-                for tk in tokens_to_kill:
-                    BlacklistedToken.objects.get_or_create(token=tk)
-            # --------------------------------------------------------
-
-            response = Response({"access": access}, status=status.HTTP_200_OK)
-            max_age = int(settings.SIMPLE_JWT.get("REFRESH_TOKEN_LIFETIME", timedelta(days=7)).total_seconds())
-            response.set_cookie(
-                key="refresh_token",
-                value=refresh,
-                httponly=True,
-                secure=not settings.DEBUG,
-                samesite="Lax",
-                max_age=max_age,
-            )
-            return response
-        return resp
+        except TokenError as e:
+            raise InvalidToken(e.args[0])
+
+        refresh = serializer.validated_data.get("refresh")
+        access = serializer.validated_data.get("access")
+
+        # 2. Enforce the device limit (the new refresh token is already outstanding)
+        enforce_device_limit(serializer.user)
+
+        response = Response({"access": access}, status=status.HTTP_200_OK)
+        max_age = int(settings.SIMPLE_JWT.get("REFRESH_TOKEN_LIFETIME", timedelta(days=7)).total_seconds())
+        response.set_cookie(
+            key="refresh_token",
+            value=refresh,
+            httponly=True,
+            secure=not settings.DEBUG,
+            samesite="Lax",
+            max_age=max_age,
+        )
+        return response
+
+
+def enforce_device_limit(user, limit=MAX_ACTIVE_SESSIONS):
+    """
+    Blacklists every unexpired, non-blacklisted refresh token of `user`
+    except the newest `limit`: one SELECT on (user, created_at) and one
+    multi-row INSERT. Returns the number of tokens blacklisted.
+    """
+    stale = list(
+        OutstandingToken.objects.filter(
+            user=user,
+            expires_at__gt=timezone.now(),
+            blacklistedtoken__isnull=True,
+        ).order_by('-created_at', '-id').values_list('id', 'jti', 'expires_at')[limit:]
+    )
+    if stale:
+        # ignore_conflicts: a concurrent login or logout may blacklist the same token
+        BlacklistedToken.objects.bulk_create(
+            [BlacklistedToken(token_id=token_id) for token_id, _, _ in stale],
+            ignore_conflicts=True,
+        )
+        # bulk_create sends no post_save, so update the blacklist cache here
+        mark_blacklisted((jti, expires_at) for _, jti, expires_at in stale)
+    return len(stale)
 
 
 class CookieTokenRefreshView(APIView):
@@ -94,7 +104,7 @@ class CookieTokenRefreshView(APIView):
             return Response({"detail": "Refresh token not provided."}, status=status.HTTP_401_UNAUTHORIZED)
 
         try:
-            token = RefreshToken(refresh_token)
+            token = CachedRefreshToken(refresh_token)
             new_access = str(token.access_token)
 
             # Optionally rotate refresh tokens
@@ -111,7 +121,7 @@ class CookieTokenRefreshView(APIView):
                 user = User.objects.filter(pk=user_id).first()
                 if not user:
                     return Response({"detail": "User not found."}, status=status.HTTP_401_UNAUTHORIZED)
-                new_refresh = RefreshToken.for_user(user)
+                new_refresh = CachedRefreshToken.for_user(user)
                 response = Response({"access": new_access}, status=status.HTTP_200_OK)
                 max_age = int(settings.SIMPLE_JWT.get("REFRESH_TOKEN_LIFETIME", timedelta(days=7)).total_seconds())
                 response.set_cookie(
@@ -142,7 +152,7 @@ def logout_view(request):
         return resp
 
     try:
-        token = RefreshToken(refresh_token)
+        token = CachedRefreshToken(refresh_token)
         token.blacklist()
     except Exception:
         pass
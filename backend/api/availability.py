@@ -0,0 +1,71 @@
+# backend/api/availability.py
+"""
+Signup-form availability checks for email and mobile.
+
+"Available" answers are cached for AVAILABILITY_TIMEOUT seconds: the form
+asks again on every keystroke and almost every answer is "available".
+"Taken" is never cached — it is one indexed lookup, and a cached "taken"
+would outlive a deleted account. Saving a user or shop drops the cached
+answer for its email / phone, so new signups show up immediately.
+"""
+import hashlib
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from shops.models import Shop
+
+AVAILABILITY_TIMEOUT = 60
+
+User = get_user_model()
+
+
+def _key(kind, value):
+    digest = hashlib.sha1(value.strip().lower().encode()).hexdigest()
+    return f"avail_{kind}_{digest}"
+
+
+def _is_taken(kind, value, exists):
+    key = _key(kind, value)
+    try:
+        if cache.get(key):
+            return False
+    except Exception:
+        pass
+    if exists():
+        return True
+    try:
+        cache.set(key, True, timeout=AVAILABILITY_TIMEOUT)
+    except Exception:
+        pass
+    return False
+
+
+def email_taken(email):
+    # iexact is UPPER(email) = UPPER(%s) on PostgreSQL — served by accounts_user_email_upper
+    return _is_taken("email", email, lambda: User.objects.filter(email__iexact=email).exists())
+
+
+def mobile_taken(mobile):
+    return _is_taken("mobile", mobile, lambda: Shop.objects.filter(contact_phone=mobile).exists())
+
+
+def _forget(kind, value):
+    if value:
+        try:
+            cache.delete(_key(kind, value))
+        except Exception:
+            pass
+
+
+# ========== SIGNAL RECEIVERS ==========
+@receiver(post_save, sender=User)
+def forget_user_email(sender, instance, **kwargs):
+    _forget("email", instance.email)
+
+
+@receiver(post_save, sender=Shop)
+def forget_shop_phone(sender, instance, **kwargs):
+    _forget("mobile", instance.contact_phone)
@@ -0,0 +1,68 @@
+# backend/api/conditional.py
+"""
+Conditional GET for read-heavy endpoints.
+
+ETag and Last-Modified come from api.versioning counters only, so a 304
+costs one cache round trip — no queries, no serialization. Responses are
+marked `private, no-cache`: browsers may keep them but must revalidate.
+"""
+import hashlib
+import time
+
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+
+from .versioning import get_versions
+
+
+def conditional_response(request, version_keys, build, extra=()):
+    """
+    Returns a 304 when the client's validators still match, otherwise
+    `build()` with ETag / Last-Modified / Cache-Control set.
+    `extra` adds values that change the payload without a version bump
+    (e.g. a time bucket); such responses carry no Last-Modified, since the
+    versions alone no longer date them.
+    """
+    versions = get_versions(*version_keys)
+    seed = "|".join([request.get_full_path(), *map(str, versions), *map(str, extra)])
+    etag = quote_etag(hashlib.md5(seed.encode()).hexdigest())
+    last_modified = max(versions) // 1_000_000 if versions and not extra else None
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is None:
+        response = build()
+        if response.status_code != 200:
+            return response
+    else:
+        response = not_modified
+
+    response["ETag"] = etag
+    if last_modified:
+        response["Last-Modified"] = http_date(last_modified)
+    response["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def hour_bucket():
+    """`extra` value for payloads that depend on the clock (days remaining etc.)."""
+    return int(time.time() // 3600)
+
+
+class ConditionalGetMixin:
+    """
+    For viewsets: list() and retrieve() go through conditional_response().
+    Subclasses must define get_version_keys(request), returning the
+    version_key()s of everything the payload embeds.
+    """
+
+    def list(self, request, *args, **kwargs):
+        handler = super().list
+        return conditional_response(
+            request, self.get_version_keys(request), lambda: handler(request, *args, **kwargs)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        handler = super().retrieve
+        return conditional_response(
+            request, self.get_version_keys(request), lambda: handler(request, *args, **kwargs)
+        )
@@ -0,0 +1,116 @@
+# backend/api/idempotency.py
+"""
+Idempotency-Key support for POST endpoints that must not run twice.
+
+The first request with a given (user, key) inserts a pending
+IdempotencyKey row, runs the view and stores the response. Then:
+
+- a retry with the same body gets the stored response back, with an
+  `Idempotent-Replayed: true` header, and the view does not run again;
+- a retry while the first request is still running gets 409;
+- the same key with a different body gets 422.
+
+The view and the stored response commit in ONE transaction, so a pending
+row never sits next to committed writes. 5xx responses and exceptions
+delete the row so the client can retry. A pending row older than
+IDEMPOTENCY_PENDING_LEASE_SECONDS (longer than the worker timeout)
+belongs to a request whose worker was killed before committing; the next
+retry reclaims it instead of getting 409 until the key expires.
+Keys live for IDEMPOTENCY_KEY_TTL_HOURS; `manage.py prune_idempotency_keys`
+removes old rows.
+"""
+import functools
+import hashlib
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+HEADER = "Idempotency-Key"
+REPLAYED_HEADER = "Idempotent-Replayed"
+MAX_KEY_LENGTH = 255
+
+
+def _fingerprint(request):
+    body = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(f"{request.method} {request.path}\n{body}".encode()).hexdigest()
+
+
+def _abandoned(row, now):
+    if row.created_at < now - timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS):
+        return True      # expired
+    lease = timedelta(seconds=settings.IDEMPOTENCY_PENDING_LEASE_SECONDS)
+    return row.response_status is None and row.created_at < now - lease
+
+
+def _claim(user, key, fingerprint):
+    """Returns (row, created). An expired or abandoned row for the key is replaced."""
+    for _ in range(2):
+        try:
+            with transaction.atomic():
+                return IdempotencyKey.objects.create(user=user, key=key, fingerprint=fingerprint), True
+        except IntegrityError:
+            row = IdempotencyKey.objects.filter(user=user, key=key).first()
+            if row is None:
+                continue
+            if not _abandoned(row, timezone.now()):
+                return row, False
+            # By pk: a row another retry re-created meanwhile is kept
+            IdempotencyKey.objects.filter(pk=row.pk).delete()
+    return None, False
+
+
+def idempotent(view):
+    """
+    Decorates a function view `(request, ...)` or viewset method
+    `(self, request, ...)`. Requests without the header are not affected.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        request = next(arg for arg in args if isinstance(arg, Request))
+        key = request.headers.get(HEADER)
+        if not key or not request.user.is_authenticated:
+            return view(*args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return Response({"error": f"{HEADER} must be at most {MAX_KEY_LENGTH} characters."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        fingerprint = _fingerprint(request)
+        row, created = _claim(request.user, key, fingerprint)
+        if row is None:
+            return Response({"error": f"Could not reserve {HEADER}, please retry."},
+                            status=status.HTTP_409_CONFLICT)
+
+        if not created:
+            if row.fingerprint != fingerprint:
+                return Response({"error": f"{HEADER} was already used for a different request."},
+                                status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+            if row.response_status is None:
+                return Response({"error": "The original request is still in progress."},
+                                status=status.HTTP_409_CONFLICT, headers={"Retry-After": "1"})
+            return Response(row.response_body, status=row.response_status,
+                            headers={REPLAYED_HEADER: "true"})
+
+        try:
+            with transaction.atomic():
+                response = view(*args, **kwargs)
+                # Only DRF responses below 500 are stored; anything else may be retried
+                if response.status_code >= 500 or not hasattr(response, "data"):
+                    row.delete()
+                else:
+                    row.response_status = response.status_code
+                    row.response_body = response.data
+                    row.save(update_fields=["response_status", "response_body"])
+        except Exception:
+            row.delete()
+            raise
+        return response
+
+    return wrapper
@@ -0,0 +1,53 @@
+# backend/api/management/commands/backfill_cost_price.py
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db.models import Max, Min, OuterRef, Subquery
+
+from catalog.models import Product
+from sales.models import InvoiceItem
+
+
+class Command(BaseCommand):
+    help = (
+        'Fills InvoiceItem.cost_price for lines saved with 0 from the current '
+        'Product.cost_price, walking the id range in batched UPDATEs. Lines whose '
+        'product has no cost price stay at 0.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--sleep', type=float, default=0.0,
+                            help='Seconds to pause between batches')
+        parser.add_argument('--shop', type=int, help='Only this shop id')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        missing = InvoiceItem.objects.filter(cost_price=0, product__isnull=False).order_by()
+        if options['shop']:
+            missing = missing.filter(invoice__shop_id=options['shop'])
+
+        bounds = missing.aggregate(lo=Min('id'), hi=Max('id'))
+        if bounds['lo'] is None:
+            self.stdout.write("Nothing to backfill")
+            return
+
+        cost = Subquery(
+            Product.objects.filter(id=OuterRef('product_id'), cost_price__gt=0).values('cost_price')[:1]
+        )
+        updatable = missing.filter(product__cost_price__gt=0)
+        total = 0
+        for lo in range(bounds['lo'], bounds['hi'] + 1, batch_size):
+            # Each UPDATE is its own short statement over an id range (pk index)
+            updated = updatable.filter(id__gte=lo, id__lt=lo + batch_size).update(cost_price=cost)
+            total += updated
+            if updated:
+                self.stdout.write(f"ids {lo}-{lo + batch_size - 1}: {updated} lines")
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(f"Backfilled cost_price on {total} invoice lines"))
+        if total:
+            # Profit reports read the sales rollup, which holds the old (zero) costs
+            call_command('rebuild_sales_rollup', shop=options['shop'], stdout=self.stdout)
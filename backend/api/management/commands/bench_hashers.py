@@ -0,0 +1,65 @@
+# backend/api/management/commands/bench_hashers.py
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+
+from api.throttles import LoginThrottle
+
+PASSWORD = "bench-hasher-Pa55word"
+
+
+class Command(BaseCommand):
+    help = (
+        'Measures password hashes/sec per worker for each hashing profile '
+        'and compares login capacity with the LoginThrottle rate.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rounds', type=int, default=20)
+        parser.add_argument('--workers', type=int,
+                            default=int(os.environ.get('WEB_CONCURRENCY', 3)),
+                            help='Sync workers serving logins (default: $WEB_CONCURRENCY or 3)')
+        parser.add_argument('--profile', choices=sorted(settings.PASSWORD_HASHER_PROFILES),
+                            help='Only benchmark this profile')
+
+    def handle(self, *args, **options):
+        rounds, workers = options['rounds'], options['workers']
+        if rounds < 1 or workers < 1:
+            raise CommandError("--rounds and --workers must be positive")
+
+        profiles = settings.PASSWORD_HASHER_PROFILES
+        if options['profile']:
+            profiles = {options['profile']: profiles[options['profile']]}
+
+        num_requests, duration = LoginThrottle().parse_rate(LoginThrottle.rate)
+        self.stdout.write(
+            f"Active profile: {settings.PASSWORD_HASH_PROFILE}  workers: {workers}  "
+            f"LoginThrottle: {num_requests} per {duration}s per client"
+        )
+
+        for profile, path in profiles.items():
+            try:
+                hasher = import_string(path)()
+                encoded = hasher.encode(PASSWORD, hasher.salt())  # also loads the library
+            except (ImportError, ValueError) as e:
+                self.stdout.write(self.style.WARNING(f"{profile:<8} unavailable: {e}"))
+                continue
+
+            start = time.perf_counter()
+            for _ in range(rounds):
+                hasher.verify(PASSWORD, encoded)
+            per_hash = (time.perf_counter() - start) / rounds
+
+            per_worker = 1 / per_hash
+            logins_per_hour = per_worker * workers * 3600
+            # Clients that can each use their full throttle allowance at once
+            clients = logins_per_hour / (num_requests * 3600 / duration)
+            self.stdout.write(
+                f"{profile:<8} {per_hash * 1000:7.1f} ms/hash  "
+                f"{per_worker:7.1f} hashes/s/worker  "
+                f"{logins_per_hour:9.0f} logins/h total  "
+                f"~{clients:.0f} clients at the throttle limit"
+            )
@@ -0,0 +1,103 @@
+# backend/api/management/commands/bench_login.py
+import statistics
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken, BlacklistedToken
+
+from api.auth_views import CookieTokenObtainPairView
+
+User = get_user_model()
+
+PASSWORD = "bench-login-Pa55word"
+
+
+class LegacyLoginView(CookieTokenObtainPairView):
+    """The login flow before the single-authentication rewrite, kept for comparison."""
+
+    def post(self, request, *args, **kwargs):
+        resp = super(CookieTokenObtainPairView, self).post(request, *args, **kwargs)
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        active_tokens = OutstandingToken.objects.filter(
+            user=serializer.user
+        ).exclude(
+            id__in=BlacklistedToken.objects.values_list('token_id', flat=True)
+        ).order_by('created_at')
+        token_count = active_tokens.count()
+        if token_count > 3:
+            for tk in active_tokens[:(token_count - 3)]:
+                BlacklistedToken.objects.get_or_create(token=tk)
+        return resp
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Benchmarks the login endpoint (p50/p95). Runs in a transaction that is rolled back.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument('--legacy', action='store_true',
+                            help='Also time the previous login flow and print the speed-up')
+
+    def handle(self, *args, **options):
+        flows = [("current", CookieTokenObtainPairView)]
+        if options['legacy']:
+            flows.append(("legacy", LegacyLoginView))
+
+        results = {}
+        try:
+            with transaction.atomic():
+                User.objects.filter(username="bench_login").delete()
+                user = User.objects.create_user(
+                    username="bench_login", email="bench_login@example.com", password=PASSWORD
+                )
+                for name, view_class in flows:
+                    results[name] = self._run(view_class, user, options['iterations'], options['warmup'])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        for name, (timings, queries) in results.items():
+            p50, p95 = self._percentiles(timings)
+            self.stdout.write(
+                f"{name:<8} n={len(timings)}  p50={p50:.1f}ms  p95={p95:.1f}ms  queries/login={queries}"
+            )
+        if "legacy" in results:
+            _, new_p95 = self._percentiles(results["current"][0])
+            _, old_p95 = self._percentiles(results["legacy"][0])
+            self.stdout.write(self.style.SUCCESS(f"p95 speed-up: {old_p95 / new_p95:.2f}x"))
+
+    def _run(self, view_class, user, iterations, warmup):
+        # No throttle: the benchmark would otherwise be rate-limited after a few logins
+        view = view_class.as_view(throttle_classes=[])
+        factory = APIRequestFactory()
+        payload = {User.USERNAME_FIELD: user.get_username(), "password": PASSWORD}
+
+        timings = []
+        queries = 0
+        for i in range(warmup + iterations):
+            request = factory.post("/api/auth/login/", payload, format="json")
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                response = view(request)
+                elapsed = (time.perf_counter() - start) * 1000
+            if response.status_code != 200:
+                raise CommandError(f"Login failed with {response.status_code}: {response.data}")
+            if i >= warmup:
+                timings.append(elapsed)
+                queries = len(captured)
+        return timings, queries
+
+    @staticmethod
+    def _percentiles(timings):
+        cuts = statistics.quantiles(timings, n=100, method="inclusive")
+        return statistics.median(timings), cuts[94]
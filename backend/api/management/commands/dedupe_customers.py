@@ -0,0 +1,46 @@
+# backend/api/management/commands/dedupe_customers.py
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from customers.dedupe import find_duplicates, merge_duplicates
+from customers.loyalty import invalidate_balances
+from customers.models import Customer
+
+
+class Command(BaseCommand):
+    help = (
+        'Merges customers sharing a shop and mobile number into the oldest one: '
+        'invoices are repointed in one UPDATE, loyalty points and ledgers are merged, duplicates '
+        'are deleted and purchase statistics recomputed. customers migration 0005 does '
+        'the same before 0006 adds the unique constraint; run this beforehand to control '
+        'when the work happens.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--shop', type=int, help='Only this shop id')
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            merge = find_duplicates(options['shop'])
+            if not merge:
+                self.stdout.write("No duplicate customers")
+                return
+            if options['dry_run']:
+                for dup, keep in sorted(merge.items()):
+                    self.stdout.write(f"customer {dup} -> {keep}")
+                self.stdout.write(f"{len(merge)} duplicates would be merged")
+                return
+            kept = list(
+                Customer.objects.filter(id__in=merge.values()).values_list('shop_id', 'id')
+            )
+            shops = {shop_id for shop_id, _ in kept}
+            invoices = merge_duplicates(merge)
+            invalidate_balances(kept)
+
+        for shop_id in sorted(shops):
+            call_command('reconcile_customer_stats', shop=shop_id, stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS(
+            f"Merged {len(merge)} duplicates, repointed {invoices} invoices"
+        ))
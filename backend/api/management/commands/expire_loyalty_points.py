@@ -0,0 +1,60 @@
+# backend/api/management/commands/expire_loyalty_points.py
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from customers.loyalty import invalidate_balances
+from customers.models import LoyaltyAccount, LoyaltyTransaction
+
+
+class Command(BaseCommand):
+    help = (
+        "Expires the points of loyalty accounts with no earn or redemption for "
+        "LOYALTY_POINTS_EXPIRY_DAYS. Set-based: per batch one INSERT of EXPIRE ledger "
+        "rows and one UPDATE zeroing the balances. Run nightly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=settings.LOYALTY_POINTS_EXPIRY_DAYS)
+        parser.add_argument('--shop', type=int, help='Only this shop id')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        # Accounts never used since last_activity_at was added have no date and are kept
+        expiring = LoyaltyAccount.objects.filter(points__gt=0, last_activity_at__lt=cutoff)
+        if options['shop']:
+            expiring = expiring.filter(shop_id=options['shop'])
+
+        if options['dry_run']:
+            count = expiring.count()
+            self.stdout.write(self.style.SUCCESS(f"{count} accounts would expire"))
+            return
+
+        total_accounts = total_points = 0
+        last_id = 0
+        while True:
+            with transaction.atomic():
+                batch = list(
+                    expiring.filter(id__gt=last_id).select_for_update().order_by('id')
+                    .values_list('id', 'shop_id', 'customer_id', 'points')[:options['batch_size']]
+                )
+                if not batch:
+                    break
+                LoyaltyTransaction.objects.bulk_create([
+                    LoyaltyTransaction(account_id=pk, shop_id=shop_id, kind='EXPIRE', points=-points)
+                    for pk, shop_id, _, points in batch
+                ])
+                LoyaltyAccount.objects.filter(id__in=[row[0] for row in batch]).update(points=0)
+                invalidate_balances((shop_id, customer_id) for _, shop_id, customer_id, _ in batch)
+            last_id = batch[-1][0]
+            total_accounts += len(batch)
+            total_points += sum(row[3] for row in batch)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Expired {total_points} points on {total_accounts} accounts"
+        ))
@@ -0,0 +1,36 @@
+# backend/api/management/commands/process_webhooks.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.webhooks import process_pending
+
+
+class Command(BaseCommand):
+    help = (
+        "Applies pending Razorpay webhook events from the inbox (api/webhooks.py), "
+        "in order per order id, retrying failures with backoff. Run every minute "
+        "from cron, or keep one running with --loop."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--loop', action='store_true', help='Keep polling the inbox')
+        parser.add_argument('--interval', type=float, default=2.0,
+                            help='Seconds to wait when the inbox is empty (with --loop)')
+
+    def handle(self, *args, **options):
+        totals = {}
+        while True:
+            counts = process_pending(limit=options['batch_size'])
+            for status, count in counts.items():
+                totals[status] = totals.get(status, 0) + count
+            if counts:
+                self.stdout.write(", ".join(f"{count} {status.lower()}" for status, count in counts.items()))
+                continue            # more may be due, e.g. later events of the same orders
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+
+        summary = ", ".join(f"{count} {status.lower()}" for status, count in totals.items()) or "nothing"
+        self.stdout.write(self.style.SUCCESS(f"Webhooks: {summary}"))
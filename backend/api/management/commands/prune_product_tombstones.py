@@ -0,0 +1,38 @@
+# backend/api/management/commands/prune_product_tombstones.py
+import time
+
+from django.core.management.base import BaseCommand
+
+from catalog.models import ProductTombstone
+from catalog.sync import tombstone_cutoff
+
+
+class Command(BaseCommand):
+    help = (
+        'Deletes product tombstones older than CATALOG_TOMBSTONE_RETENTION_DAYS in bounded '
+        'batches. Clients that last synced before then get a resync response from '
+        '/api/products/changes/. Run daily.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--sleep', type=float, default=0.0,
+                            help='Seconds to pause between batches')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        expired = ProductTombstone.objects.filter(deleted_at__lt=tombstone_cutoff()).order_by()
+
+        total = 0
+        while True:
+            ids = list(expired.values_list('id', flat=True)[:batch_size])
+            if not ids:
+                break
+            deleted, _ = ProductTombstone.objects.filter(id__in=ids).delete()
+            total += deleted
+            if len(ids) < batch_size:
+                break
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(f"Pruned {total} product tombstones"))
@@ -0,0 +1,53 @@
+# backend/api/management/commands/prune_tokens.py
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken, BlacklistedToken
+
+
+class Command(BaseCommand):
+    help = (
+        'Deletes expired outstanding refresh tokens and their blacklist entries '
+        'in bounded batches. Safe to run while the site is live (e.g. nightly cron).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--sleep', type=float, default=0.0,
+                            help='Seconds to pause between batches')
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        cutoff = timezone.now()
+        expired = OutstandingToken.objects.filter(expires_at__lt=cutoff).order_by()
+
+        if options['dry_run']:
+            self.stdout.write(f"{expired.count()} expired tokens would be deleted")
+            return
+
+        total_tokens = total_blacklisted = 0
+        while True:
+            # Walks the (expires_at) index; each batch is its own short transaction
+            ids = list(expired.values_list('id', flat=True)[:batch_size])
+            if not ids:
+                break
+            with transaction.atomic():
+                # only('id'): the collector loads the rows; skip the token text.
+                # Blacklist entries are removed by one cascading DELETE.
+                _, deleted = OutstandingToken.objects.filter(id__in=ids).only('id').delete()
+            tokens = deleted.get(OutstandingToken._meta.label, 0)
+            blacklisted = deleted.get(BlacklistedToken._meta.label, 0)
+            total_tokens += tokens
+            total_blacklisted += blacklisted
+            self.stdout.write(f"Deleted {tokens} tokens, {blacklisted} blacklist entries")
+            if len(ids) < batch_size:
+                break
+            if options['sleep']:
+                time.sleep(options['sleep'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Pruned {total_tokens} expired tokens and {total_blacklisted} blacklist entries"
+        ))
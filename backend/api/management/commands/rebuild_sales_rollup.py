@@ -0,0 +1,80 @@
+# backend/api/management/commands/rebuild_sales_rollup.py
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import DecimalField, ExpressionWrapper, F, Sum
+from django.db.models.functions import TruncDate
+
+from reports.models import ProductSalesDaily
+from reports.rollup import CENT
+from sales.models import InvoiceItem
+from shops.models import Shop
+
+_MONEY = DecimalField(max_digits=14, decimal_places=2)
+
+
+def _cents(value):
+    return Decimal(str(value or 0)).quantize(CENT)
+
+
+class Command(BaseCommand):
+    help = (
+        'Recomputes the per product per day sales rollup (ProductSalesDaily) from '
+        'invoice lines, one shop per transaction. Needed once after deploying the '
+        'rollup, and after bulk edits made outside the invoice endpoints.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--shop', type=int, help='Only this shop id')
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        shops = Shop.objects.order_by('id').values_list('id', flat=True)
+        if options['shop']:
+            shops = shops.filter(id=options['shop'])
+
+        total = 0
+        for shop_id in shops.iterator():
+            with transaction.atomic():
+                ProductSalesDaily.objects.filter(shop_id=shop_id).delete()
+                rows = self._aggregate(shop_id)
+                ProductSalesDaily.objects.bulk_create(rows, batch_size=options['batch_size'])
+            total += len(rows)
+            if rows:
+                self.stdout.write(f"Shop {shop_id}: {len(rows)} rows")
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {total} product/day rows"))
+
+    @staticmethod
+    def _aggregate(shop_id):
+        # Same rules as reports.rollup.sales_lines
+        sales = ExpressionWrapper(F('qty') * F('unit_price'), output_field=_MONEY)
+        lines = (
+            InvoiceItem.objects.filter(
+                invoice__shop_id=shop_id, invoice__invoice_type='INVOICE', product__isnull=False,
+            ).exclude(invoice__status='CANCELLED')
+            .annotate(day=TruncDate('invoice__invoice_date'))
+            .values('product_id', 'day')
+            .annotate(
+                total_qty=Sum('qty'),
+                total_sales=Sum(sales),
+                total_tax=Sum(ExpressionWrapper(
+                    F('qty') * F('unit_price') * F('tax_rate') / 100, output_field=_MONEY
+                )),
+                total_cost=Sum(ExpressionWrapper(F('qty') * F('cost_price'), output_field=_MONEY)),
+            )
+            .order_by()
+        )
+        return [
+            ProductSalesDaily(
+                shop_id=shop_id,
+                product_id=row['product_id'],
+                day=row['day'],
+                qty=_cents(row['total_qty']),
+                sales=_cents(row['total_sales']),
+                tax=_cents(row['total_tax']),
+                cost=_cents(row['total_cost']),
+            )
+            for row in lines
+        ]
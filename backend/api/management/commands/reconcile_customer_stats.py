@@ -0,0 +1,68 @@
+# backend/api/management/commands/reconcile_customer_stats.py
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Max, Q, Sum
+
+from customers.models import Customer
+from shops.models import Shop
+
+STATS = ('visit_count', 'lifetime_spend', 'average_basket', 'last_purchase_at')
+CENT = Decimal('0.01')
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes customers' purchase statistics from their invoices (one grouped "
+        "query per shop) and fixes the ones that drifted. Run nightly, and once after "
+        "deploying the statistics columns."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--shop', type=int, help='Only this shop id')
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        shops = Shop.objects.order_by('id').values_list('id', flat=True)
+        if options['shop']:
+            shops = shops.filter(id=options['shop'])
+
+        total = 0
+        for shop_id in shops.iterator():
+            with transaction.atomic():
+                fixed = self._reconcile(shop_id)
+                if fixed and not options['dry_run']:
+                    Customer.objects.bulk_update(fixed, STATS, batch_size=1000)
+            total += len(fixed)
+            if fixed:
+                self.stdout.write(f"Shop {shop_id}: {len(fixed)} customers")
+
+        verb = "would be fixed" if options['dry_run'] else "fixed"
+        self.stdout.write(self.style.SUCCESS(f"{total} customers {verb}"))
+
+    @staticmethod
+    def _reconcile(shop_id):
+        # Same rules as customers.stats.counts_as_purchase
+        counted = Q(invoice__invoice_type='INVOICE') & ~Q(invoice__status='CANCELLED')
+        customers = Customer.objects.filter(shop_id=shop_id).annotate(
+            real_visits=Count('invoice', filter=counted),
+            real_spend=Sum('invoice__grand_total', filter=counted),
+            real_last=Max('invoice__invoice_date', filter=counted),
+        ).only('id', *STATS)
+
+        fixed = []
+        for customer in customers.iterator(chunk_size=2000):
+            spend = Decimal(str(customer.real_spend or 0)).quantize(CENT)
+            visits = customer.real_visits
+            expected = {
+                'visit_count': visits,
+                'lifetime_spend': spend,
+                'average_basket': (spend / visits).quantize(CENT) if visits else Decimal('0.00'),
+                'last_purchase_at': customer.real_last,
+            }
+            if any(getattr(customer, name) != value for name, value in expected.items()):
+                for name, value in expected.items():
+                    setattr(customer, name, value)
+                fixed.append(customer)
+        return fixed
@@ -0,0 +1,61 @@
+# backend/api/management/commands/reconcile_stock.py
+from django.core.management.base import BaseCommand
+from django.db.models import F, OuterRef, Subquery, Sum
+
+from catalog.models import Product, StockHistory
+
+
+class Command(BaseCommand):
+    help = (
+        'Checks Product.quantity against the StockHistory ledger in one grouped query: '
+        'opening quantity of the first ledger row + sum of all changes must equal the '
+        'current quantity. Products without ledger rows are skipped.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--shop', type=int, help='Only this shop id')
+        parser.add_argument('--fix', action='store_true',
+                            help='Append an ADJUSTMENT row bringing the ledger in line with the quantity')
+
+    def handle(self, *args, **options):
+        opening = StockHistory.objects.filter(product=OuterRef('pk')).order_by('id')
+        products = Product.objects.all()
+        if options['shop']:
+            products = products.filter(shop_id=options['shop'])
+
+        drifted = list(
+            products.annotate(
+                total=Sum('stock_history__quantity_change'),
+                opening=Subquery(opening.values('quantity_before')[:1]),
+            )
+            .filter(total__isnull=False)
+            .annotate(expected=F('opening') + F('total'))
+            .exclude(quantity=F('expected'))
+            .order_by('id')
+            .values_list('id', 'shop_id', 'name', 'quantity', 'expected')
+        )
+
+        for product_id, shop_id, name, quantity, expected in drifted:
+            self.stdout.write(
+                f"shop {shop_id} product {product_id} ({name}): quantity {quantity}, ledger {expected}"
+            )
+
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS("Stock matches the ledger"))
+            return
+        if not options['fix']:
+            self.stdout.write(self.style.WARNING(f"{len(drifted)} product(s) differ; run with --fix"))
+            return
+
+        StockHistory.objects.bulk_create([
+            StockHistory(
+                product_id=product_id,
+                action='ADJUSTMENT',
+                quantity_change=quantity - expected,
+                quantity_before=expected,
+                quantity_after=quantity,
+                reference='Reconciliation',
+            )
+            for product_id, _, _, quantity, expected in drifted
+        ])
+        self.stdout.write(self.style.SUCCESS(f"Recorded {len(drifted)} adjustment(s)"))
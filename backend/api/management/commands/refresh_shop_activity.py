@@ -0,0 +1,32 @@
+# backend/api/management/commands/refresh_shop_activity.py
+from django.core.management.base import BaseCommand
+
+from shops.analytics import changed_shops, refresh_activity
+from shops.models import Shop
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds ShopActivitySummary, the table behind the site admin analytics "
+        "(shops/analytics.py). Run nightly over all shops; --changed only refreshes "
+        "shops that billed or changed subscription since their last refresh and can "
+        "run every few minutes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--shop', type=int, help='Only this shop id')
+        parser.add_argument('--changed', action='store_true')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        shops = changed_shops() if options['changed'] else Shop.objects.all()
+        if options['shop']:
+            shops = shops.filter(id=options['shop'])
+        ids = list(shops.order_by('id').values_list('id', flat=True))
+
+        size = options['batch_size']
+        total = 0
+        for start in range(0, len(ids), size):
+            total += refresh_activity(ids[start:start + size])
+
+        self.stdout.write(self.style.SUCCESS(f"Refreshed activity of {total} shops"))
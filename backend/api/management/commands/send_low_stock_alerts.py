@@ -0,0 +1,83 @@
+# backend/api/management/commands/send_low_stock_alerts.py
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.mail import send_mail
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from catalog.models import LowStockAlert
+from shops.models import Shop
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Emails queued low-stock alerts, one message per shop, to the shop contact '
+        'email (or its owners). Run every few minutes from cron.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        pending = list(
+            LowStockAlert.objects.filter(sent_at__isnull=True)
+            .select_related('product')
+            .order_by('created_at')[:options['batch_size']]
+        )
+        if not pending:
+            self.stdout.write("No pending low-stock alerts")
+            return
+
+        by_shop = defaultdict(list)
+        for alert in pending:
+            by_shop[alert.shop_id].append(alert)
+        recipients = self._recipients(by_shop)
+
+        sent = []
+        for shop_id, alerts in by_shop.items():
+            name, emails = recipients.get(shop_id, ("", []))
+            lines = [
+                f"- {a.product.name}: {a.quantity} left (alert at {a.threshold})" for a in alerts
+            ]
+            if options['dry_run']:
+                self.stdout.write(f"{name or shop_id} -> {', '.join(emails) or 'no recipient'}")
+                self.stdout.write("\n".join(lines))
+                continue
+            if emails:
+                try:
+                    send_mail(
+                        f"Low stock - {name}",
+                        "These products are running low:\n\n" + "\n".join(lines),
+                        settings.DEFAULT_FROM_EMAIL,
+                        emails,
+                    )
+                except Exception as e:
+                    self.stderr.write(f"Shop {shop_id}: {e}")
+                    continue
+            # Shops without any address are marked too, so they do not block the queue
+            sent += [a.id for a in alerts]
+
+        if sent:
+            LowStockAlert.objects.filter(id__in=sent).update(sent_at=timezone.now())
+        self.stdout.write(self.style.SUCCESS(f"Sent {len(sent)} alerts for {len(by_shop)} shops"))
+
+    @staticmethod
+    def _recipients(by_shop):
+        """shop id -> (shop name, [emails]) in two queries."""
+        shops = {
+            shop_id: (name, [email] if email else [])
+            for shop_id, name, email in Shop.objects.filter(id__in=by_shop)
+            .values_list('id', 'name', 'contact_email')
+        }
+        owners = User.objects.filter(
+            shop_id__in=[sid for sid, (_, emails) in shops.items() if not emails],
+            role=User.Role.SHOP_OWNER, is_active=True,
+        ).exclude(email='').values_list('shop_id', 'email')
+        for shop_id, email in owners:
+            shops[shop_id][1].append(email)
+        return shops
@@ -0,0 +1,60 @@
+# backend/api/management/commands/snapshot_stock.py
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from catalog.models import Product, StockSnapshot
+
+
+class Command(BaseCommand):
+    help = (
+        "Copies every product's quantity into StockSnapshot for today (run nightly). "
+        "Point-in-time stock reports start from the latest snapshot. Re-running on the "
+        "same day replaces that day's snapshot."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--shop', type=int, help='Only this shop id')
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--keep-days', type=int, default=0,
+                            help='Also delete snapshots older than this many days (0 keeps all)')
+
+    def handle(self, *args, **options):
+        taken_at = timezone.now()
+        today = timezone.localdate(taken_at)
+        products = Product.objects.order_by()
+        snapshots = StockSnapshot.objects.all()
+        if options['shop']:
+            products = products.filter(shop_id=options['shop'])
+            snapshots = snapshots.filter(shop_id=options['shop'])
+
+        batch, total = [], 0
+        rows = products.values_list('id', 'shop_id', 'quantity').iterator(chunk_size=options['batch_size'])
+        for product_id, shop_id, quantity in rows:
+            batch.append(StockSnapshot(
+                shop_id=shop_id, product_id=product_id, snapshot_date=today,
+                taken_at=taken_at, quantity=quantity,
+            ))
+            if len(batch) >= options['batch_size']:
+                total += self._write(batch)
+                batch = []
+        if batch:
+            total += self._write(batch)
+
+        if options['keep_days']:
+            cutoff = today - timedelta(days=options['keep_days'])
+            deleted, _ = snapshots.filter(snapshot_date__lt=cutoff).delete()
+            self.stdout.write(f"Deleted {deleted} snapshots older than {cutoff}")
+
+        self.stdout.write(self.style.SUCCESS(f"Snapshot of {total} products for {today}"))
+
+    @staticmethod
+    def _write(batch):
+        StockSnapshot.objects.bulk_create(
+            batch,
+            update_conflicts=True,
+            unique_fields=['product', 'snapshot_date'],
+            update_fields=['quantity', 'taken_at'],
+        )
+        return len(batch)
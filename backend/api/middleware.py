@@ -1,6 +1,14 @@
+import threading
+import time
+
+from django.conf import settings
 from django.core.cache import cache
 from django.utils.deprecation import MiddlewareMixin
 from django.http import JsonResponse
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .profiling import get_sampler, save_profile
 
 EXEMPT_PATHS = [
     # Auth
@@ -69,4 +77,56 @@ class SubscriptionMiddleware(MiddlewareMixin):
                 status=403
             )
 
-        return None
\ No newline at end of file
+        return None
+
+
+# Admins can profile a single request with this header, even when
+# PROFILE_SLOW_REQUESTS is off.
+PROFILE_HEADER = "X-Profile"
+
+
+def _is_site_admin(request):
+    """Authenticates the request's JWT; this middleware runs before any auth."""
+    try:
+        result = JWTAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return False
+    user = result[0] if result else None
+    return bool(user and (user.is_superuser or getattr(user, "role", None) == "SITE_ADMIN"))
+
+
+class SlowRequestProfilerMiddleware:
+    """
+    Samples the request thread and stores a collapsed-stack profile when the
+    request is slower than PROFILE_THRESHOLD_MS. Does nothing unless
+    PROFILE_SLOW_REQUESTS is on or a site admin sends `X-Profile: 1`.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        # The header only counts for site admins, checked before sampling starts
+        forced = request.headers.get(PROFILE_HEADER) == "1" and _is_site_admin(request)
+        if not (settings.PROFILE_SLOW_REQUESTS or forced):
+            return self.get_response(request)
+
+        sampler = get_sampler()
+        thread_id = threading.get_ident()
+        stacks = sampler.register(thread_id)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            sampler.unregister(thread_id)
+        duration_ms = (time.perf_counter() - start) * 1000
+
+        if (forced or duration_ms >= settings.PROFILE_THRESHOLD_MS) and stacks:
+            match = request.resolver_match
+            route = (match.view_name if match and match.view_name else request.path)
+            try:
+                save_profile(route, request.method, duration_ms, stacks)
+            except OSError:
+                pass
+
+        return response
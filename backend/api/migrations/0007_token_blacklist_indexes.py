@@ -0,0 +1,52 @@
+# Indexes on the simplejwt token_blacklist tables (owned by a third-party
+# app, so they are created here with raw SQL).
+#
+# - (user_id, created_at): the device-limit query in api.auth_views runs
+#   on every login. On PostgreSQL it also carries id, jti and expires_at,
+#   so the scan never touches the heap.
+# - (expires_at): batched deletes in `manage.py prune_tokens`.
+
+from django.db import migrations
+
+INDEXES = {
+    'token_outstanding_user_created': {
+        'postgresql': (
+            "CREATE INDEX IF NOT EXISTS token_outstanding_user_created "
+            "ON token_blacklist_outstandingtoken (user_id, created_at DESC, id DESC) "
+            "INCLUDE (jti, expires_at)"
+        ),
+        'default': (
+            "CREATE INDEX IF NOT EXISTS token_outstanding_user_created "
+            "ON token_blacklist_outstandingtoken (user_id, created_at, id)"
+        ),
+    },
+    'token_outstanding_expires': {
+        'default': (
+            "CREATE INDEX IF NOT EXISTS token_outstanding_expires "
+            "ON token_blacklist_outstandingtoken (expires_at)"
+        ),
+    },
+}
+
+
+def create_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for statements in INDEXES.values():
+        schema_editor.execute(statements.get(vendor, statements['default']))
+
+
+def drop_indexes(apps, schema_editor):
+    for name in INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_alter_subscriptionplan_plan_type'),
+        ('token_blacklist', '0012_alter_outstandingtoken_user'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
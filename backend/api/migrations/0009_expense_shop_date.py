@@ -0,0 +1,20 @@
+# Generated by Django 6.0.3 on 2026-10-19 15:52
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_idempotencykey'),
+        ('shops', '0009_shop_shops_shop_contact_7e5a43_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='expense',
+            index=models.Index(fields=['shop', 'date'], name='api_expense_shop_id_f356c1_idx'),
+        ),
+    ]
@@ -1,5 +1,6 @@
 # backend/api/models.py
 from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from django.conf import settings
 from django.utils import timezone
@@ -272,6 +273,45 @@ class Payment(models.Model):
         return f"{self.user.email} | {self.plan} | {self.status} | ₹{self.amount}"
 
 
+# ========== WEBHOOK INBOX ==========
+# Razorpay webhooks as received, one row per event id. The endpoint only
+# verifies and appends; manage.py process_webhooks applies them (api/webhooks.py).
+class WebhookEvent(models.Model):
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('PROCESSED', 'Processed'),
+        ('FAILED', 'Failed'),          # gave up after WEBHOOK_MAX_ATTEMPTS
+    ]
+
+    event_id = models.CharField(max_length=100, unique=True)   # X-Razorpay-Event-Id
+    event = models.CharField(max_length=60)
+    order_id = models.CharField(max_length=255, blank=True)
+    payload = models.JSONField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # The worker's queue: due pending events, oldest first
+            models.Index(
+                fields=['next_attempt_at', 'id'], condition=models.Q(status='PENDING'),
+                name='api_webhook_pending',
+            ),
+            # Per-order ordering check
+            models.Index(
+                fields=['order_id', 'id'], condition=models.Q(status='PENDING'),
+                name='api_webhook_order_pending',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.event} {self.event_id} ({self.status})"
+
+
 # ========== EXPENSES (PRO FEATURE) ==========
 class Expense(models.Model):
     CATEGORY_CHOICES = [
@@ -306,6 +346,10 @@ class Expense(models.Model):
 
     class Meta:
         ordering = ['-date']
+        indexes = [
+            # Expense list (keyset on date), date-range summaries and the P&L
+            models.Index(fields=['shop', 'date']),
+        ]
 
     def __str__(self):
         return f"{self.category} - ₹{self.amount} - {self.date}"
@@ -319,4 +363,27 @@ class Feedback(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return f"{self.user.email} - {self.rating} Stars"
\ No newline at end of file
+        return f"{self.user.email} - {self.rating} Stars"
+
+
+# ========== IDEMPOTENCY KEYS ==========
+class IdempotencyKey(models.Model):
+    """
+    Stored outcome of a POST sent with an `Idempotency-Key` header, replayed
+    for retries of the same request (see api/idempotency.py).
+    response_status stays NULL while the first request is still running.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='idempotency_keys')
+    key = models.CharField(max_length=255)
+    fingerprint = models.CharField(max_length=64)   # sha256 of method, path and body
+    response_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='api_idempotencykey_user_key'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}:{self.key} ({self.response_status or 'pending'})"
@@ -1,4 +1,4 @@
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import CursorPagination, PageNumberPagination
 
 class SmallPagination(PageNumberPagination):
     page_size = 10
@@ -13,4 +13,11 @@ class StandardPagination(PageNumberPagination):
 class LargePagination(PageNumberPagination):
     page_size = 50
     page_size_query_param = 'page_size'
-    max_page_size = 200
\ No newline at end of file
+    max_page_size = 200
+
+class ExpenseCursorPagination(CursorPagination):
+    """Keyset pages on (shop, date): no COUNT, no OFFSET scan on deep pages."""
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-date', '-id')
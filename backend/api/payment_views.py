@@ -4,14 +4,16 @@ import razorpay
 import hmac
 import hashlib
 from django.conf import settings
-from django.views.decorators.csrf import csrf_exempt
 from rest_framework import status, viewsets
 from rest_framework.decorators import api_view, permission_classes
-from rest_framework.permissions import IsAuthenticated, AllowAny
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.db import transaction
 
 from .models import SubscriptionPlan, UserSubscription, Payment
+from .conditional import conditional_response, hour_bucket
+from .idempotency import idempotent
+from .versioning import version_key
 from .serializers import (
     SubscriptionPlanSerializer,
     UserSubscriptionSerializer,
@@ -38,6 +40,7 @@ class SubscriptionPlanViewSet(viewsets.ReadOnlyModelViewSet):
 # ========== CREATE RAZORPAY ORDER ==========
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@idempotent
 def create_order(request):
     """
     Creates a Razorpay order for subscription payment.
@@ -103,6 +106,7 @@ def create_order(request):
 # ========== VERIFY PAYMENT ==========
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@idempotent
 def verify_payment(request):
     """
     Verifies Razorpay payment signature after frontend checkout completes.
@@ -157,13 +161,16 @@ def verify_payment(request):
 
     # ✅ Atomic — both payment update and subscription activation succeed or both fail
     with transaction.atomic():
-        payment.payment_id = razorpay_payment_id
-        payment.signature = razorpay_signature
-        payment.status = 'SUCCESS'
-        payment.save()
-
+        # Locked re-read: the webhook worker (api/webhooks.py) may be activating
+        # the same payment, and activating twice would extend the plan twice
+        payment = Payment.objects.select_for_update().select_related('plan').get(pk=payment.pk)
         subscription, _ = UserSubscription.objects.get_or_create(user=request.user)
-        subscription.activate_plan(payment.plan)
+        if payment.status != 'SUCCESS':
+            payment.payment_id = razorpay_payment_id
+            payment.signature = razorpay_signature
+            payment.status = 'SUCCESS'
+            payment.save()
+            subscription.activate_plan(payment.plan)
 
     return Response({
         "success": True,
@@ -180,6 +187,13 @@ def subscription_status(request):
     Returns the current subscription status for the logged-in user.
     Used by frontend to show subscription info, countdown, upgrade prompts etc.
     """
+    keys = [version_key("sub", request.user.pk), version_key("plans")]
+    return conditional_response(
+        request, keys, lambda: _subscription_status(request), extra=(hour_bucket(),)
+    )
+
+
+def _subscription_status(request):
     subscription, created = UserSubscription.objects.get_or_create(user=request.user)
 
     return Response({
@@ -241,90 +255,3 @@ def payment_history(request):
 
     serializer = PaymentSerializer(payments, many=True)
     return Response(serializer.data)
-
-
-# ========== RAZORPAY WEBHOOK ==========
-@csrf_exempt
-@api_view(['POST'])
-@permission_classes([AllowAny])
-def razorpay_webhook(request):
-    """
-    Handles Razorpay webhook events for subscription payments.
-    This is a backup to verify_payment — ensures subscription activates
-    even if the frontend fails to call verify_payment after checkout.
-
-    Configure in Razorpay Dashboard:
-    https://yourdomain.com/api/payments/webhook/
-    """
-    # ✅ Fix 1 — use WEBHOOK secret, not API secret (these are different!)
-    webhook_secret = settings.RAZORPAY_WEBHOOK_SECRET
-    webhook_signature = request.headers.get('X-Razorpay-Signature', '')
-
-    if not webhook_signature:
-        return Response(
-            {"error": "Missing webhook signature"},
-            status=status.HTTP_400_BAD_REQUEST
-        )
-
-    # ✅ Fix 2 — proper exception handling
-    try:
-        razorpay_client.utility.verify_webhook_signature(
-            request.body.decode('utf-8'),
-            webhook_signature,
-            webhook_secret,
-        )
-    except Exception:
-        return Response(
-            {"error": "Invalid webhook signature"},
-            status=status.HTTP_400_BAD_REQUEST
-        )
-
-    webhook_body = request.data
-    event = webhook_body.get('event')
-
-    # ========== PAYMENT CAPTURED ==========
-    if event == 'payment.captured':
-        payment_entity = webhook_body['payload']['payment']['entity']
-        order_id = payment_entity.get('order_id')
-        payment_id = payment_entity.get('id')
-
-        try:
-            payment = Payment.objects.select_related('user', 'plan').get(
-                order_id=order_id
-            )
-
-            # Skip if already processed (verify_payment may have handled it)
-            if payment.status == 'SUCCESS':
-                return Response({"status": "already processed"})
-
-            with transaction.atomic():
-                payment.payment_id = payment_id
-                payment.status = 'SUCCESS'
-                payment.save()
-
-                subscription, _ = UserSubscription.objects.get_or_create(
-                    user=payment.user
-                )
-                subscription.activate_plan(payment.plan)
-
-        except Payment.DoesNotExist:
-            # Log this — order exists in Razorpay but not in our DB
-            pass
-
-    # ========== PAYMENT FAILED ==========
-    elif event == 'payment.failed':
-        payment_entity = webhook_body['payload']['payment']['entity']
-        order_id = payment_entity.get('order_id')
-
-        try:
-            payment = Payment.objects.get(order_id=order_id)
-            if payment.status != 'SUCCESS':  # Don't overwrite a success
-                payment.status = 'FAILED'
-                payment.save()
-        except Payment.DoesNotExist:
-            pass
-
-    return Response({"status": "ok"})
-
-
-
@@ -0,0 +1,187 @@
+# backend/api/profiling.py
+"""
+Sampling profiler for slow requests.
+
+A single daemon thread per worker process wakes every
+PROFILE_SAMPLE_INTERVAL_MS and records the call stack of every request
+thread that has been running for longer than PROFILE_SAMPLE_DELAY_MS.
+Requests that finish before the delay are never sampled, so the cost for
+fast requests is one dict insert + one dict delete.
+
+Profiles of requests slower than PROFILE_THRESHOLD_MS are written in
+collapsed-stack format ("frame;frame;frame count" per line — the input
+format of flamegraph.pl and speedscope) to:
+
+    PROFILE_DIR/<route>/<duration_ms>_<epoch_ms>_<METHOD>.folded
+
+The directory is capped at PROFILE_MAX_FILES; the oldest files are
+deleted first.
+"""
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+
+PROFILE_SUFFIX = ".folded"
+_ROUTE_SAFE = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+# ========== SAMPLER ==========
+class _Sampler(threading.Thread):
+    def __init__(self, interval, delay):
+        super().__init__(name="slow-request-sampler", daemon=True)
+        self.interval = interval
+        self.delay = delay
+        self._active = {}            # thread id -> (start, Counter)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+
+    def register(self, thread_id):
+        stacks = Counter()
+        with self._lock:
+            self._active[thread_id] = (time.perf_counter(), stacks)
+            self._wake.set()
+        return stacks
+
+    def unregister(self, thread_id):
+        with self._lock:
+            self._active.pop(thread_id, None)
+            if not self._active:
+                self._wake.clear()
+
+    def run(self):
+        own_id = threading.get_ident()
+        while True:
+            # Sleep for free while no request is running
+            self._wake.wait()
+            time.sleep(self.interval)
+
+            now = time.perf_counter()
+            with self._lock:
+                due = [
+                    (tid, stacks) for tid, (start, stacks) in self._active.items()
+                    if now - start >= self.delay and tid != own_id
+                ]
+            if not due:
+                continue
+
+            frames = sys._current_frames()
+            for tid, stacks in due:
+                frame = frames.get(tid)
+                if frame is not None:
+                    stacks[_collapse(frame)] += 1
+
+
+def _collapse(frame):
+    parts = []
+    while frame is not None:
+        code = frame.f_code
+        module = frame.f_globals.get("__name__", "?")
+        parts.append(f"{module}.{code.co_qualname}")
+        frame = frame.f_back
+    parts.reverse()
+    return ";".join(parts)
+
+
+_sampler = None
+_sampler_lock = threading.Lock()
+
+
+def get_sampler():
+    """Starts the sampler lazily so it lives in the gunicorn worker, not the master."""
+    global _sampler
+    if _sampler is None:
+        with _sampler_lock:
+            if _sampler is None:
+                sampler = _Sampler(
+                    interval=settings.PROFILE_SAMPLE_INTERVAL_MS / 1000,
+                    delay=settings.PROFILE_SAMPLE_DELAY_MS / 1000,
+                )
+                sampler.start()
+                _sampler = sampler
+    return _sampler
+
+
+# ========== STORAGE ==========
+def route_slug(route):
+    slug = _ROUTE_SAFE.sub("_", route.strip("/")).strip("_")
+    return slug or "root"
+
+
+def save_profile(route, method, duration_ms, stacks):
+    """Writes one collapsed-stack profile and prunes the directory to size."""
+    if not stacks:
+        return None
+
+    base = settings.PROFILE_DIR
+    folder = os.path.join(base, route_slug(route))
+    os.makedirs(folder, exist_ok=True)
+
+    filename = f"{int(duration_ms)}_{int(time.time() * 1000)}_{method}{PROFILE_SUFFIX}"
+    path = os.path.join(folder, filename)
+    with open(path, "w", encoding="utf-8") as fh:
+        for stack, count in stacks.most_common():
+            fh.write(f"{stack} {count}\n")
+
+    _prune(base, settings.PROFILE_MAX_FILES)
+    return path
+
+
+def _iter_profiles(base):
+    try:
+        routes = os.scandir(base)
+    except FileNotFoundError:
+        return
+    with routes:
+        for route_dir in routes:
+            if not route_dir.is_dir():
+                continue
+            with os.scandir(route_dir.path) as files:
+                for entry in files:
+                    if entry.is_file() and entry.name.endswith(PROFILE_SUFFIX):
+                        yield route_dir.name, entry
+
+
+def _prune(base, max_files):
+    entries = [entry for _, entry in _iter_profiles(base)]
+    if len(entries) <= max_files:
+        return
+    entries.sort(key=lambda e: e.stat().st_mtime)
+    for entry in entries[:len(entries) - max_files]:
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
+
+
+def list_profiles(limit=50):
+    """Returns captured profiles, slowest first. Metadata comes from the filename only."""
+    profiles = []
+    for route, entry in _iter_profiles(settings.PROFILE_DIR):
+        try:
+            duration_ms, captured_ms, method = entry.name[:-len(PROFILE_SUFFIX)].split("_", 2)
+            profiles.append({
+                "id": f"{route}/{entry.name}",
+                "route": route,
+                "method": method,
+                "duration_ms": int(duration_ms),
+                "captured_at": int(captured_ms),
+                "size": entry.stat().st_size,
+            })
+        except ValueError:
+            continue
+    profiles.sort(key=lambda p: p["duration_ms"], reverse=True)
+    return profiles[:limit]
+
+
+def profile_path(profile_id):
+    """Resolves a profile id from list_profiles() to a path inside PROFILE_DIR, or None."""
+    base = os.path.realpath(settings.PROFILE_DIR)
+    path = os.path.realpath(os.path.join(base, profile_id))
+    if not path.startswith(base + os.sep) or not path.endswith(PROFILE_SUFFIX):
+        return None
+    return path if os.path.isfile(path) else None
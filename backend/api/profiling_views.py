@@ -0,0 +1,36 @@
+# backend/api/profiling_views.py
+
+from django.http import FileResponse
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+
+from shops.permissions import IsSiteAdmin
+from .profiling import list_profiles, profile_path
+
+
+# ========== SLOWEST CAPTURED PROFILES ==========
+@api_view(['GET'])
+@permission_classes([IsSiteAdmin])
+def profile_list(request):
+    """
+    Lists captured slow-request profiles, slowest first.
+    Query: ?limit=50 (max 500)
+    """
+    try:
+        limit = max(1, min(int(request.query_params.get('limit', 50)), 500))
+    except ValueError:
+        limit = 50
+    return Response(list_profiles(limit=limit))
+
+
+# ========== DOWNLOAD ONE PROFILE ==========
+@api_view(['GET'])
+@permission_classes([IsSiteAdmin])
+def profile_download(request, profile_id):
+    """
+    Returns the collapsed-stack file — feed it to flamegraph.pl or speedscope.
+    """
+    path = profile_path(profile_id)
+    if path is None:
+        return Response({"error": "Profile not found"}, status=404)
+    return FileResponse(open(path, 'rb'), content_type='text/plain; charset=utf-8')
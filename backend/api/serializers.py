@@ -1,16 +1,21 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.contrib.auth.hashers import make_password
+from collections import defaultdict
+from decimal import Decimal
 from django.db import transaction
-from django.db.models import F
 import re
 
 # Models
 from .models import SubscriptionPlan, UserSubscription, Payment, Expense, Feedback
 from shops.models import Shop, TaxProfile
 from catalog.models import Product
+from catalog.stock import move_stock
 from customers.models import Customer
 from sales.models import Invoice, InvoiceItem
+from sales.services import create_invoices
+from reports.rollup import add_sales, sales_lines
+from customers.stats import purchase, record_purchases
 
 User = get_user_model()
 
@@ -97,11 +102,25 @@ class ProductSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Quantity must be non-negative.")
         return value
 
+class ProductLookupSerializer(serializers.ModelSerializer):
+    """Only what the billing screen needs to add a line."""
+    class Meta:
+        model = Product
+        fields = ("id", "name", "sku", "price", "tax_rate", "quantity", "unit")
+        read_only_fields = fields
+
 class CustomerSerializer(serializers.ModelSerializer):
     class Meta:
         model = Customer
         fields = "__all__"
-        read_only_fields = ("id",)
+        read_only_fields = ("id", "visit_count", "lifetime_spend", "average_basket", "last_purchase_at")
+
+class CustomerLookupSerializer(serializers.ModelSerializer):
+    """Billing screen autocomplete: who the customer is and how they buy."""
+    class Meta:
+        model = Customer
+        fields = ("id", "name", "mobile", "visit_count", "lifetime_spend", "average_basket", "last_purchase_at")
+        read_only_fields = fields
 
 
 # ============================
@@ -126,23 +145,52 @@ class InvoiceSerializer(serializers.ModelSerializer):
     customer_mobile = serializers.CharField(allow_blank=True, required=False)
     customer_detail = CustomerSerializer(source="customer", read_only=True)
     discount_total = serializers.DecimalField(max_digits=10, decimal_places=2, required=False, default=0)
+    # Loyalty points to spend on a new invoice (customers/loyalty.py); ignored on edits
+    redeem_points = serializers.IntegerField(write_only=True, required=False, min_value=0)
     class Meta:
         model = Invoice
         fields = (
             "id", "shop", "customer", "customer_detail", "customer_name", "customer_mobile",
             "created_at", "subtotal", "tax_total", "grand_total","discount_total", "status", "invoice_type", "items",
-            "invoice_date", "number", "payment_mode"
+            "invoice_date", "number", "payment_mode", "client_id", "redeem_points"
         )
         read_only_fields = (
             "id", "shop", "customer", "created_at", "subtotal",
             "tax_total", "grand_total", "customer_detail", "invoice_date", "number"
         )
+        # (shop, client_id) is enforced by sales.services, which returns the
+        # already-synced invoice instead of failing
+        validators = []
+
+    def validate(self, attrs):
+        # Strict Rule: No custom items in INVOICE
+        # (QuotationViewSet forces its type through the serializer context)
+        inv_type = (
+            self.context.get('invoice_type')
+            or attrs.get('invoice_type')
+            or (self.instance.invoice_type if self.instance else 'INVOICE')
+        )
+        if inv_type == 'INVOICE':
+            for item in attrs.get('items', []):
+                if not item.get('product'):
+                    raise serializers.ValidationError({"items": "Sales Invoices must only contain catalog products. Custom items are only allowed for Quotations."})
+
+        # The discount can bring the total to zero, not below
+        if 'items' in attrs:
+            items_total = sum(
+                (item['unit_price'] * item['qty'] * (100 + item.get('tax_rate', 0)) / 100
+                 for item in attrs['items']),
+                Decimal(0),
+            )
+            discount = attrs.get('discount_total', self.instance.discount_total if self.instance else 0)
+            if discount > items_total:
+                raise serializers.ValidationError({"discount_total": "Discount cannot exceed the items total."})
+        return attrs
 
     @transaction.atomic
     def update(self, instance, validated_data):
         items_data = validated_data.pop("items", [])
         request = self.context.get('request')
-        shop = instance.shop
         discount_amount = validated_data.get("discount_total", instance.discount_total)
 
         # 0. Strict Rule: No downgrade from INVOICE to QUOTATION
@@ -150,20 +198,18 @@ class InvoiceSerializer(serializers.ModelSerializer):
         if instance.invoice_type == 'INVOICE' and new_type == 'QUOTATION':
             raise serializers.ValidationError({"invoice_type": "Security Rule: Cannot change an Invoice back to a Quotation."})
 
-        # 0.1 Strict Rule: No custom items in INVOICE
-        if new_type == 'INVOICE':
-            for item in items_data:
-                if not item.get('product'):
-                     raise serializers.ValidationError({"items": "Sales Invoices must only contain catalog products. Custom items are only allowed for Quotations."})
-
-        # 1. Revert stock for old items (Only for INVOICES)
-        if instance.invoice_type == 'INVOICE':
+        # 1. Revert stock for old items (Only for INVOICES); the net change per
+        #    product is applied and recorded once, after the new items
+        stock = defaultdict(Decimal)
+        was_invoice = instance.invoice_type == 'INVOICE'
+        if was_invoice:
             for old_item in instance.items.all():
-                Product.objects.filter(id=old_item.product_id).update(
-                    quantity=F('quantity') + old_item.qty
-                )
+                if old_item.product_id:
+                    stock[old_item.product_id] += old_item.qty
         
-        # 2. Clear old items
+        # 2. Clear old items (taking them out of the sales rollup first)
+        rollup = sales_lines(instance.items.all(), sign=-1)
+        purchases = [purchase(instance, sign=-1)]
         instance.items.all().delete()
 
         # 3. Update Invoice Header
@@ -175,15 +221,14 @@ class InvoiceSerializer(serializers.ModelSerializer):
 
         # Handle Customer re-association if mobile changed
         if instance.customer_mobile:
-            customer, _ = Customer.objects.get_or_create(
-                shop=shop, mobile=instance.customer_mobile, 
-                defaults={'name': instance.customer_name, 'email': ''}
+            instance.customer_id = Customer.objects.resolve_id(
+                instance.shop_id, instance.customer_mobile, instance.customer_name
             )
-            instance.customer = customer
 
         # 4. Create new items and deduct stock
         total_calc = 0
         tax_calc = 0
+        new_items = []
 
         for item_data in items_data:
             prod = item_data.get('product')
@@ -200,7 +245,7 @@ class InvoiceSerializer(serializers.ModelSerializer):
             tax_calc += line_tax
 
             # Create the item
-            InvoiceItem.objects.create(
+            new_items.append(InvoiceItem.objects.create(
                 invoice=instance, 
                 product=prod, 
                 product_name=p_name or (prod.name if prod else None),
@@ -210,13 +255,11 @@ class InvoiceSerializer(serializers.ModelSerializer):
                 tax_rate=tax, 
                 cost_price=prod.cost_price if prod else 0,
                 line_total=line_total + line_tax
-            )
+            ))
 
             # Deduct stock (Only for INVOICES and only if product is linked)
             if instance.invoice_type == 'INVOICE' and prod:
-                Product.objects.filter(id=prod.id).update(
-                    quantity=F('quantity') - qty
-                )
+                stock[prod.id] -= qty
 
         # 5. Save Final Totals
         instance.subtotal = total_calc
@@ -224,106 +267,41 @@ class InvoiceSerializer(serializers.ModelSerializer):
         instance.grand_total = (total_calc + tax_calc) - discount_amount
         instance.save()
 
+        move_stock(
+            [(product_id, change, instance.number) for product_id, change in stock.items()],
+            'ADJUSTMENT' if was_invoice else 'SALE',
+            user=request.user if request else None,
+        )
+        add_sales(rollup + sales_lines(new_items))
+        record_purchases(purchases + [purchase(instance)])
         return instance
 
     @transaction.atomic
     def create(self, validated_data):
-        items_data = validated_data.pop("items", [])
+        # Same write path as /api/invoices/bulk/ — see sales/services.py
         request = self.context.get('request')
-        discount_amount = validated_data.get("discount_total", 0)
-        shop = Shop.objects.select_for_update().get(id=request.user.shop.id)
-
-        # 1. Generate Number based on Type
-        inv_type = validated_data.get('invoice_type', 'INVOICE')
-        if inv_type == 'QUOTATION':
-            shop.counter_quotation = F('counter_quotation') + 1
-            prefix = "QUA"
-            shop.save()
-            shop.refresh_from_db()
-            counter = shop.counter_quotation
-        else:
-            shop.counter_invoice = F('counter_invoice') + 1
-            prefix = "INV"
-            shop.save()
-            shop.refresh_from_db()
-            counter = shop.counter_invoice
-
-        formatted_number = f"{prefix}-{shop.id}-{counter}"
-
-        # 2. Handle Customer
-        c_name = validated_data.pop("customer_name", "Walk-in")
-        c_mobile = validated_data.pop("customer_mobile", None)
-        customer = None
-        if c_mobile:
-            customer, _ = Customer.objects.get_or_create(
-                shop=shop, mobile=c_mobile, defaults={'name': c_name, 'email': ''}
-            )
-
-        # 3. Create Invoice (Totals 0 initially)
-        inv_type = validated_data.get('invoice_type', 'INVOICE')
-        
-        # Strict Rule: No custom items in INVOICE
-        if inv_type == 'INVOICE':
-            for item in items_data:
-                if not item.get('product'):
-                     raise serializers.ValidationError({"items": "Sales Invoices must only contain catalog products. Custom items are only allowed for Quotations."})
-
-        invoice = Invoice.objects.create(
-            shop=shop,
-            customer=customer,
-            customer_name=c_name,
-            customer_mobile=c_mobile,
-            status=validated_data.get('status', "PAID"),
-            invoice_type=validated_data.get('invoice_type', "INVOICE"),
-            number=formatted_number,
-            payment_mode=validated_data.get('payment_mode', 'cash'),
-            created_by=request.user,
-            discount_total=discount_amount, # Save the discount
-            grand_total=0
-        )
+        result, = create_invoices(request.user.shop_id, request.user, [validated_data])
+        if result.errors:
+            raise serializers.ValidationError(result.errors)
+        return result.invoice
 
-        # 4. Calculate Totals from Items
-        total_calc = 0
-        tax_calc = 0
 
-        for item in items_data:
-            prod = item.get('product')
-            p_name = item.get('product_name')
-            qty = item['qty']
-            price = item['unit_price']
-            orig_price = item.get('original_price')
-            tax = item.get('tax_rate', 0)
+class BulkInvoiceItemSerializer(InvoiceItemSerializer):
+    # A plain id: sales.services checks all products of a batch against the
+    # shop in one query instead of one lookup per item
+    product = serializers.IntegerField(required=False, allow_null=True)
 
-            line_total = price * qty
-            line_tax = (line_total * tax) / 100
-            
-            total_calc += line_total
-            tax_calc += line_tax
 
-            InvoiceItem.objects.create(
-                invoice=invoice, 
-                product=prod, 
-                product_name=p_name or (prod.name if prod else None),
-                qty=qty, 
-                unit_price=price,
-                original_price=orig_price,
-                tax_rate=tax, 
-                line_total=line_total + line_tax
-            )
-
-            # ✅ Deduct stock atomically (Only for INVOICES and only if product is linked)
-            if invoice.invoice_type == 'INVOICE' and prod:
-                Product.objects.filter(id=prod.id).update(
-                    quantity=F('quantity') - qty
-                )
+class BulkInvoiceSerializer(InvoiceSerializer):
+    """One entry of POST /api/invoices/bulk/. client_id is required there."""
+    items = BulkInvoiceItemSerializer(many=True)
+    client_id = serializers.UUIDField()
 
-        # 5. Save Final Totals
-        invoice.subtotal = total_calc
-        invoice.tax_total = tax_calc
-        invoice.grand_total = (total_calc + tax_calc) - discount_amount
-        invoice.save()
 
-        return invoice
+class BulkInvoiceResultSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Invoice
+        fields = ("id", "client_id", "number", "grand_total")
 
 # ============================
 # OTHER SERIALIZERS
@@ -418,7 +396,7 @@ class ExpenseSerializer(serializers.ModelSerializer):
             'amount', 'description', 'date', 'receipt_number',
             'vendor_name', 'created_by', 'created_by_name', 'created_at'
         ]
-        read_only_fields = ['created_by', 'created_at']
+        read_only_fields = ['shop', 'created_by', 'created_at']
 
 class FeedbackSerializer(serializers.ModelSerializer):
     class Meta:
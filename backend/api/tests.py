@@ -0,0 +1,72 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from catalog.models import Product
+from sales.models import Invoice
+from shops.models import Shop
+from .models import IdempotencyKey, UserSubscription
+
+
+class IdempotencyKeyTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.shop = Shop.objects.create(name="Shop", contact_phone="9000000000")
+        self.user = User.objects.create_user(
+            email="owner@example.com", username="owner", password="Passw0rd!",
+            role="SHOP_OWNER", shop=self.shop,
+        )
+        UserSubscription.objects.update_or_create(
+            user=self.user, defaults={"allowed_by_admin": True, "active": True}
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.product = Product.objects.create(shop=self.shop, name="Soap", price=10, quantity=50)
+        self.body = {
+            "customer_name": "Asha",
+            "items": [{"product": self.product.id, "qty": 1, "unit_price": "10.00"}],
+        }
+
+    def post(self, body, key="key-1"):
+        return self.client.post("/api/invoices/", body, format="json", HTTP_IDEMPOTENCY_KEY=key)
+
+    def test_retry_replays_the_first_response(self):
+        first = self.post(self.body)
+        again = self.post(self.body)
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(again.status_code, 201)
+        self.assertEqual(again["Idempotent-Replayed"], "true")
+        self.assertEqual(again.data["id"], first.data["id"])
+        self.assertEqual(Invoice.objects.filter(shop=self.shop).count(), 1)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.quantity, 49)
+
+    def test_same_key_with_a_different_body(self):
+        self.post(self.body)
+        response = self.post({**self.body, "customer_name": "Ravi"})
+
+        self.assertEqual(response.status_code, 422)
+        self.assertEqual(Invoice.objects.filter(shop=self.shop).count(), 1)
+
+    def test_pending_key_conflicts_until_its_lease_expires(self):
+        self.post(self.body)
+        row = IdempotencyKey.objects.get(user=self.user, key="key-1")
+        row.response_status = None
+        row.save()
+        self.assertEqual(self.post(self.body).status_code, 409)
+
+        lease = timedelta(seconds=settings.IDEMPOTENCY_PENDING_LEASE_SECONDS + 1)
+        IdempotencyKey.objects.filter(pk=row.pk).update(created_at=timezone.now() - lease)
+        self.assertEqual(self.post(self.body).status_code, 201)
+
+    def test_failed_request_releases_the_key(self):
+        response = self.post({**self.body, "items": [{"product": 0, "qty": 1, "unit_price": "10.00"}]})
+        self.assertEqual(response.status_code, 400)
+        # A validation error is raised, not returned: the key is free again
+        self.assertEqual(self.post(self.body).status_code, 201)
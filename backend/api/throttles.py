@@ -6,4 +6,8 @@ class ForgotPasswordThrottle(AnonRateThrottle):
 
 class LoginThrottle(AnonRateThrottle):
     rate = '10/hour'
-    scope = 'login'
\ No newline at end of file
+    scope = 'login'
+
+class CheckAvailabilityThrottle(AnonRateThrottle):
+    rate = '60/minute'
+    scope = 'check_availability'
\ No newline at end of file
@@ -0,0 +1,78 @@
+# backend/api/tokens.py
+"""
+Refresh tokens with a cached blacklist check.
+
+simplejwt checks the blacklist with a JOIN query every time a refresh
+token is loaded. With TOKEN_BLACKLIST_CACHE on, the answer is cached per
+jti until the token expires: `bl_<jti>` is True for blacklisted tokens
+and False for ones found clean. Blacklisting overwrites the key, so
+lookups stay O(1) without ever trusting a stale False.
+
+Only enable this with a shared cache (REDIS_URL). With the per-process
+local-memory cache a token blacklisted in one worker would still be
+accepted by the others.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+
+def blacklist_key(jti):
+    return f"bl_{jti}"
+
+
+def _ttl(expires_at):
+    """Seconds until expiry (datetime or epoch); at least one second."""
+    if hasattr(expires_at, "timestamp"):
+        expires_at = expires_at.timestamp()
+    return max(int(expires_at - time.time()), 1)
+
+
+def mark_blacklisted(tokens):
+    """`tokens`: iterable of (jti, expires_at). No-op unless TOKEN_BLACKLIST_CACHE."""
+    if not settings.TOKEN_BLACKLIST_CACHE:
+        return
+    for jti, expires_at in tokens:
+        try:
+            cache.set(blacklist_key(jti), True, timeout=_ttl(expires_at))
+        except Exception:
+            pass
+
+
+class CachedRefreshToken(RefreshToken):
+
+    def check_blacklist(self):
+        if not settings.TOKEN_BLACKLIST_CACHE:
+            return super().check_blacklist()
+
+        jti = self.payload[api_settings.JTI_CLAIM]
+        key = blacklist_key(jti)
+        try:
+            blacklisted = cache.get(key)
+        except Exception:
+            return super().check_blacklist()
+
+        if blacklisted is None:
+            blacklisted = BlacklistedToken.objects.filter(token__jti=jti).exists()
+            try:
+                # add(): never overwrite a True written by a concurrent blacklist()
+                cache.add(key, blacklisted, timeout=_ttl(self.payload["exp"]))
+            except Exception:
+                pass
+        if blacklisted:
+            raise TokenError(_("Token is blacklisted"))
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def cache_blacklisted_token(sender, instance, created, **kwargs):
+    if created:
+        token = instance.token
+        mark_blacklisted([(token.jti, token.expires_at)])
@@ -20,6 +20,7 @@ from .views import (
     ForgotPasswordView,
     StaffViewSet,
     FeedbackViewSet,
+    ExpenseViewSet,
     check_availability,
 )
 
@@ -27,8 +28,9 @@ from .views import (
 from .payment_views import create_order
 
 from .auth_views import CookieTokenObtainPairView, CookieTokenRefreshView, logout_view
-from shops.views import register_shop, TaxProfileViewSet, AdminShopViewSet
+from shops.views import register_shop, TaxProfileViewSet, AdminShopViewSet, AdminShopActivityViewSet, admin_analytics
 from .razorpay_webhook import razorpay_webhook
+from .profiling_views import profile_list, profile_download
 from .payment_views import (
     verify_payment,
     subscription_status,
@@ -62,10 +64,12 @@ router.register(r'quotations', QuotationViewSet, basename='quotation')
 router.register(r'taxprofiles', TaxProfileViewSet, basename='taxprofile')
 router.register(r'shops', ShopViewSet, basename='shop')
 router.register(r'admin/shops', AdminShopViewSet, basename='admin-shops')  # ✅ added
+router.register(r'admin/shop-activity', AdminShopActivityViewSet, basename='admin-shop-activity')
 router.register(r'me', MeViewSet, basename='me')
 router.register(r'reports', ReportsViewSet, basename='reports')
 router.register(r'staff', StaffViewSet, basename='staff')
 router.register(r'feedback', FeedbackViewSet, basename='feedback')
+router.register(r'expenses', ExpenseViewSet, basename='expense')
 
 # --------------------------------------------------------------------
 
@@ -96,6 +100,13 @@ urlpatterns = [
     path("invoices/<int:invoice_id>/pdf/", invoice_pdf, name="invoice-pdf"),
     path("invoices/<int:invoice_id>/whatsapp/", invoice_whatsapp, name="invoice-whatsapp"),  # ✅ added
 
+    # Cross-shop analytics (site admins)
+    path("admin/analytics/", admin_analytics, name="admin-analytics"),
+
+    # Slow request profiles (site admins)
+    path("admin/profiles/", profile_list, name="profile-list"),
+    path("admin/profiles/<path:profile_id>", profile_download, name="profile-download"),
+
     # Subscription check
     path("subscription/check/", check_subscription, name="check-subscription"),
 
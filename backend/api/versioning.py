@@ -0,0 +1,94 @@
+# backend/api/versioning.py
+"""
+Cheap version counters for read-heavy data.
+
+A version is the time (µs) of the last change to a scope, e.g. the shop
+row or the user's subscription. Save/delete signals bump it, so views can
+build an ETag / Last-Modified from one cache round trip without touching
+the database.
+
+Keys expire after VERSION_TIMEOUT, like the subscription check in
+SubscriptionMiddleware: with the per-process local-memory cache a bump in
+one worker is not seen by the others, and the timeout bounds that
+staleness. A missing key is re-seeded with the current time, so versions
+only ever move forward.
+
+Bumps run on commit: bumping inside the transaction would let another
+request cache the pre-commit row under the new version.
+"""
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from shops.models import Shop, TaxProfile
+from .models import SubscriptionPlan, UserSubscription
+
+VERSION_TIMEOUT = 300
+
+User = get_user_model()
+
+
+def version_key(scope, pk=None):
+    return f"ver_{scope}_{pk}" if pk is not None else f"ver_{scope}"
+
+
+def _now():
+    return time.time_ns() // 1000
+
+
+def get_versions(*keys):
+    """Returns the versions for the given version_key()s, in order."""
+    try:
+        found = cache.get_many(keys)
+    except Exception:
+        found = {}
+    missing = {k: _now() for k in keys if k not in found}
+    if missing:
+        try:
+            cache.set_many(missing, timeout=VERSION_TIMEOUT)
+        except Exception:
+            pass
+        found.update(missing)
+    return [found[k] for k in keys]
+
+
+def _set_version(key):
+    try:
+        cache.set(key, _now(), timeout=VERSION_TIMEOUT)
+    except Exception:
+        pass
+
+
+def bump_version(scope, pk=None):
+    key = version_key(scope, pk)
+    transaction.on_commit(lambda: _set_version(key))
+
+
+# ========== SIGNAL RECEIVERS ==========
+@receiver([post_save, post_delete], sender=User)
+def bump_user_version(sender, instance, **kwargs):
+    bump_version("user", instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Shop)
+def bump_shop_version(sender, instance, **kwargs):
+    bump_version("shop", instance.pk)
+
+
+@receiver([post_save, post_delete], sender=TaxProfile)
+def bump_taxprofile_version(sender, instance, **kwargs):
+    bump_version("taxprofile", instance.shop_id)
+
+
+@receiver([post_save, post_delete], sender=SubscriptionPlan)
+def bump_plans_version(sender, instance, **kwargs):
+    bump_version("plans")
+
+
+@receiver([post_save, post_delete], sender=UserSubscription)
+def bump_subscription_version(sender, instance, **kwargs):
+    bump_version("sub", instance.user_id)
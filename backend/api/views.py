@@ -1,4 +1,6 @@
 # backend/api/views.py
+from datetime import timedelta
+from decimal import Decimal
 from django.db import transaction
 from django.db.models import F
 # --- Django Imports ---
@@ -7,20 +9,28 @@ from django.contrib.auth import get_user_model
 from django.shortcuts import get_object_or_404
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes, force_str
+from django.utils.cache import parse_etags, quote_etag
+from django.utils import timezone
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
 from django.db.models import Sum, Count
+from django.db.models.functions import TruncMonth
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
 
 # --- 3rd Party Imports ---
 import razorpay
 from rest_framework import viewsets, generics, permissions, status
-from rest_framework.decorators import api_view, permission_classes, action
+from rest_framework.decorators import api_view, permission_classes, throttle_classes, action
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
-from .pagination import SmallPagination, StandardPagination, LargePagination
-from .throttles import ForgotPasswordThrottle
-from rest_framework.exceptions import PermissionDenied
+from rest_framework.throttling import AnonRateThrottle
+from .pagination import SmallPagination, StandardPagination, LargePagination, ExpenseCursorPagination
+from .conditional import ConditionalGetMixin, conditional_response, hour_bucket
+from .versioning import version_key
+from .throttles import ForgotPasswordThrottle, CheckAvailabilityThrottle
+from .availability import email_taken, mobile_taken
+from .idempotency import idempotent
+from rest_framework.exceptions import PermissionDenied, ValidationError
 
 # --- Local App Imports ---
 # Serializers (from .serializers)
@@ -28,12 +38,17 @@ from .serializers import (
     SubscriptionPlanSerializer,
     RegisterSerializer,
     ProductSerializer,
+    ProductLookupSerializer,
     CustomerSerializer,
+    CustomerLookupSerializer,
     InvoiceSerializer,
+    BulkInvoiceSerializer,
+    BulkInvoiceResultSerializer,
     ShopSerializer,
     PaymentSerializer,
     UserSubscriptionSerializer,
     UserSerializer,
+    ExpenseSerializer,
 )
 
 # Staff serializer import from accounts
@@ -43,20 +58,18 @@ from accounts.serializers import StaffSerializer
 
 @api_view(['POST'])
 @permission_classes([AllowAny])
+# The default anon daily cap stays; the burst throttle only adds a per-minute limit
+@throttle_classes([AnonRateThrottle, CheckAvailabilityThrottle])
 def check_availability(request):
-    from django.contrib.auth import get_user_model
-    User = get_user_model()
-    
     email = (request.data.get('email') or '').strip()
     mobile = (request.data.get('mobile') or '').strip()
     
     if email:
-        if User.objects.filter(email__iexact=email).exists():
+        if email_taken(email):
             return Response({"error": "This email is already registered."}, status=400)
     
     if mobile:
-        from shops.models import Shop
-        if Shop.objects.filter(contact_phone=mobile).exists():
+        if mobile_taken(mobile):
             return Response({"error": "This mobile number is already registered."}, status=400)
             
     return Response({"message": "Available"})
@@ -64,13 +77,20 @@ def check_availability(request):
 # OTP views removed
 
 # Models (from *THIS* app - 'api')
-from .models import SubscriptionPlan, Payment, UserSubscription
-# from .models import Expense # Uncomment if you use Expense in this file
+from .models import SubscriptionPlan, Payment, UserSubscription, Expense
 
 # Models (from *OTHER* apps)
 from catalog.models import Product
+from catalog.search import search_products, DEFAULT_LIMIT, MAX_LIMIT
+from catalog.sync import catalog_version, is_settled, resync_required, snapshot, changes_since
+from catalog.stock import move_stock, record_stock_change
 from customers.models import Customer
+from customers.search import search_customers, DEFAULT_LIMIT as CUSTOMER_LOOKUP_LIMIT, MAX_LIMIT as CUSTOMER_LOOKUP_MAX
 from sales.models import Invoice
+from sales.services import create_invoices
+from reports.rollup import add_sales, sales_lines
+from customers.stats import purchase, record_purchases
+from customers.loyalty import loyalty_balance, reverse_loyalty
 from shops.models import Shop
 
 from .models import Feedback
@@ -90,11 +110,14 @@ class RegisterView(generics.CreateAPIView):
 
 
 # ---------- Subscription ----------
-class SubscriptionPlanViewSet(viewsets.ModelViewSet):
+class SubscriptionPlanViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = SubscriptionPlan.objects.all()
     serializer_class = SubscriptionPlanSerializer
     permission_classes = (permissions.IsAuthenticated,)
 
+    def get_version_keys(self, request):
+        return [version_key("plans")]
+
 
 # ---------- Reports ----------
 class ReportsViewSet(viewsets.ViewSet):
@@ -102,10 +125,10 @@ class ReportsViewSet(viewsets.ViewSet):
 
     @action(detail=False, methods=['get'])
     def sales_summary(self, request):
-        if not request.user.shop:
+        if not request.user.shop_id:
             return Response({"error": "User is not associated with a shop"}, status=400)
 
-        summary = Invoice.objects.filter(shop=request.user.shop).aggregate(
+        summary = Invoice.objects.filter(shop_id=request.user.shop_id).aggregate(
             total_sales=Sum('grand_total'),
             total_invoices=Count('id')
         )
@@ -123,7 +146,8 @@ class ReportsViewSet(viewsets.ViewSet):
 class ShopFilteredViewSet(viewsets.ModelViewSet):
     """
     Base ViewSet that automatically filters querysets by request.user.shop
-    and assigns request.user.shop on creation.
+    and assigns it on creation.
+    Reads filter on shop_id so the shop row itself is never loaded.
     """
     permission_classes = (permissions.IsAuthenticated,)
 
@@ -131,16 +155,16 @@ class ShopFilteredViewSet(viewsets.ModelViewSet):
         user = self.request.user
         base_queryset = super().get_queryset()
 
-        if user.is_authenticated and hasattr(user, 'shop') and user.shop is not None:
-            return base_queryset.filter(shop=user.shop)
+        if user.is_authenticated and getattr(user, 'shop_id', None) is not None:
+            return base_queryset.filter(shop_id=user.shop_id)
 
         return base_queryset.none()
 
     def perform_create(self, serializer):
-        if hasattr(self.request.user, 'shop') and self.request.user.shop is not None:
-            serializer.save(shop=self.request.user.shop)
+        if getattr(self.request.user, 'shop_id', None) is not None:
+            serializer.save(shop_id=self.request.user.shop_id)
         else:
-            raise permissions.ValidationError("You are not associated with a shop and cannot create this object.")
+            raise ValidationError("You are not associated with a shop and cannot create this object.")
 
 
 # ---------- Standard CRUD (FIXED with Filtering) ----------
@@ -154,10 +178,142 @@ class ProductViewSet(ShopFilteredViewSet):
     ordering_fields = ['name', 'price', 'quantity', 'updated_at']
     ordering = ['name']
 
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        record_stock_change(serializer.instance, 0, 'RESTOCK', 'Opening stock', self.request.user)
+
+    def perform_update(self, serializer):
+        before = serializer.instance.quantity
+        serializer.save()
+        product = serializer.instance
+        action = 'RESTOCK' if product.quantity > before else 'ADJUSTMENT'
+        record_stock_change(product, before, action, 'Product edit', self.request.user)
+
+    @action(detail=False, methods=['get'])
+    def lookup(self, request):
+        """
+        Billing screen search — ?q=<name | SKU | barcode>&limit=20
+        Returns the best matches only: no pagination, no COUNT.
+        """
+        if not request.user.shop_id:
+            return Response({"results": [], "exact": False})
+
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', DEFAULT_LIMIT)), MAX_LIMIT))
+        except ValueError:
+            limit = DEFAULT_LIMIT
+
+        products, exact = search_products(request.user.shop_id, request.query_params.get('q'), limit)
+        return Response({
+            "results": ProductLookupSerializer(products, many=True).data,
+            "exact": exact,
+        })
+
+    @action(detail=False, methods=['get'])
+    def snapshot(self, request):
+        """
+        Whole active catalog, columnar, for clients that search locally.
+        Send the ETag back as If-None-Match to get a 304 when nothing changed.
+        No ETag while the latest change is recent: a write still committing
+        could land behind it without changing the version.
+        """
+        shop_id = request.user.shop_id
+        if not shop_id:
+            return Response({"error": "User is not associated with a shop"}, status=400)
+
+        version = catalog_version(shop_id)
+        headers = {"Cache-Control": "private, no-cache"}
+        if is_settled(version):
+            etag = quote_etag(f"catalog-{shop_id}-{version}")
+            etags = parse_etags(request.headers.get('If-None-Match', ''))
+            if etag in etags or '*' in etags:
+                return Response(status=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+            headers["ETag"] = etag
+        return Response(snapshot(shop_id, version), headers=headers)
+
+    @action(detail=False, methods=['get'])
+    def changes(self, request):
+        """
+        Products changed since a snapshot/changes `version` — ?since=<version>
+        Apply `columns` as upserts by id and drop the ids in `removed`.
+        410 with "resync": true when `since` predates the kept tombstones:
+        download a new snapshot instead.
+        """
+        shop_id = request.user.shop_id
+        if not shop_id:
+            return Response({"error": "User is not associated with a shop"}, status=400)
+        try:
+            since = int(request.query_params['since'])
+        except (KeyError, ValueError):
+            return Response({"error": "'since' must be a catalog version"}, status=400)
+        if resync_required(since):
+            return Response(
+                {"error": "Catalog version too old, download a new snapshot.", "resync": True},
+                status=status.HTTP_410_GONE,
+            )
+
+        return Response(changes_since(shop_id, since, catalog_version(shop_id)))
+
 class CustomerViewSet(ShopFilteredViewSet):
+    """
+    ?ordering=-lifetime_spend (top customers), -visit_count, -average_basket,
+    last_purchase_at; ?lapsed_days=N — no purchase in the last N days.
+    """
     queryset = Customer.objects.all()
     serializer_class = CustomerSerializer
-    pagination_class = StandardPagination  
+    pagination_class = StandardPagination
+    filter_backends = [OrderingFilter]
+    ordering_fields = ['name', 'visit_count', 'lifetime_spend', 'average_basket', 'last_purchase_at']
+    ordering = ['name']
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        lapsed_days = self.request.query_params.get('lapsed_days')
+        if lapsed_days:
+            try:
+                cutoff = timezone.now() - timedelta(days=int(lapsed_days))
+            except ValueError:
+                raise ValidationError({"lapsed_days": "Must be a number of days."})
+            # Customers who bought before, but not since the cutoff
+            queryset = queryset.filter(last_purchase_at__lt=cutoff)
+        return queryset
+
+    @action(detail=False, methods=['get'])
+    def lookup(self, request):
+        """
+        Billing screen autocomplete — ?q=<mobile prefix | name>&limit=10
+        Returns the best matches with their purchase statistics; no pagination, no COUNT.
+        """
+        if not request.user.shop_id:
+            return Response({"results": []})
+
+        try:
+            limit = max(1, min(
+                int(request.query_params.get('limit', CUSTOMER_LOOKUP_LIMIT)), CUSTOMER_LOOKUP_MAX,
+            ))
+        except ValueError:
+            limit = CUSTOMER_LOOKUP_LIMIT
+
+        customers = search_customers(request.user.shop_id, request.query_params.get('q'), limit)
+        return Response({"results": CustomerLookupSerializer(customers, many=True).data})
+
+    @action(detail=True, methods=['get'])
+    def loyalty(self, request, pk=None):
+        """
+        Billing screen — points balance and its value, served from the cache
+        (customers/loyalty.py); no account yet reads as zero points.
+        """
+        try:
+            balance = loyalty_balance(request.user.shop_id, int(pk))
+        except ValueError:
+            balance = None
+        if balance is None:
+            return Response({"error": "Customer not found"}, status=status.HTTP_404_NOT_FOUND)
+        return Response(balance)
+
+
+# Invoices accepted by one POST /api/invoices/bulk/
+BULK_INVOICE_LIMIT = 200
 
 
 class InvoiceViewSet(ShopFilteredViewSet):
@@ -167,21 +323,65 @@ class InvoiceViewSet(ShopFilteredViewSet):
 
     def get_queryset(self):              # ✅ fix indent — should be 4 spaces
         return Invoice.objects.filter(   # ✅ not 8 spaces
-            shop=self.request.user.shop
+            shop_id=self.request.user.shop_id
         ).select_related(
             'customer', 'created_by', 'shop'
         ).prefetch_related(
             'items__product'
         ).order_by('-invoice_date')
 
+    @idempotent
+    def create(self, request, *args, **kwargs):
+        # Retries with the same Idempotency-Key replay the first response
+        # instead of taking another invoice number and deducting stock again
+        return super().create(request, *args, **kwargs)
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """
+        Offline sync — {"invoices": [{..., "client_id": "<uuid>"}, ...]}.
+        Valid entries are written together; each gets a result in request
+        order: "created", "exists" (client_id already synced) or "error".
+        """
+        if not request.user.shop_id:
+            return Response({"error": "User is not associated with a shop"}, status=400)
+
+        entries = request.data.get('invoices') if isinstance(request.data, dict) else None
+        if not isinstance(entries, list) or not entries:
+            return Response({"error": "'invoices' must be a non-empty list."}, status=400)
+        if len(entries) > BULK_INVOICE_LIMIT:
+            return Response({"error": f"At most {BULK_INVOICE_LIMIT} invoices per request."}, status=400)
+
+        results = [None] * len(entries)
+        valid = []
+        context = self.get_serializer_context()
+        for index, data in enumerate(entries):
+            serializer = BulkInvoiceSerializer(data=data, context=context)
+            if serializer.is_valid():
+                valid.append((index, serializer.validated_data))
+            else:
+                client_id = data.get('client_id') if isinstance(data, dict) else None
+                results[index] = {"status": "error", "client_id": client_id, "errors": serializer.errors}
+
+        written = create_invoices(request.user.shop_id, request.user, [v for _, v in valid])
+        for (index, data), result in zip(valid, written):
+            if result.errors:
+                results[index] = {"status": "error", "client_id": str(data['client_id']), "errors": result.errors}
+            else:
+                results[index] = {
+                    "status": "created" if result.created else "exists",
+                    **BulkInvoiceResultSerializer(result.invoice).data,
+                }
+
+        return Response({"results": results})
+
     @transaction.atomic
     def perform_create(self, serializer):
         user = self.request.user
-        shop = user.shop
 
         # Serializer.create now handles stock deduction and totals calculation
         serializer.save(
-            shop=shop,
+            shop_id=user.shop_id,
             created_by=user
         )
 
@@ -193,10 +393,15 @@ class InvoiceViewSet(ShopFilteredViewSet):
         
         # 1. Revert stock (Only for INVOICES)
         if invoice.invoice_type == 'INVOICE':
-            for item in invoice.items.all():
-                Product.objects.filter(id=item.product_id, shop=shop).update(
-                    quantity=F('quantity') + item.qty
-                )
+            move_stock(
+                [(item.product_id, item.qty, invoice.number)
+                 for item in invoice.items.all() if item.product_id],
+                'RETURN',
+                user=request.user,
+            )
+        add_sales(sales_lines(invoice.items.all(), sign=-1))
+        record_purchases([purchase(invoice, sign=-1)])
+        reverse_loyalty(invoice)
         
         # 2. Identify the sequence number of the deleted invoice
         try:
@@ -209,9 +414,9 @@ class InvoiceViewSet(ShopFilteredViewSet):
         invoice.delete()
 
         # 3. Decrement shop counter
+        # (.update() — a full save() would also bump the shop context version)
         if shop.counter_invoice > 0:
-            shop.counter_invoice = F('counter_invoice') - 1
-            shop.save()
+            Shop.objects.filter(id=shop.id).update(counter_invoice=F('counter_invoice') - 1)
 
         # 4. Renumber subsequent invoices
         subsequent_invoices = Invoice.objects.filter(shop=shop).order_by('id')
@@ -240,7 +445,7 @@ class QuotationViewSet(ShopFilteredViewSet):
 
     def get_queryset(self):
         return Invoice.objects.filter(
-            shop=self.request.user.shop,
+            shop_id=self.request.user.shop_id,
             invoice_type='QUOTATION'
         ).select_related(
             'customer', 'created_by', 'shop'
@@ -248,23 +453,34 @@ class QuotationViewSet(ShopFilteredViewSet):
             'items__product'
         ).order_by('-invoice_date')
 
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['invoice_type'] = 'QUOTATION'
+        return context
+
     @transaction.atomic
     def perform_create(self, serializer):
         # Force invoice_type to QUOTATION even if sent otherwise
         serializer.save(
-            shop=self.request.user.shop,
+            shop_id=self.request.user.shop_id,
             created_by=self.request.user,
             invoice_type='QUOTATION'
         )
-class ShopViewSet(viewsets.ModelViewSet):
+class ShopViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = Shop.objects.all()
     serializer_class = ShopSerializer
     permission_classes = (permissions.IsAuthenticated,)
 
+    def get_version_keys(self, request):
+        # The queryset follows user.shop, so a reassigned user changes it too;
+        # the payload embeds the shop's plan
+        user = request.user
+        return [version_key("user", user.pk), version_key("shop", user.shop_id), version_key("plans")]
+
     def get_queryset(self):
         user = self.request.user
-        if user.is_authenticated and hasattr(user, 'shop') and user.shop is not None:
-            return Shop.objects.filter(id=user.shop.id)
+        if user.is_authenticated and user.shop_id is not None:
+            return Shop.objects.filter(id=user.shop_id)
         return Shop.objects.none()
 
     def perform_update(self, serializer):
@@ -280,8 +496,8 @@ class StaffViewSet(viewsets.ModelViewSet):
     permission_classes = (permissions.IsAuthenticated,)
 
     def get_queryset(self):
-        if hasattr(self.request.user, 'shop') and self.request.user.shop:
-            return User.objects.filter(shop=self.request.user.shop).exclude(id=self.request.user.id)
+        if getattr(self.request.user, 'shop_id', None):
+            return User.objects.filter(shop_id=self.request.user.shop_id).exclude(id=self.request.user.id)
         return User.objects.none()
 
     def perform_create(self, serializer):
@@ -290,17 +506,17 @@ class StaffViewSet(viewsets.ModelViewSet):
         if user.role not in ['SHOP_OWNER', 'SITE_ADMIN']:
             raise PermissionDenied("Only shop owners can create staff.")
 
-        if not user.shop:
+        if not user.shop_id:
             raise PermissionDenied("You are not associated with a shop.")
 
         role = serializer.validated_data.get('role', 'SHOPKEEPER')
         if role == 'SITE_ADMIN':
             raise PermissionDenied("Cannot create Site Admin via this endpoint.")
 
-        serializer.save(shop=user.shop)
+        serializer.save(shop_id=user.shop_id)
 
     def perform_destroy(self, instance):
-        if instance.shop != self.request.user.shop:
+        if instance.shop_id != self.request.user.shop_id:
             raise PermissionDenied("Cannot delete staff from another shop.")
         instance.delete()
 
@@ -311,6 +527,15 @@ class MeViewSet(viewsets.ViewSet):
 
     def list(self, request):
         user = request.user
+        # The shop payload embeds active_subscription, which follows the
+        # plans and the user's subscription
+        keys = [
+            version_key("user", user.pk), version_key("shop", user.shop_id),
+            version_key("plans"), version_key("sub", user.pk),
+        ]
+        return conditional_response(request, keys, lambda: self._me(user))
+
+    def _me(self, user):
         user_data = UserSerializer(user).data
 
         shop_data = None
@@ -334,6 +559,13 @@ razorpay_client = razorpay.Client(auth=(RAZORPAY_KEY_ID, RAZORPAY_KEY_SECRET))
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def check_subscription(request):
+    keys = [version_key("sub", request.user.pk), version_key("plans")]
+    return conditional_response(
+        request, keys, lambda: _check_subscription(request), extra=(hour_bucket(),)
+    )
+
+
+def _check_subscription(request):
     subscription, created = UserSubscription.objects.get_or_create(user=request.user)
     if created:
         subscription.start_trial()
@@ -403,6 +635,58 @@ class ResetPasswordView(APIView):
         return Response({"message": "Password reset successful."}, status=200)
 
 
+# ---------- Expenses ----------
+class ExpenseViewSet(ShopFilteredViewSet):
+    """
+    ?date__gte=YYYY-MM-DD&date__lte=YYYY-MM-DD&category=RENT
+    Newest first, in keyset pages (?cursor=) on the (shop, date) index.
+    """
+    queryset = Expense.objects.select_related('created_by')
+    serializer_class = ExpenseSerializer
+    pagination_class = ExpenseCursorPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = {'date': ['gte', 'lte'], 'category': ['exact']}
+
+    # group -> (annotation, key column)
+    SUMMARY_GROUPS = {
+        'category': ({}, 'category'),
+        'day': ({}, 'date'),
+        'month': ({'month': TruncMonth('date')}, 'month'),
+    }
+
+    def perform_create(self, serializer):
+        if not self.request.user.shop_id:
+            raise ValidationError("You are not associated with a shop and cannot create this object.")
+        serializer.save(shop_id=self.request.user.shop_id, created_by=self.request.user)
+
+    @action(detail=False, methods=['get'])
+    def summary(self, request):
+        """
+        Totals per ?group=category|day|month over the same filters as the list,
+        one grouped query.
+        """
+        group = request.query_params.get('group', 'category')
+        if group not in self.SUMMARY_GROUPS:
+            raise ValidationError({"group": f"One of: {', '.join(self.SUMMARY_GROUPS)}."})
+        annotation, key = self.SUMMARY_GROUPS[group]
+
+        rows = list(
+            self.filter_queryset(self.get_queryset())
+            .annotate(**annotation).values(key)
+            .annotate(amount=Sum('amount'), count=Count('id'))
+            .order_by(key)
+        )
+        for row in rows:
+            row['amount'] = row['amount'].quantize(Decimal('0.01'))
+        if group == 'category':
+            rows.sort(key=lambda row: row['amount'], reverse=True)
+        return Response({
+            "group": group,
+            "total": sum((row['amount'] for row in rows), Decimal('0.00')),
+            "rows": rows,
+        })
+
+
 class FeedbackViewSet(viewsets.ModelViewSet):
     queryset = Feedback.objects.all()
     serializer_class = FeedbackSerializer
@@ -0,0 +1,166 @@
+# backend/api/webhooks.py
+"""
+Razorpay webhook inbox.
+
+receive(): the endpoint verifies the signature and appends the raw event to
+WebhookEvent with ONE `INSERT ... ON CONFLICT DO NOTHING` on the event id,
+then acknowledges. Razorpay redelivers until it gets a 2xx and retries in
+storms; a redelivered event costs one no-op insert.
+
+process_pending(): the worker (manage.py process_webhooks) applies due
+events oldest first, each in its own transaction together with marking it
+processed. Events of one order apply in the order received: an event waits
+while an older one for the same order is still pending. A failing event is
+retried with exponential backoff and marked FAILED after
+WEBHOOK_MAX_ATTEMPTS; a FAILED event no longer holds back its order.
+"""
+import hashlib
+import hmac
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from .models import Payment, UserSubscription, WebhookEvent
+
+logger = logging.getLogger(__name__)
+
+MAX_BACKOFF = timedelta(hours=6)
+
+
+class RetryLater(Exception):
+    """The event cannot be applied yet, e.g. its payment row is not committed."""
+
+
+def valid_signature(body, signature):
+    secret = settings.RAZORPAY_WEBHOOK_SECRET
+    if not secret or not signature:
+        return False
+    expected = hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature)
+
+
+def _order_id(payload):
+    entities = payload.get("payload") or {}
+    for name in ("payment", "order"):
+        entity = (entities.get(name) or {}).get("entity") or {}
+        order_id = entity.get("order_id") if name == "payment" else entity.get("id")
+        if order_id:
+            return order_id
+    return ""
+
+
+def receive(body, payload, event_id=None):
+    """Appends the event unless its id was seen before."""
+    # Razorpay sends X-Razorpay-Event-Id; fall back to the body's digest
+    event_id = event_id or hashlib.sha256(body).hexdigest()
+    WebhookEvent.objects.bulk_create(
+        [WebhookEvent(
+            event_id=event_id,
+            event=str(payload.get("event") or "")[:60],
+            order_id=_order_id(payload),
+            payload=payload,
+        )],
+        ignore_conflicts=True,
+    )
+
+
+# ========== HANDLERS ==========
+def _payment_entity(payload):
+    return payload["payload"]["payment"]["entity"]
+
+
+def payment_captured(payload):
+    entity = _payment_entity(payload)
+    try:
+        payment = (
+            Payment.objects.select_for_update().select_related("user", "plan")
+            .get(order_id=entity.get("order_id"))
+        )
+    except Payment.DoesNotExist:
+        raise RetryLater(f"No payment for order {entity.get('order_id')}")
+    # verify_payment may have activated it already
+    if payment.status == "SUCCESS":
+        return
+    payment.payment_id = entity.get("id")
+    payment.status = "SUCCESS"
+    payment.save()
+    subscription, _ = UserSubscription.objects.get_or_create(user=payment.user)
+    subscription.activate_plan(payment.plan)
+
+
+def payment_failed(payload):
+    entity = _payment_entity(payload)
+    # Never overwrites a success
+    Payment.objects.filter(order_id=entity.get("order_id")).exclude(status="SUCCESS").update(
+        status="FAILED", updated_at=timezone.now(),
+    )
+
+
+HANDLERS = {
+    "payment.captured": payment_captured,
+    "payment.failed": payment_failed,
+}
+
+
+# ========== WORKER ==========
+def backoff(attempts):
+    return min(timedelta(minutes=2 ** attempts), MAX_BACKOFF)
+
+
+def due_events(now=None):
+    """Pending events that are due and not waiting behind an older event of their order."""
+    now = now or timezone.now()
+    older_pending = WebhookEvent.objects.filter(
+        status="PENDING", order_id=OuterRef("order_id"), id__lt=OuterRef("id"),
+    ).exclude(order_id="")
+    return (
+        WebhookEvent.objects.filter(status="PENDING", next_attempt_at__lte=now)
+        .exclude(Exists(older_pending))
+        .order_by("next_attempt_at", "id")
+    )
+
+
+def process_event(event_id):
+    """Applies one event; returns its new status, or None if another worker took it."""
+    with transaction.atomic():
+        event = (
+            WebhookEvent.objects.select_for_update(skip_locked=True)
+            .filter(id=event_id, status="PENDING").first()
+        )
+        if event is None:
+            return None
+        handler = HANDLERS.get(event.event)
+        try:
+            # Savepoint: a failing handler rolls back its own writes only
+            with transaction.atomic():
+                if handler:
+                    handler(event.payload)
+        except Exception as exc:
+            event.attempts += 1
+            event.last_error = f"{type(exc).__name__}: {exc}"[:2000]
+            if event.attempts >= settings.WEBHOOK_MAX_ATTEMPTS:
+                event.status = "FAILED"
+                logger.error("Webhook %s failed for good: %s", event.event_id, event.last_error)
+            else:
+                event.next_attempt_at = timezone.now() + backoff(event.attempts)
+            event.save(update_fields=["attempts", "last_error", "status", "next_attempt_at"])
+            return event.status
+
+        event.status = "PROCESSED"
+        event.processed_at = timezone.now()
+        event.save(update_fields=["status", "processed_at"])
+        return event.status
+
+
+def process_pending(limit=100):
+    """Processes up to `limit` due events; returns {status: count}."""
+    counts = {}
+    for event_id in due_events().values_list("id", flat=True)[:limit]:
+        status = process_event(event_id)
+        if status:
+            counts[status] = counts.get(status, 0) + 1
+    return counts
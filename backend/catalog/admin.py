@@ -1,11 +1,40 @@
 # backend/catalog/admin.py
 from django.contrib import admin
-from .models import Product
+from api.admin_pagination import LargeTableAdminMixin, shop_filter_link
+from .models import Product, StockHistory
+from .stock import record_stock_change
 
 @admin.register(Product)
-class ProductAdmin(admin.ModelAdmin):
-    list_display = ('name', 'shop', 'price', 'quantity', 'is_active', 'updated_at')
-    list_filter = ('shop', 'is_active', 'unit')
-    search_fields = ('name', 'sku', 'shop__name')
+class ProductAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = ('name', shop_filter_link, 'price', 'quantity', 'is_active', 'updated_at')
+    list_filter = ('is_active', 'unit')
+    search_fields = ('name', '^sku')
     list_editable = ('price', 'quantity', 'is_active')
-    raw_id_fields = ('shop',)
\ No newline at end of file
+    list_select_related = ('shop',)
+    autocomplete_fields = ('shop',)
+
+    def save_model(self, request, obj, form, change):
+        before = form.initial.get('quantity', 0) if change else 0
+        super().save_model(request, obj, form, change)
+        record_stock_change(obj, before or 0, 'ADJUSTMENT', 'Admin edit', request.user)
+
+
+@admin.register(StockHistory)
+class StockHistoryAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    """Read-only: the ledger is append-only."""
+    list_display = ('created_at', 'product', 'action', 'quantity_change',
+                    'quantity_before', 'quantity_after', 'reference', 'created_by')
+    list_filter = ('action',)
+    search_fields = ('reference', 'product__name')
+    raw_id_fields = ('product', 'created_by')
+    list_select_related = ('product', 'created_by')
+    date_hierarchy = 'created_at'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
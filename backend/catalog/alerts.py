@@ -0,0 +1,35 @@
+# backend/catalog/alerts.py
+"""
+Low-stock alerts.
+
+Thresholds are evaluated only for the products a stock movement touched,
+from the before/after quantities catalog.stock already has, so no extra
+query is needed to find them. A product alerts once when it falls to or
+below its low_stock_threshold; it alerts again only after going back
+above it. Alerts are queued in LowStockAlert (same transaction as the
+stock change) and only for shops with config.low_stock_alert on.
+"""
+from .models import LowStockAlert
+
+
+def crossed_threshold(before, after, threshold):
+    return before > threshold >= after
+
+
+def queue_low_stock_alerts(crossings):
+    """crossings: iterable of (shop_id, product_id, quantity, threshold)."""
+    from shops.context import get_shop_context
+
+    enabled = {}
+    alerts = []
+    for shop_id, product_id, quantity, threshold in crossings:
+        if shop_id not in enabled:
+            context = get_shop_context(shop_id)
+            enabled[shop_id] = bool(context and context.config.get("low_stock_alert"))
+        if enabled[shop_id]:
+            alerts.append(LowStockAlert(
+                shop_id=shop_id, product_id=product_id, quantity=quantity, threshold=threshold,
+            ))
+    if alerts:
+        LowStockAlert.objects.bulk_create(alerts)
+    return alerts
@@ -4,3 +4,12 @@ from django.apps import AppConfig
 class CatalogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'catalog'
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+        from django.db.models.signals import post_migrate
+        from .search import set_trigram_threshold, ensure_sqlite_fts
+        from . import signals  # noqa: F401
+
+        connection_created.connect(set_trigram_threshold, dispatch_uid='catalog_trigram_threshold')
+        post_migrate.connect(ensure_sqlite_fts, sender=self, dispatch_uid='catalog_sqlite_fts')
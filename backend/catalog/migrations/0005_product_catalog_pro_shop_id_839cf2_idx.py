@@ -0,0 +1,18 @@
+# Generated by Django 6.0.3 on 2026-10-19 15:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0004_alter_product_unit'),
+        ('shops', '0008_shop_counter_quotation'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['shop', 'sku'], name='catalog_pro_shop_id_839cf2_idx'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Product name search index for the billing screen lookup (PostgreSQL only).
+# On SQLite the FTS5 table and its triggers are (re)created on post_migrate
+# by catalog.search.ensure_sqlite_fts, because SQLite drops triggers every
+# time a migration rebuilds catalog_product.
+
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS btree_gin")
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS catalog_product_name_trgm "
+        "ON catalog_product USING gin (shop_id, lower(name) gin_trgm_ops) WHERE is_active"
+    )
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS catalog_product_name_prefix "
+        "ON catalog_product (shop_id, lower(name) text_pattern_ops) WHERE is_active"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS catalog_product_name_trgm")
+    schema_editor.execute("DROP INDEX IF EXISTS catalog_product_name_prefix")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0005_product_catalog_pro_shop_id_839cf2_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
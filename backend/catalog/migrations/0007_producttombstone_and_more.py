@@ -0,0 +1,36 @@
+# Generated by Django 6.0.3 on 2026-10-19 15:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0006_product_search_index'),
+        ('shops', '0008_shop_counter_quotation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('product_id', models.BigIntegerField()),
+                ('deleted_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['shop', 'updated_at'], name='catalog_pro_shop_id_26abd0_idx'),
+        ),
+        migrations.AddField(
+            model_name='producttombstone',
+            name='shop',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='product_tombstones', to='shops.shop'),
+        ),
+        migrations.AddIndex(
+            model_name='producttombstone',
+            index=models.Index(fields=['shop', 'deleted_at'], name='catalog_pro_shop_id_e18589_idx'),
+        ),
+    ]
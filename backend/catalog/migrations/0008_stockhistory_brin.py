@@ -0,0 +1,31 @@
+# StockHistory is append-only and created_at grows with the row id, so on
+# PostgreSQL a BRIN index covers time-range scans for a few pages instead of
+# a btree that every ledger insert would have to maintain.
+
+from django.db import migrations
+
+
+def create_brin_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS catalog_stockhistory_created_brin "
+        "ON catalog_stockhistory USING brin (created_at) WITH (pages_per_range = 32)"
+    )
+
+
+def drop_brin_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS catalog_stockhistory_created_brin")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0007_producttombstone_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_brin_index, drop_brin_index),
+    ]
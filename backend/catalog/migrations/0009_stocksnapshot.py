@@ -0,0 +1,53 @@
+# Generated by Django 6.0.3 on 2026-10-19 15:38
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# Ledger reads are "rows of a product in a time range"; on PostgreSQL the
+# index also carries quantity_change so the sums never touch the heap.
+LEDGER_INDEX = {
+    'postgresql': (
+        "CREATE INDEX IF NOT EXISTS catalog_stockhistory_product_created "
+        "ON catalog_stockhistory (product_id, created_at) INCLUDE (quantity_change, action)"
+    ),
+    'default': (
+        "CREATE INDEX IF NOT EXISTS catalog_stockhistory_product_created "
+        "ON catalog_stockhistory (product_id, created_at)"
+    ),
+}
+
+
+def create_ledger_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    schema_editor.execute(LEDGER_INDEX.get(vendor, LEDGER_INDEX['default']))
+
+
+def drop_ledger_index(apps, schema_editor):
+    schema_editor.execute("DROP INDEX IF EXISTS catalog_stockhistory_product_created")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0008_stockhistory_brin'),
+        ('shops', '0009_shop_shops_shop_contact_7e5a43_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('snapshot_date', models.DateField()),
+                ('taken_at', models.DateTimeField()),
+                ('quantity', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_snapshots', to='catalog.product')),
+                ('shop', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_snapshots', to='shops.shop')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['shop', 'snapshot_date'], name='catalog_sto_shop_id_6e918c_idx')],
+                'constraints': [models.UniqueConstraint(fields=('product', 'snapshot_date'), name='catalog_stocksnapshot_product_date')],
+            },
+        ),
+        migrations.RunPython(create_ledger_index, drop_ledger_index),
+    ]
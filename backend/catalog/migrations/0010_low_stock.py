@@ -0,0 +1,43 @@
+# Generated by Django 6.0.3 on 2026-10-19 15:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0009_stocksnapshot'),
+        ('shops', '0009_shop_shops_shop_contact_7e5a43_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LowStockAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('threshold', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('is_active', True), ('quantity__lte', models.F('low_stock_threshold'))), fields=['shop', 'name'], name='catalog_product_low_stock'),
+        ),
+        migrations.AddField(
+            model_name='lowstockalert',
+            name='product',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='low_stock_alerts', to='catalog.product'),
+        ),
+        migrations.AddField(
+            model_name='lowstockalert',
+            name='shop',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='low_stock_alerts', to='shops.shop'),
+        ),
+        migrations.AddIndex(
+            model_name='lowstockalert',
+            index=models.Index(condition=models.Q(('sent_at__isnull', True)), fields=['created_at'], name='catalog_lowstockalert_unsent'),
+        ),
+    ]
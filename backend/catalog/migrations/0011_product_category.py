@@ -0,0 +1,23 @@
+# Generated by Django 6.0.3 on 2026-10-19 15:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0010_low_stock'),
+        ('shops', '0009_shop_shops_shop_contact_7e5a43_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='category',
+            field=models.CharField(blank=True, max_length=60),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['shop', 'category'], name='catalog_pro_shop_id_e6a2bb_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 6.0.3 on 2026-10-19 15:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('catalog', '0011_product_category'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='hsn_code',
+            field=models.CharField(blank=True, max_length=8),
+        ),
+    ]
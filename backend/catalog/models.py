@@ -5,6 +5,8 @@ class Product(models.Model):
     name = models.CharField(max_length=140)
     sku = models.CharField(max_length=64, blank=True)
     unit = models.CharField(max_length=20, default='pcs')
+    category = models.CharField(max_length=60, blank=True)
+    hsn_code = models.CharField(max_length=8, blank=True)   # HSN/SAC, for GST returns
     price = models.DecimalField(max_digits=10, decimal_places=2)
     cost_price = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     tax_rate = models.DecimalField(max_digits=4, decimal_places=1, default=0)
@@ -16,12 +18,36 @@ class Product(models.Model):
         indexes = [
             models.Index(fields=['shop', 'is_active']),
             models.Index(fields=['shop', 'name']),
+            models.Index(fields=['shop', 'sku']),
+            models.Index(fields=['shop', 'updated_at']),
+            models.Index(fields=['shop', 'category']),
+            # Low-stock listing reads only this (small) partial index
+            models.Index(
+                fields=['shop', 'name'],
+                condition=models.Q(is_active=True, quantity__lte=models.F('low_stock_threshold')),
+                name='catalog_product_low_stock',
+            ),
         ]
         
     def __str__(self):
         return self.name
 
 
+# Deleted products, so catalog delta sync can tell clients what to drop
+class ProductTombstone(models.Model):
+    shop = models.ForeignKey('shops.Shop', on_delete=models.CASCADE, related_name='product_tombstones')
+    product_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['shop', 'deleted_at']),
+        ]
+
+    def __str__(self):
+        return f"Deleted product {self.product_id}"
+
+
 # ✅ Add this below — don't touch anything above
 class StockHistory(models.Model):
     ACTION_CHOICES = [
@@ -40,4 +66,61 @@ class StockHistory(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        ordering = ['-created_at']
\ No newline at end of file
+        ordering = ['-created_at']
+        # PostgreSQL: BRIN index on created_at (migration 0008).
+        # (product, created_at), covering quantity_change on PostgreSQL (migration 0009).
+
+    def save(self, *args, **kwargs):
+        # Append-only ledger — corrections are new ADJUSTMENT rows
+        if not self._state.adding:
+            raise ValueError("StockHistory rows cannot be changed.")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise ValueError("StockHistory rows cannot be deleted.")
+
+    def __str__(self):
+        return f"{self.action} {self.quantity_change} of {self.product_id}"
+
+
+# Nightly copy of every product's quantity (manage.py snapshot_stock), so
+# point-in-time stock reports add up ledger rows since the last snapshot
+# instead of replaying the whole history.
+class StockSnapshot(models.Model):
+    shop = models.ForeignKey('shops.Shop', on_delete=models.CASCADE, related_name='stock_snapshots')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='stock_snapshots')
+    snapshot_date = models.DateField()
+    taken_at = models.DateTimeField()       # ledger rows after this are not included
+    quantity = models.DecimalField(max_digits=12, decimal_places=2)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'snapshot_date'], name='catalog_stocksnapshot_product_date'),
+        ]
+        indexes = [
+            models.Index(fields=['shop', 'snapshot_date']),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} on {self.snapshot_date}: {self.quantity}"
+
+
+# Outbox: products that just fell to or below their low_stock_threshold in a
+# shop with config.low_stock_alert on. Written in the same transaction as the
+# stock change; sent by manage.py send_low_stock_alerts.
+class LowStockAlert(models.Model):
+    shop = models.ForeignKey('shops.Shop', on_delete=models.CASCADE, related_name='low_stock_alerts')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='low_stock_alerts')
+    quantity = models.DecimalField(max_digits=12, decimal_places=2)
+    threshold = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at'], condition=models.Q(sent_at__isnull=True),
+                         name='catalog_lowstockalert_unsent'),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} at {self.quantity} (threshold {self.threshold})"
@@ -0,0 +1,216 @@
+# backend/catalog/search.py
+"""
+Product lookup for the billing screen.
+
+Each keystroke runs at most two indexed queries and never counts:
+
+1. Exact SKU / barcode match on the (shop, sku) index.
+2. Name search on a dedicated index:
+   - PostgreSQL: pg_trgm GIN index on lower(name) for typo-tolerant
+     matching, plus a text_pattern_ops btree for short prefixes
+     (catalog migration 0006).
+   - SQLite (dev): FTS5 table kept in sync by triggers.
+   - Anything else: plain istartswith.
+"""
+import difflib
+import re
+
+from django.db import connection
+
+from .models import Product
+
+LOOKUP_FIELDS = ("id", "name", "sku", "price", "tax_rate", "quantity", "unit")
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 50
+
+# Trigram searches need at least this many characters to be selective
+MIN_TRIGRAM_LENGTH = 3
+# Lower than the pg_trgm default (0.6) so one typo in a short word still matches
+WORD_SIMILARITY_THRESHOLD = 0.4
+# SQLite typo fallback: candidates to score in Python, and the minimum ratio
+FUZZY_CANDIDATES = 300
+FUZZY_MIN_RATIO = 0.6
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+_COLUMNS = ", ".join(f"p.{f}" for f in LOOKUP_FIELDS)
+
+
+def search_products(shop_id, term, limit=DEFAULT_LIMIT):
+    """
+    Returns (products, exact) — up to `limit` active products of the shop,
+    best match first. `exact` is True when the term is a SKU/barcode.
+    """
+    term = (term or "").strip()
+    if not term:
+        return [], False
+
+    exact = list(
+        Product.objects.filter(shop_id=shop_id, sku=term, is_active=True)
+        .only(*LOOKUP_FIELDS)[:1]
+    )
+    if exact:
+        return exact, True
+
+    if connection.vendor == "postgresql":
+        return _search_postgres(shop_id, term, limit), False
+    if connection.vendor == "sqlite" and _has_sqlite_fts():
+        return _search_sqlite(shop_id, term, limit), False
+    return list(
+        Product.objects.filter(shop_id=shop_id, is_active=True, name__istartswith=term)
+        .only(*LOOKUP_FIELDS).order_by("name")[:limit]
+    ), False
+
+
+def _like_prefix(term):
+    escaped = term.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return escaped + "%"
+
+
+# ========== POSTGRESQL ==========
+def _search_postgres(shop_id, term, limit):
+    prefix = _like_prefix(term)
+    if len(term) < MIN_TRIGRAM_LENGTH:
+        sql = f"""
+            SELECT {_COLUMNS} FROM catalog_product p
+            WHERE p.shop_id = %s AND p.is_active AND lower(p.name) LIKE %s
+            ORDER BY lower(p.name)
+            LIMIT %s
+        """
+        return list(Product.objects.raw(sql, [shop_id, prefix, limit]))
+
+    needle = term.lower()
+    sql = f"""
+        SELECT {_COLUMNS} FROM catalog_product p
+        WHERE p.shop_id = %s AND p.is_active
+          AND (lower(p.name) LIKE %s OR %s <%% lower(p.name))
+        ORDER BY lower(p.name) LIKE %s DESC,
+                 word_similarity(%s, lower(p.name)) DESC,
+                 lower(p.name)
+        LIMIT %s
+    """
+    return list(Product.objects.raw(sql, [shop_id, prefix, needle, prefix, needle, limit]))
+
+
+def set_trigram_threshold(sender, connection, **kwargs):
+    """connection_created receiver — applies WORD_SIMILARITY_THRESHOLD once per connection."""
+    if connection.vendor != "postgresql":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT set_config('pg_trgm.word_similarity_threshold', %s, false)",
+            [str(WORD_SIMILARITY_THRESHOLD)],
+        )
+
+
+# ========== SQLITE (FTS5) ==========
+SQLITE_FTS_TRIGGERS = {
+    "catalog_product_fts_ai": """
+        CREATE TRIGGER IF NOT EXISTS catalog_product_fts_ai AFTER INSERT ON catalog_product BEGIN
+            INSERT INTO catalog_product_fts(rowid, name, sku) VALUES (new.id, new.name, new.sku);
+        END
+    """,
+    "catalog_product_fts_ad": """
+        CREATE TRIGGER IF NOT EXISTS catalog_product_fts_ad AFTER DELETE ON catalog_product BEGIN
+            INSERT INTO catalog_product_fts(catalog_product_fts, rowid, name, sku)
+            VALUES ('delete', old.id, old.name, old.sku);
+        END
+    """,
+    "catalog_product_fts_au": """
+        CREATE TRIGGER IF NOT EXISTS catalog_product_fts_au AFTER UPDATE OF name, sku ON catalog_product BEGIN
+            INSERT INTO catalog_product_fts(catalog_product_fts, rowid, name, sku)
+            VALUES ('delete', old.id, old.name, old.sku);
+            INSERT INTO catalog_product_fts(rowid, name, sku) VALUES (new.id, new.name, new.sku);
+        END
+    """,
+}
+
+
+def _has_sqlite_fts():
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'catalog_product_fts'"
+        )
+        return cursor.fetchone() is not None
+
+
+def install_sqlite_fts(cursor):
+    """
+    Creates the FTS5 table and its triggers if missing. SQLite drops triggers
+    whenever a migration rebuilds catalog_product, so this also runs on
+    post_migrate; the index is rebuilt only when a trigger had to be restored.
+    """
+    cursor.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS catalog_product_fts USING fts5(
+            name, sku,
+            content='catalog_product', content_rowid='id',
+            prefix='2 3', tokenize='unicode61 remove_diacritics 2'
+        )
+    """)
+    cursor.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'catalog_product'"
+    )
+    existing = {row[0] for row in cursor.fetchall()}
+    missing = [sql for name, sql in SQLITE_FTS_TRIGGERS.items() if name not in existing]
+    for sql in missing:
+        cursor.execute(sql)
+    if missing:
+        cursor.execute("INSERT INTO catalog_product_fts(catalog_product_fts) VALUES ('rebuild')")
+
+
+def ensure_sqlite_fts(sender, using, **kwargs):
+    """post_migrate receiver."""
+    from django.db import connections
+    conn = connections[using]
+    if conn.vendor != "sqlite":
+        return
+    with conn.cursor() as cursor:
+        install_sqlite_fts(cursor)
+
+
+def _fts_query(tokens, min_prefix=None):
+    parts = []
+    for token in tokens:
+        if min_prefix:
+            token = token[:min_prefix]
+        parts.append('"' + token.replace('"', '""') + '"*')
+    return " ".join(parts)
+
+
+def _search_sqlite(shop_id, term, limit):
+    tokens = _TOKEN.findall(term.lower())
+    if not tokens:
+        return []
+
+    sql = f"""
+        SELECT {_COLUMNS} FROM catalog_product_fts f
+        JOIN catalog_product p ON p.id = f.rowid
+        WHERE catalog_product_fts MATCH %s AND p.shop_id = %s AND p.is_active
+        ORDER BY lower(p.name) LIKE %s ESCAPE '\\' DESC, f.rank, lower(p.name)
+        LIMIT %s
+    """
+    results = list(Product.objects.raw(
+        sql, [_fts_query(tokens), shop_id, _like_prefix(term), limit]
+    ))
+    if len(results) >= limit or len(term) <= MIN_TRIGRAM_LENGTH:
+        return results
+
+    # Typo fallback — FTS5 has no edit distance, so widen to two-letter
+    # prefixes and score a bounded candidate set in Python.
+    seen = {p.id for p in results}
+    candidates = Product.objects.raw(
+        sql, [_fts_query(tokens, min_prefix=2), shop_id, _like_prefix(term), FUZZY_CANDIDATES]
+    )
+    needle = term.lower()
+    scored = []
+    for product in candidates:
+        if product.id in seen:
+            continue
+        name = product.name.lower()
+        ratio = max(
+            difflib.SequenceMatcher(None, needle, name).ratio(),
+            difflib.SequenceMatcher(None, needle, name[:len(needle)]).ratio(),
+        )
+        if ratio >= FUZZY_MIN_RATIO:
+            scored.append((ratio, product))
+    scored.sort(key=lambda pair: pair[0], reverse=True)
+    return results + [p for _, p in scored[:limit - len(results)]]
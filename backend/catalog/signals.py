@@ -0,0 +1,15 @@
+# backend/catalog/signals.py
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from shops.models import Shop
+from .models import Product, ProductTombstone
+
+
+@receiver(post_delete, sender=Product)
+def record_product_tombstone(sender, instance, origin=None, **kwargs):
+    # A shop being deleted takes its catalog (and tombstones) with it
+    if isinstance(origin, Shop) or (isinstance(origin, QuerySet) and origin.model is Shop):
+        return
+    ProductTombstone.objects.create(shop_id=instance.shop_id, product_id=instance.id)
@@ -0,0 +1,145 @@
+# backend/catalog/stock.py
+"""
+Stock movements and the StockHistory ledger.
+
+move_stock() applies any number of quantity changes in ONE
+`UPDATE ... RETURNING id, quantity` (PostgreSQL, SQLite >= 3.35) and
+records them in ONE bulk INSERT into StockHistory. Before/after values
+come from the quantities the UPDATE returned, so they are exact even
+when other requests move the same products at the same time.
+
+The ledger is append-only: rows are never updated, and only disappear
+together with their product.
+
+The UPDATE also returns each product's low_stock_threshold, so products
+that just went low are found without another query (catalog/alerts.py).
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import connection, transaction
+from django.db.models import Case, DecimalField, F, Value, When
+from django.db.models.functions import Now
+from django.utils import timezone
+
+from .alerts import crossed_threshold, queue_low_stock_alerts
+from .models import Product, StockHistory
+
+_CENT = Decimal("0.01")
+
+
+def _decimal(value):
+    return Decimal(str(value)).quantize(_CENT)
+
+
+@transaction.atomic
+def move_stock(movements, action, user=None):
+    """
+    movements: iterable of (product_id, change, reference); change is signed
+    (negative for a sale). Several movements of one product are applied in
+    order. Returns {product_id: (quantity_before, quantity_after)} for the
+    products that exist.
+    """
+    movements = [(pid, Decimal(change), ref) for pid, change, ref in movements if change]
+    if not movements:
+        return {}
+
+    net = defaultdict(Decimal)
+    for product_id, change, _ in movements:
+        net[product_id] += change
+
+    returned = _update_returning(net)
+    after = {pid: qty for pid, (qty, _, _) in returned.items()}
+
+    # Walk each product's movements forward from its quantity before the UPDATE
+    running = {pid: qty - net[pid] for pid, qty in after.items()}
+    history = []
+    for product_id, change, reference in movements:
+        if product_id not in running:
+            continue
+        before = running[product_id]
+        running[product_id] = before + change
+        history.append(StockHistory(
+            product_id=product_id,
+            action=action,
+            quantity_change=change,
+            quantity_before=before,
+            quantity_after=before + change,
+            reference=reference[:100],
+            created_by=user,
+        ))
+    StockHistory.objects.bulk_create(history)
+
+    queue_low_stock_alerts(
+        (shop_id, pid, qty, threshold)
+        for pid, (qty, threshold, shop_id) in returned.items()
+        if crossed_threshold(qty - net[pid], qty, threshold)
+    )
+    return {pid: (qty - net[pid], qty) for pid, qty in after.items()}
+
+
+def record_stock_change(product, quantity_before, action, reference="", user=None):
+    """Ledger row for a quantity that was set directly (product forms, admin)."""
+    change = Decimal(product.quantity) - Decimal(quantity_before)
+    if not change:
+        return None
+    if crossed_threshold(Decimal(quantity_before), Decimal(product.quantity), product.low_stock_threshold):
+        queue_low_stock_alerts([
+            (product.shop_id, product.pk, product.quantity, product.low_stock_threshold)
+        ])
+    return StockHistory.objects.create(
+        product=product,
+        action=action,
+        quantity_change=change,
+        quantity_before=quantity_before,
+        quantity_after=product.quantity,
+        reference=reference[:100],
+        created_by=user,
+    )
+
+
+def _update_returning(net):
+    """
+    Applies `net` (product id -> change); returns
+    product id -> (quantity after, low_stock_threshold, shop id).
+    """
+    if connection.vendor not in ("postgresql", "sqlite"):
+        return _update_locked(net)
+
+    table = Product._meta.db_table
+    cases = " ".join(["WHEN %s THEN %s"] * len(net))
+    placeholders = ", ".join(["%s"] * len(net))
+    params = []
+    for product_id, change in net.items():
+        params += [product_id, change]
+    params.append(connection.ops.adapt_datetimefield_value(timezone.now()))
+    params += list(net)
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            # updated_at too: stock changes must reach catalog delta sync
+            f"UPDATE {table} SET quantity = quantity + (CASE id {cases} END), updated_at = %s "
+            f"WHERE id IN ({placeholders}) RETURNING id, quantity, low_stock_threshold, shop_id",
+            params,
+        )
+        return {pid: (_decimal(qty), threshold, shop_id) for pid, qty, threshold, shop_id in cursor.fetchall()}
+
+
+def _update_locked(net):
+    """Databases without UPDATE ... RETURNING: lock, read, then update."""
+    before = {
+        pid: (qty, threshold, shop_id)
+        for pid, qty, threshold, shop_id in Product.objects.select_for_update().filter(id__in=net)
+        .values_list("id", "quantity", "low_stock_threshold", "shop_id")
+    }
+    Product.objects.filter(id__in=before).update(
+        quantity=F("quantity") + Case(
+            *[When(id=pid, then=Value(change)) for pid, change in net.items()],
+            output_field=DecimalField(max_digits=12, decimal_places=2),
+        ),
+        updated_at=Now(),
+    )
+    return {
+        pid: (_decimal(qty + net[pid]), threshold, shop_id)
+        for pid, (qty, threshold, shop_id) in before.items()
+    }
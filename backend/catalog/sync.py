@@ -0,0 +1,103 @@
+# backend/catalog/sync.py
+"""
+Compact catalog snapshot + delta sync for billing clients.
+
+The catalog version of a shop is the latest change time in epoch
+milliseconds: max(Product.updated_at, ProductTombstone.deleted_at).
+Clients keep the version from their last sync and ask for changes since
+then. Payloads are columnar ({"id": [...], "name": [...], ...}) so field
+names are sent once, not once per product.
+
+Tombstones are kept for CATALOG_TOMBSTONE_RETENTION_DAYS. A client whose
+version is older than that may have missed deletions and must download a
+new snapshot (resync_required).
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db.models import Max
+
+from .models import Product, ProductTombstone
+
+SYNC_FIELDS = ("id", "name", "sku", "price", "tax_rate", "quantity", "unit")
+
+# Rows written by a transaction that commits after a client synced can
+# carry an earlier timestamp than the version the client saw. Re-sending
+# the last minute of changes covers that; clients upsert by id.
+SYNC_OVERLAP = timedelta(seconds=60)
+
+
+def _to_version(dt):
+    return int(dt.timestamp() * 1000) if dt else 0
+
+
+def _from_version(version):
+    return datetime.fromtimestamp(version / 1000, tz=dt_timezone.utc)
+
+
+def catalog_version(shop_id):
+    """Two index-only MAX() lookups on (shop, updated_at) and (shop, deleted_at)."""
+    updated = Product.objects.filter(shop_id=shop_id).aggregate(v=Max('updated_at'))['v']
+    deleted = ProductTombstone.objects.filter(shop_id=shop_id).aggregate(v=Max('deleted_at'))['v']
+    return max(_to_version(updated), _to_version(deleted))
+
+
+def _columns(rows):
+    columns = list(zip(*rows)) if rows else [()] * len(SYNC_FIELDS)
+    return {field: list(values) for field, values in zip(SYNC_FIELDS, columns)}
+
+
+def is_settled(version):
+    """
+    True once every write timestamped at or before `version` has committed,
+    i.e. the version is older than SYNC_OVERLAP. Only then can an unchanged
+    version be trusted to mean an unchanged catalog.
+    """
+    return version < _to_version(datetime.now(dt_timezone.utc) - SYNC_OVERLAP)
+
+
+def tombstone_cutoff():
+    """Tombstones older than this are pruned."""
+    return datetime.now(dt_timezone.utc) - timedelta(days=settings.CATALOG_TOMBSTONE_RETENTION_DAYS)
+
+
+def resync_required(since):
+    """True when changes since `since` may include pruned tombstones."""
+    return _from_version(since) - SYNC_OVERLAP < tombstone_cutoff()
+
+
+def snapshot(shop_id, version):
+    rows = list(
+        Product.objects.filter(shop_id=shop_id, is_active=True)
+        .order_by('id').values_list(*SYNC_FIELDS)
+    )
+    return {
+        "version": version,
+        "count": len(rows),
+        "columns": _columns(rows),
+    }
+
+
+def changes_since(shop_id, since, version):
+    """
+    Products changed after `since` (active ones as columns, deactivated ones
+    in `removed`) plus hard-deleted ids from tombstones.
+
+    Always queried, even when `since` is the current version: a late commit
+    with an earlier timestamp does not raise the version.
+    """
+    cutoff = _from_version(since) - SYNC_OVERLAP
+    changed = Product.objects.filter(shop_id=shop_id, updated_at__gt=cutoff)
+    rows = list(changed.filter(is_active=True).order_by('id').values_list(*SYNC_FIELDS))
+    removed = list(changed.filter(is_active=False).values_list('id', flat=True))
+    removed += list(
+        ProductTombstone.objects.filter(shop_id=shop_id, deleted_at__gt=cutoff)
+        .values_list('product_id', flat=True)
+    )
+    return {
+        "version": version,
+        "since": since,
+        "count": len(rows),
+        "columns": _columns(rows),
+        "removed": removed,
+    }
@@ -1,3 +1,59 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from api.models import UserSubscription
+from shops.models import Shop
+from .models import Product, ProductTombstone
+from .sync import _to_version
+
+
+class CatalogSyncTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.shop = Shop.objects.create(name="Shop", contact_phone="9000000000")
+        self.user = User.objects.create_user(
+            email="owner@example.com", username="owner", password="Passw0rd!",
+            role="SHOP_OWNER", shop=self.shop,
+        )
+        UserSubscription.objects.update_or_create(
+            user=self.user, defaults={"allowed_by_admin": True, "active": True}
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def changes(self, since):
+        return self.client.get("/api/products/changes/", {"since": since})
+
+    def test_changes_since_the_current_version_still_sends_the_overlap(self):
+        product = Product.objects.create(shop=self.shop, name="Soap", price=10, quantity=5)
+        version = self.client.get("/api/products/snapshot/").data["version"]
+
+        response = self.changes(version)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["columns"]["id"], [product.id])
+
+    def test_cursor_older_than_the_tombstones_must_resync(self):
+        retention = timedelta(days=settings.CATALOG_TOMBSTONE_RETENTION_DAYS)
+        response = self.changes(_to_version(timezone.now() - retention - timedelta(days=1)))
+
+        self.assertEqual(response.status_code, 410)
+        self.assertTrue(response.data["resync"])
+
+    def test_prune_keeps_recent_tombstones(self):
+        old, _ = ProductTombstone.objects.bulk_create([
+            ProductTombstone(shop=self.shop, product_id=1),
+            ProductTombstone(shop=self.shop, product_id=2),
+        ])
+        retention = timedelta(days=settings.CATALOG_TOMBSTONE_RETENTION_DAYS)
+        ProductTombstone.objects.filter(pk=old.pk).update(deleted_at=timezone.now() - retention - timedelta(hours=1))
 
-# Create your tests here.
+        call_command("prune_product_tombstones", stdout=StringIO())
+        self.assertEqual(list(ProductTombstone.objects.values_list("product_id", flat=True)), [2])
@@ -23,25 +23,25 @@ class ProductViewSet(viewsets.ModelViewSet):
     ordering = ['name']
 
     def get_queryset(self):
-        shop = self.request.user.shop
-        if not shop:
+        shop_id = self.request.user.shop_id
+        if not shop_id:
             return Product.objects.none()
-        return Product.objects.filter(shop=shop, is_active=True)
+        return Product.objects.filter(shop_id=shop_id, is_active=True)
 
     def perform_create(self, serializer):
-        serializer.save(shop=self.request.user.shop)
+        serializer.save(shop_id=self.request.user.shop_id)
 
 
 # 📊 Stock Report Endpoint
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def product_report(request):
-    shop = request.user.shop
-    if not shop:
+    shop_id = request.user.shop_id
+    if not shop_id:
         return Response({"error": "No shop associated"}, status=400)
 
     # Scoped to user's shop — was missing before ⚠️
-    qs = Product.objects.filter(shop=shop)
+    qs = Product.objects.filter(shop_id=shop_id)
 
     data = {
         "total_products": qs.count(),
@@ -55,8 +55,8 @@ def product_report(request):
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def bulk_import_products(request):
-    shop = request.user.shop
-    if not shop:
+    shop_id = request.user.shop_id
+    if not shop_id:
         return Response({"error": "No shop associated"}, status=400)
 
     file = request.FILES.get('file')
@@ -70,7 +70,7 @@ def bulk_import_products(request):
     for i, row in enumerate(reader, 2):
         try:
             product, is_new = Product.objects.update_or_create(
-                shop=shop,
+                shop_id=shop_id,
                 sku=row.get('sku', '').strip(),
                 defaults={
                     'name': row['name'].strip(),
@@ -2,6 +2,7 @@
 from pathlib import Path
 from datetime import timedelta
 import dj_database_url
+from corsheaders.defaults import default_headers
 import environ
 import sys
 import os
@@ -62,6 +63,7 @@ INSTALLED_APPS = [
 # Middleware
 # =======================================
 MIDDLEWARE = [
+    'api.middleware.SlowRequestProfilerMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
@@ -122,9 +124,33 @@ else:
 # Authentication
 # =======================================
 AUTH_USER_MODEL = 'accounts.User'
+# EmailBackend already falls back to username; a second ModelBackend would
+# hash the password again on every failed login
 AUTHENTICATION_BACKENDS = [
     'accounts.backends.EmailBackend',
-    'django.contrib.auth.backends.ModelBackend',
+]
+
+# =======================================
+# Password Hashing
+# — PASSWORD_HASH_PROFILE picks the hasher for new passwords. The others
+#   still verify old hashes, which are upgraded on the next login.
+#   Size it with: python manage.py bench_hashers
+# =======================================
+PASSWORD_HASH_PROFILE = env('PASSWORD_HASH_PROFILE', default='argon2')
+# OWASP baseline for argon2id: 19 MiB, 2 passes, 1 lane
+ARGON2_TIME_COST = env.int('ARGON2_TIME_COST', default=2)
+ARGON2_MEMORY_COST = env.int('ARGON2_MEMORY_COST', default=19456)  # KiB
+ARGON2_PARALLELISM = env.int('ARGON2_PARALLELISM', default=1)
+
+PASSWORD_HASHER_PROFILES = {
+    'argon2': 'accounts.hashers.TunedArgon2PasswordHasher',
+    'pbkdf2': 'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+}
+PASSWORD_HASHERS = [PASSWORD_HASHER_PROFILES[PASSWORD_HASH_PROFILE]] + [
+    hasher for profile, hasher in PASSWORD_HASHER_PROFILES.items()
+    if profile != PASSWORD_HASH_PROFILE
+] + [
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
 ]
 
 # =======================================
@@ -146,6 +172,7 @@ REST_FRAMEWORK = {
         "anon": "100/day",
         "forgot_password": "5/hour",
         "login": "10/hour",
+        "check_availability": "60/minute",
     },
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 20,
@@ -190,6 +217,9 @@ BREVO_API_KEY = env('BREVO_API_KEY', default='')
 # CORS & CSRF
 # =======================================
 CORS_ALLOW_CREDENTIALS = True
+# Conditional GETs (ETag / If-None-Match) and Idempotency-Key retries
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key', 'if-none-match')
+CORS_EXPOSE_HEADERS = ['ETag', 'Idempotent-Replayed']
 
 FRONTEND_URL = env('FRONTEND_URL', default='https://sparkbill.vercel.app')
 
@@ -247,6 +277,53 @@ else:
         }
     }
 
+# Cache refresh-token blacklist checks (api/tokens.py) — needs a shared cache
+TOKEN_BLACKLIST_CACHE = env.bool('TOKEN_BLACKLIST_CACHE', default=bool(REDIS_URL))
+
+# =======================================
+# Shop Context Cache
+# — Per-process LRU in front of CACHES, see shops/context.py
+# =======================================
+SHOP_CONTEXT_LRU_SIZE = env.int('SHOP_CONTEXT_LRU_SIZE', default=1024)
+
+# =======================================
+# Idempotency Keys
+# — Stored responses for retried POSTs, see api/idempotency.py
+# =======================================
+IDEMPOTENCY_KEY_TTL_HOURS = env.int('IDEMPOTENCY_KEY_TTL_HOURS', default=24)
+# A request still pending after this long was killed (gunicorn timeout is 120 s)
+IDEMPOTENCY_PENDING_LEASE_SECONDS = env.int('IDEMPOTENCY_PENDING_LEASE_SECONDS', default=150)
+
+# =======================================
+# Catalog Sync
+# — Deleted-product tombstones kept for delta sync; older ones are removed by
+#   manage.py prune_product_tombstones and older cursors must resync
+# =======================================
+CATALOG_TOMBSTONE_RETENTION_DAYS = env.int('CATALOG_TOMBSTONE_RETENTION_DAYS', default=30)
+
+# =======================================
+# Loyalty Points
+# — Balances unused this long are expired by manage.py expire_loyalty_points
+# =======================================
+LOYALTY_POINTS_EXPIRY_DAYS = env.int('LOYALTY_POINTS_EXPIRY_DAYS', default=365)
+
+# =======================================
+# Webhook Inbox
+# — Razorpay events are stored, then applied by manage.py process_webhooks
+# =======================================
+WEBHOOK_MAX_ATTEMPTS = env.int('WEBHOOK_MAX_ATTEMPTS', default=8)
+
+# =======================================
+# Slow Request Profiling
+# — Off by default; site admins can still profile one request with `X-Profile: 1`
+# =======================================
+PROFILE_SLOW_REQUESTS = env.bool('PROFILE_SLOW_REQUESTS', default=False)
+PROFILE_THRESHOLD_MS = env.int('PROFILE_THRESHOLD_MS', default=1000)
+PROFILE_SAMPLE_INTERVAL_MS = env.int('PROFILE_SAMPLE_INTERVAL_MS', default=5)
+PROFILE_SAMPLE_DELAY_MS = env.int('PROFILE_SAMPLE_DELAY_MS', default=50)
+PROFILE_DIR = env('PROFILE_DIR', default=str(BASE_DIR / 'profiles'))
+PROFILE_MAX_FILES = env.int('PROFILE_MAX_FILES', default=200)
+
 # =======================================
 # Localization
 # =======================================
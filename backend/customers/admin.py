@@ -1,14 +1,35 @@
 # backend/customers/admin.py
 from django.contrib import admin
-from .models import Customer, LoyaltyAccount
+
+from api.admin_pagination import LargeTableAdminMixin, shop_filter_link
+from .models import Customer, LoyaltyAccount, LoyaltyTransaction
 
 class LoyaltyAccountInline(admin.StackedInline):
     model = LoyaltyAccount
     extra = 0
 
 @admin.register(Customer)
-class CustomerAdmin(admin.ModelAdmin):
-    list_display = ('name', 'mobile', 'shop', 'email')
-    search_fields = ('name', 'mobile', 'shop__name')
-    raw_id_fields = ('shop',)
-    inlines = [LoyaltyAccountInline]
\ No newline at end of file
+class CustomerAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = ('name', 'mobile', shop_filter_link, 'email')
+    search_fields = ('name', '^mobile')
+    list_select_related = ('shop',)
+    autocomplete_fields = ('shop',)
+    inlines = [LoyaltyAccountInline]
+
+@admin.register(LoyaltyTransaction)
+class LoyaltyTransactionAdmin(admin.ModelAdmin):
+    """Read-only: the points ledger is append-only."""
+    list_display = ('created_at', 'account', 'kind', 'points', 'invoice', 'shop')
+    list_filter = ('kind',)
+    raw_id_fields = ('account', 'invoice', 'shop')
+    list_select_related = ('account', 'invoice', 'shop')
+    date_hierarchy = 'created_at'
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
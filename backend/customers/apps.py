@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class CustomersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'customers'
+
+    def ready(self):
+        from django.db.models.signals import post_delete, post_migrate, post_save
+        from .loyalty import drop_cached_balance
+        from .models import LoyaltyAccount
+        from .search import ensure_sqlite_fts
+
+        post_migrate.connect(ensure_sqlite_fts, sender=self, dispatch_uid='customers_sqlite_fts')
+        for signal in (post_save, post_delete):
+            signal.connect(drop_cached_balance, sender=LoyaltyAccount, dispatch_uid='customers_loyalty_balance')
@@ -0,0 +1,82 @@
+# backend/customers/dedupe.py
+"""
+Merging duplicate customers (same shop and mobile) into the oldest one.
+
+Used by manage.py dedupe_customers. Customers migration 0005 does the
+same with a frozen copy of this module, before 0006 adds the (shop,
+mobile) unique constraint.
+"""
+from django.db.models import Case, Count, Min, Value, When
+
+from sales.models import Invoice
+from .models import Customer, LoyaltyAccount, LoyaltyTransaction
+
+
+def find_duplicates(shop_id=None):
+    """duplicate id -> id of the customer it merges into (the oldest)."""
+    customers = Customer.objects.all()
+    if shop_id:
+        customers = customers.filter(shop_id=shop_id)
+    groups = (
+        customers.values("shop_id", "mobile")
+        .annotate(n=Count("id"), keep=Min("id"))
+        .filter(n__gt=1)
+        .order_by()
+    )
+    merge = {}
+    for group in groups:
+        for customer_id in customers.filter(
+            shop_id=group["shop_id"], mobile=group["mobile"]
+        ).exclude(id=group["keep"]).values_list("id", flat=True):
+            merge[customer_id] = group["keep"]
+    return merge
+
+
+def _repoint(queryset, field, merge):
+    """One UPDATE setting `field` from duplicate ids to kept ids."""
+    return queryset.filter(**{f"{field}__in": merge}).update(**{field: Case(
+        *[When(**{field: dup}, then=Value(keep)) for dup, keep in merge.items()]
+    )})
+
+
+def merge_duplicates(merge):
+    """
+    Repoints invoices, moves or adds up loyalty points, and deletes the
+    duplicates. Purchase statistics are left to reconcile_customer_stats.
+    Returns the number of invoices repointed.
+
+    The ledger rows of an account whose points are added up move to the
+    kept account too, so deleting the duplicate does not cascade them away.
+    """
+    if not merge:
+        return 0
+    invoices = _repoint(Invoice.objects.all(), "customer_id", merge)
+
+    accounts = {a.customer_id: a for a in LoyaltyAccount.objects.filter(
+        customer_id__in=set(merge) | set(merge.values())
+    )}
+    moved = {}
+    absorbed = {}                    # duplicate's account id -> kept account id
+    for dup, keep in merge.items():
+        account = accounts.get(dup)
+        if account is None:
+            continue
+        kept = accounts.get(keep)
+        if kept is None:
+            moved[dup] = keep
+            accounts[keep] = account
+        else:
+            kept.points += account.points
+            update_fields = ["points"]
+            if account.last_activity_at and (
+                    kept.last_activity_at is None or account.last_activity_at > kept.last_activity_at):
+                kept.last_activity_at = account.last_activity_at
+                update_fields.append("last_activity_at")
+            kept.save(update_fields=update_fields)
+            absorbed[account.pk] = kept.pk
+    _repoint(LoyaltyAccount.objects.all(), "customer_id", moved)
+    if absorbed:
+        _repoint(LoyaltyTransaction.objects.all(), "account_id", absorbed)
+
+    Customer.objects.filter(id__in=merge).delete()
+    return invoices
@@ -0,0 +1,251 @@
+# backend/customers/loyalty.py
+"""
+Loyalty points, applied in the invoice write path (sales/services.py).
+
+Shops opt in with config.loyalty. For each INVOICE with a customer:
+
+- points earned = floor(amount paid / earn_rate), where the amount paid is
+  the grand total after the redemption discount;
+- an optional `redeem_points` entry field spends points at redeem_value
+  each; the value is added to the invoice discount.
+
+Per invoice that is ONE statement on the account, relative to the stored
+balance: an INSERT ... ON CONFLICT (customer) DO UPDATE that also opens
+the account on first purchase, or, when redeeming, an UPDATE whose WHERE
+refuses to spend more than the balance. Both return the new balance and
+the points earned (PostgreSQL, SQLite; other databases lock the row and
+update it). The ledger rows of all invoices of a batch then go in with
+ONE INSERT once the invoices have ids — at most two queries per invoice.
+
+The billing screen reads the balance through loyalty_balance(), cached
+per customer and dropped on commit whenever the account changes.
+"""
+from dataclasses import dataclass
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import F, Sum
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import Customer, LoyaltyAccount, LoyaltyTransaction
+
+BALANCE_CACHE_TIMEOUT = 300
+CENT = Decimal("0.01")
+
+_DEFAULT_EARN_RATE = LoyaltyAccount._meta.get_field("earn_rate").default
+_DEFAULT_REDEEM_VALUE = LoyaltyAccount._meta.get_field("redeem_value").default
+
+
+class LoyaltyError(Exception):
+    pass
+
+
+@dataclass
+class LoyaltyChange:
+    shop_id: int
+    customer_id: int
+    account_id: int
+    earned: int
+    redeemed: int
+    discount: Decimal                # value of the redeemed points
+    balance: int
+
+
+def loyalty_enabled(shop_id):
+    from shops.context import get_shop_context
+
+    context = get_shop_context(shop_id)
+    return bool(context and context.config.get("loyalty"))
+
+
+# ========== WRITE PATH ==========
+def apply_loyalty(shop_id, customer_id, amount, redeem=0):
+    """
+    Earns on `amount` (the grand total before redemption) less the value of
+    `redeem` points, which are spent. Returns a LoyaltyChange; raises
+    LoyaltyError when the balance cannot cover `redeem`.
+    """
+    # Never earns negative points, whatever the discount
+    amount = max(Decimal(amount).quantize(CENT), Decimal(0))
+    now = timezone.now()
+    if connection.vendor in ("postgresql", "sqlite"):
+        row = _redeem_and_earn(customer_id, amount, redeem, now) if redeem else \
+            _open_or_earn(shop_id, customer_id, amount, now)
+    else:
+        row = _apply_locked(shop_id, customer_id, amount, redeem, now)
+    if row is None:
+        raise LoyaltyError(f"Not enough loyalty points to redeem {redeem}.")
+
+    account_id, balance, earned, redeem_value = row
+    return LoyaltyChange(
+        shop_id=shop_id,
+        customer_id=customer_id,
+        account_id=account_id,
+        earned=int(earned),
+        redeemed=redeem,
+        discount=(redeem * Decimal(str(redeem_value))).quantize(CENT),
+        balance=balance,
+    )
+
+
+def _floor(sql):
+    # Non-negative operands: SQLite's integer cast truncates, i.e. floors
+    return f"FLOOR({sql})" if connection.vendor == "postgresql" else f"CAST({sql} AS INTEGER)"
+
+
+def _open_or_earn(shop_id, customer_id, amount, now):
+    table = LoyaltyAccount._meta.db_table
+    ops = connection.ops
+    earned = _floor(f"%s / {table}.earn_rate")
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} (shop_id, customer_id, points, earn_rate, redeem_value, last_activity_at) "
+            f"VALUES (%s, %s, %s, %s, %s, %s) "
+            f"ON CONFLICT (customer_id) DO UPDATE SET "
+            f"points = {table}.points + {earned}, last_activity_at = EXCLUDED.last_activity_at "
+            f"RETURNING id, points, {earned}, redeem_value",
+            [
+                shop_id, customer_id, int(amount // _DEFAULT_EARN_RATE), _DEFAULT_EARN_RATE,
+                ops.adapt_decimalfield_value(Decimal(_DEFAULT_REDEEM_VALUE), 6, 2),
+                ops.adapt_datetimefield_value(now),
+                amount, amount,
+            ],
+        )
+        return cursor.fetchone()
+
+
+def _redeem_and_earn(customer_id, amount, redeem, now):
+    table = LoyaltyAccount._meta.db_table
+    earned = _floor("(%s - %s * redeem_value) / earn_rate")
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {table} SET points = points - %s + {earned}, last_activity_at = %s "
+            f"WHERE customer_id = %s AND points >= %s AND %s * redeem_value <= %s "
+            f"RETURNING id, points, {earned}, redeem_value",
+            [
+                redeem, amount, redeem, connection.ops.adapt_datetimefield_value(now),
+                customer_id, redeem, redeem, amount,
+                amount, redeem,
+            ],
+        )
+        return cursor.fetchone()
+
+
+def _apply_locked(shop_id, customer_id, amount, redeem, now):
+    if redeem:
+        account = LoyaltyAccount.objects.select_for_update().filter(customer_id=customer_id).first()
+        if account is None or account.points < redeem or redeem * account.redeem_value > amount:
+            return None
+    else:
+        account, _ = LoyaltyAccount.objects.select_for_update().get_or_create(
+            customer_id=customer_id, defaults={"shop_id": shop_id},
+        )
+    earned = int((amount - redeem * account.redeem_value) // account.earn_rate)
+    LoyaltyAccount.objects.filter(id=account.id).update(
+        points=F("points") - redeem + earned, last_activity_at=now,
+    )
+    return account.id, account.points - redeem + earned, earned, account.redeem_value
+
+
+def record_loyalty(changes):
+    """
+    Writes the ledger rows for (invoice, LoyaltyChange) pairs in one INSERT.
+    The invoices must have been saved.
+    """
+    rows = []
+    for invoice, change in changes:
+        for kind, points in (("REDEEM", -change.redeemed), ("EARN", change.earned)):
+            if points:
+                rows.append(LoyaltyTransaction(
+                    account_id=change.account_id, shop_id=change.shop_id,
+                    invoice=invoice, kind=kind, points=points,
+                ))
+    if rows:
+        LoyaltyTransaction.objects.bulk_create(rows)
+    invalidate_balances((change.shop_id, change.customer_id) for _, change in changes)
+
+
+def reverse_loyalty(invoice):
+    """
+    Takes back what `invoice` earned and refunds what it redeemed, before it
+    is deleted. Points already spent elsewhere are not clawed back below zero.
+    """
+    net = (
+        LoyaltyTransaction.objects.filter(invoice=invoice)
+        .values_list("account_id").annotate(total=Sum("points")).order_by()
+    )
+    rows = []
+    for account_id, total in net:
+        if not total:
+            continue
+        LoyaltyAccount.objects.filter(id=account_id).update(points=Greatest(F("points") - total, 0))
+        rows.append(LoyaltyTransaction(
+            account_id=account_id, shop_id=invoice.shop_id, invoice=invoice,
+            kind="REVERSAL", points=-total,
+        ))
+    if rows:
+        LoyaltyTransaction.objects.bulk_create(rows)
+        invalidate_balances([(invoice.shop_id, invoice.customer_id)])
+
+
+# ========== BALANCE READ ==========
+def _balance_key(shop_id, customer_id):
+    return f"loyalty_{shop_id}_{customer_id}"
+
+
+def invalidate_balances(customers):
+    """Drops the cached balances of (shop_id, customer_id) pairs on commit."""
+    keys = list({_balance_key(shop_id, customer_id) for shop_id, customer_id in customers})
+    if not keys:
+        return
+
+    def drop():
+        try:
+            cache.delete_many(keys)
+        except Exception:
+            pass
+    transaction.on_commit(drop)
+
+
+def loyalty_balance(shop_id, customer_id):
+    """
+    {points, earn_rate, redeem_value, points_value} for the shop's customer,
+    from the cache when possible; None if the customer is not the shop's.
+    """
+    key = _balance_key(shop_id, customer_id)
+    try:
+        balance = cache.get(key)
+    except Exception:
+        balance = None
+    if balance is not None:
+        return balance
+
+    account = (
+        LoyaltyAccount.objects.filter(shop_id=shop_id, customer_id=customer_id)
+        .values("points", "earn_rate", "redeem_value").first()
+    )
+    if account is None:
+        if not Customer.objects.filter(shop_id=shop_id, id=customer_id).exists():
+            return None
+        account = {
+            "points": 0,
+            "earn_rate": _DEFAULT_EARN_RATE,
+            "redeem_value": Decimal(_DEFAULT_REDEEM_VALUE),
+        }
+    balance = {
+        **account,
+        "redeem_value": Decimal(account["redeem_value"]).quantize(CENT),
+        "points_value": (account["points"] * Decimal(account["redeem_value"])).quantize(CENT),
+    }
+    try:
+        cache.set(key, balance, timeout=BALANCE_CACHE_TIMEOUT)
+    except Exception:
+        pass
+    return balance
+
+
+def drop_cached_balance(sender, instance, **kwargs):
+    """post_save / post_delete receiver for LoyaltyAccount (admin edits)."""
+    invalidate_balances([(instance.shop_id, instance.customer_id)])
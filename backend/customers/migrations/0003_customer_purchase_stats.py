@@ -0,0 +1,50 @@
+# Generated by Django 6.0.3 on 2026-10-19 15:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0002_customer_customers_c_shop_id_b7c2d3_idx_and_more'),
+        ('shops', '0009_shop_shops_shop_contact_7e5a43_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customer',
+            name='average_basket',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='customer',
+            name='last_purchase_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='customer',
+            name='lifetime_spend',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=14),
+        ),
+        migrations.AddField(
+            model_name='customer',
+            name='visit_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['shop', '-lifetime_spend'], name='customers_c_shop_id_138332_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['shop', '-visit_count'], name='customers_c_shop_id_37ecbf_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['shop', '-average_basket'], name='customers_c_shop_id_bfa0bb_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='customer',
+            index=models.Index(fields=['shop', 'last_purchase_at'], name='customers_c_shop_id_88a655_idx'),
+        ),
+    ]
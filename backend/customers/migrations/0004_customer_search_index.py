@@ -0,0 +1,45 @@
+# Customer lookup indexes for the billing screen (PostgreSQL only): mobile
+# and name prefixes with text_pattern_ops, trigram GIN for names. On SQLite
+# the FTS5 table and its triggers are (re)created on post_migrate by
+# customers.search.ensure_sqlite_fts; mobile prefixes use the (shop, mobile)
+# index there.
+
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS btree_gin")
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS customers_customer_mobile_prefix "
+        "ON customers_customer (shop_id, mobile text_pattern_ops)"
+    )
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS customers_customer_name_trgm "
+        "ON customers_customer USING gin (shop_id, lower(name) gin_trgm_ops)"
+    )
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS customers_customer_name_prefix "
+        "ON customers_customer (shop_id, lower(name) text_pattern_ops)"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS customers_customer_mobile_prefix")
+    schema_editor.execute("DROP INDEX IF EXISTS customers_customer_name_trgm")
+    schema_editor.execute("DROP INDEX IF EXISTS customers_customer_name_prefix")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0003_customer_purchase_stats'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
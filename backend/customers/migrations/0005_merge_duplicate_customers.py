@@ -0,0 +1,76 @@
+# Merges customers sharing a shop and mobile into the oldest one, so 0006
+# can add the (shop, mobile) unique constraint. A separate migration: the
+# invoice foreign keys are DEFERRABLE INITIALLY DEFERRED, and PostgreSQL
+# refuses to ALTER a table with trigger events still pending in the same
+# transaction.
+#
+# A frozen copy of customers.dedupe as it was when this migration was
+# written; later changes there must not change what this migration does.
+
+from django.db import migrations
+from django.db.models import Case, Count, Min, Value, When
+
+
+def find_duplicates(Customer):
+    groups = (
+        Customer.objects.values("shop_id", "mobile")
+        .annotate(n=Count("id"), keep=Min("id"))
+        .filter(n__gt=1)
+        .order_by()
+    )
+    merge = {}
+    for group in groups:
+        for customer_id in Customer.objects.filter(
+            shop_id=group["shop_id"], mobile=group["mobile"]
+        ).exclude(id=group["keep"]).values_list("id", flat=True):
+            merge[customer_id] = group["keep"]
+    return merge
+
+
+def _repoint(queryset, field, merge):
+    return queryset.filter(**{f"{field}__in": merge}).update(**{field: Case(
+        *[When(**{field: dup}, then=Value(keep)) for dup, keep in merge.items()]
+    )})
+
+
+def merge_duplicate_customers(apps, schema_editor):
+    Customer = apps.get_model('customers', 'Customer')
+    Invoice = apps.get_model('sales', 'Invoice')
+    LoyaltyAccount = apps.get_model('customers', 'LoyaltyAccount')
+
+    merge = find_duplicates(Customer)
+    if not merge:
+        return
+    _repoint(Invoice.objects.all(), "customer_id", merge)
+
+    accounts = {a.customer_id: a for a in LoyaltyAccount.objects.filter(
+        customer_id__in=set(merge) | set(merge.values())
+    )}
+    moved = {}
+    for dup, keep in merge.items():
+        account = accounts.get(dup)
+        if account is None:
+            continue
+        kept = accounts.get(keep)
+        if kept is None:
+            moved[dup] = keep
+            accounts[keep] = account
+        else:
+            kept.points += account.points
+            kept.save(update_fields=["points"])
+    _repoint(LoyaltyAccount.objects.all(), "customer_id", moved)
+
+    Customer.objects.filter(id__in=merge).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0004_customer_search_index'),
+        ('shops', '0009_shop_shops_shop_contact_7e5a43_idx'),
+        ('sales', '0015_invoice_client_id_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_customers, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 6.0.3 on 2026-10-19 15:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0005_merge_duplicate_customers'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='customer',
+            constraint=models.UniqueConstraint(fields=('shop', 'mobile'), name='customers_customer_shop_mobile'),
+        ),
+        migrations.RemoveIndex(
+            model_name='customer',
+            name='customers_c_shop_id_b7c2d3_idx',
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 6.0.3 on 2026-10-19 15:50
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0006_customer_shop_mobile_unique'),
+        ('sales', '0015_invoice_client_id_and_more'),
+        ('shops', '0009_shop_shops_shop_contact_7e5a43_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LoyaltyTransaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('EARN', 'Earn'), ('REDEEM', 'Redeem'), ('REVERSAL', 'Reversal'), ('EXPIRE', 'Expire')], max_length=10)),
+                ('points', models.IntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='loyaltyaccount',
+            name='last_activity_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='loyaltyaccount',
+            index=models.Index(condition=models.Q(('points__gt', 0)), fields=['last_activity_at'], name='customers_loyalty_expiring'),
+        ),
+        migrations.AddField(
+            model_name='loyaltytransaction',
+            name='account',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='transactions', to='customers.loyaltyaccount'),
+        ),
+        migrations.AddField(
+            model_name='loyaltytransaction',
+            name='invoice',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='sales.invoice'),
+        ),
+        migrations.AddField(
+            model_name='loyaltytransaction',
+            name='shop',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='shops.shop'),
+        ),
+        migrations.AddIndex(
+            model_name='loyaltytransaction',
+            index=models.Index(fields=['account', '-created_at'], name='customers_l_account_96dc37_idx'),
+        ),
+    ]
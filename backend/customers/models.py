@@ -1,15 +1,59 @@
 from django.db import models
 
+
+class CustomerManager(models.Manager):
+    def resolve_ids(self, shop_id, names):
+        """
+        {mobile: name} -> {mobile: customer id}, creating the missing customers.
+        One INSERT ... ON CONFLICT (shop, mobile) statement: existing rows are
+        kept as they are (the no-op update only makes RETURNING include them).
+        """
+        if not names:
+            return {}
+        customers = self.bulk_create(
+            [self.model(shop_id=shop_id, mobile=mobile, name=name) for mobile, name in names.items()],
+            update_conflicts=True,
+            unique_fields=['shop', 'mobile'],
+            update_fields=['mobile'],
+        )
+        ids = {c.mobile: c.pk for c in customers if c.pk is not None}
+        if len(ids) < len(names):
+            # Databases that do not return ids from an upsert
+            ids.update(self.filter(shop_id=shop_id, mobile__in=names).values_list('mobile', 'id'))
+        return ids
+
+    def resolve_id(self, shop_id, mobile, name):
+        return self.resolve_ids(shop_id, {mobile: name})[mobile]
+
+
 class Customer(models.Model):
     shop = models.ForeignKey('shops.Shop', on_delete=models.CASCADE, related_name='customers')
     name = models.CharField(max_length=120)
     mobile = models.CharField(max_length=20, db_index=True)
     email = models.EmailField(blank=True)
     address = models.TextField(blank=True)
+
+    # Purchase statistics — kept current by the invoice write paths
+    # (customers/stats.py), corrected by manage.py reconcile_customer_stats
+    visit_count = models.IntegerField(default=0)
+    lifetime_spend = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    average_basket = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    last_purchase_at = models.DateTimeField(null=True, blank=True)
+
+    objects = CustomerManager()
+
     class Meta:
+        constraints = [
+            # Also the (shop, mobile) index for lookups
+            models.UniqueConstraint(fields=['shop', 'mobile'], name='customers_customer_shop_mobile'),
+        ]
         indexes = [
-            models.Index(fields=['shop', 'mobile']),
             models.Index(fields=['shop', 'name']),
+            # "Top customers" and "lapsed customers" lists
+            models.Index(fields=['shop', '-lifetime_spend']),
+            models.Index(fields=['shop', '-visit_count']),
+            models.Index(fields=['shop', '-average_basket']),
+            models.Index(fields=['shop', 'last_purchase_at']),
         ]
 
     def __str__(self):
@@ -21,5 +65,42 @@ class LoyaltyAccount(models.Model):
     points = models.PositiveIntegerField(default=0)
     earn_rate = models.PositiveIntegerField(default=100)  # ₹ per point
     redeem_value = models.DecimalField(max_digits=6, decimal_places=2, default=1)  # ₹ per point
+    # Last earn or redemption; points expire after LOYALTY_POINTS_EXPIRY_DAYS without one
+    last_activity_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # manage.py expire_loyalty_points — only accounts with points
+            models.Index(
+                fields=['last_activity_at'], condition=models.Q(points__gt=0),
+                name='customers_loyalty_expiring',
+            ),
+        ]
+
     def __str__(self):
         return f"Loyalty({self.customer_id}): {self.points}"
+
+
+# Points ledger — one row per change of LoyaltyAccount.points, written with it
+# (customers/loyalty.py). Append-only; points are signed.
+class LoyaltyTransaction(models.Model):
+    KIND_CHOICES = [
+        ('EARN', 'Earn'),
+        ('REDEEM', 'Redeem'),
+        ('REVERSAL', 'Reversal'),
+        ('EXPIRE', 'Expire'),
+    ]
+    account = models.ForeignKey(LoyaltyAccount, on_delete=models.CASCADE, related_name='transactions')
+    shop = models.ForeignKey('shops.Shop', on_delete=models.CASCADE)
+    invoice = models.ForeignKey('sales.Invoice', on_delete=models.SET_NULL, null=True, blank=True)
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    points = models.IntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['account', '-created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.points:+d} ({self.account_id})"
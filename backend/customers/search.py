@@ -0,0 +1,178 @@
+# backend/customers/search.py
+"""
+Customer lookup for the billing screen.
+
+- Digits: mobile number prefix. On PostgreSQL a LIKE 'prefix%' on a
+  (shop_id, mobile text_pattern_ops) index (customers migration 0004);
+  elsewhere a range scan mobile >= prefix AND mobile < next-prefix on the
+  (shop, mobile) index, which is correct for SQLite's binary collation.
+- Anything else: name search.
+   - PostgreSQL: pg_trgm GIN index on lower(name), plus a
+     text_pattern_ops btree for short prefixes (migration 0004).
+   - SQLite (dev): FTS5 table kept in sync by triggers.
+   - Anything else: plain istartswith.
+
+Results carry the purchase statistics, so no second request is needed.
+"""
+import re
+
+from django.db import connection
+
+from .models import Customer
+
+LOOKUP_FIELDS = (
+    "id", "name", "mobile", "visit_count", "lifetime_spend", "average_basket", "last_purchase_at",
+)
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+# Trigram searches need at least this many characters to be selective
+MIN_TRIGRAM_LENGTH = 3
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+_PHONE_PUNCTUATION = re.compile(r"[\s\-()+]")
+_COLUMNS = ", ".join(f"c.{f}" for f in LOOKUP_FIELDS)
+
+
+def search_customers(shop_id, term, limit=DEFAULT_LIMIT):
+    """Up to `limit` customers of the shop, best match first."""
+    term = (term or "").strip()
+    if not term:
+        return []
+
+    digits = _PHONE_PUNCTUATION.sub("", term)
+    if term.startswith("+91"):
+        digits = digits[2:]      # numbers are stored without the country code
+        if not digits:
+            return []
+    if digits.isdigit():
+        return _search_mobile(shop_id, digits, limit)
+    if connection.vendor == "postgresql":
+        return _search_postgres(shop_id, term, limit)
+    if connection.vendor == "sqlite" and _has_sqlite_fts():
+        return _search_sqlite(shop_id, term, limit)
+    return list(
+        Customer.objects.filter(shop_id=shop_id, name__istartswith=term)
+        .only(*LOOKUP_FIELDS).order_by("name")[:limit]
+    )
+
+
+def _search_mobile(shop_id, prefix, limit):
+    customers = Customer.objects.filter(shop_id=shop_id)
+    if connection.vendor == "postgresql":
+        customers = customers.filter(mobile__startswith=prefix)
+    else:
+        # "98" -> ["98", "99"): the last digit + 1 bounds the prefix
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+        customers = customers.filter(mobile__gte=prefix, mobile__lt=upper)
+    return list(customers.only(*LOOKUP_FIELDS).order_by("mobile")[:limit])
+
+
+def _like_prefix(term):
+    escaped = term.lower().replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return escaped + "%"
+
+
+# ========== POSTGRESQL ==========
+def _search_postgres(shop_id, term, limit):
+    prefix = _like_prefix(term)
+    if len(term) < MIN_TRIGRAM_LENGTH:
+        sql = f"""
+            SELECT {_COLUMNS} FROM customers_customer c
+            WHERE c.shop_id = %s AND lower(c.name) LIKE %s
+            ORDER BY lower(c.name)
+            LIMIT %s
+        """
+        return list(Customer.objects.raw(sql, [shop_id, prefix, limit]))
+
+    # word_similarity threshold: set per connection by catalog.search
+    needle = term.lower()
+    sql = f"""
+        SELECT {_COLUMNS} FROM customers_customer c
+        WHERE c.shop_id = %s
+          AND (lower(c.name) LIKE %s OR %s <%% lower(c.name))
+        ORDER BY lower(c.name) LIKE %s DESC,
+                 word_similarity(%s, lower(c.name)) DESC,
+                 c.lifetime_spend DESC
+        LIMIT %s
+    """
+    return list(Customer.objects.raw(sql, [shop_id, prefix, needle, prefix, needle, limit]))
+
+
+# ========== SQLITE (FTS5) ==========
+SQLITE_FTS_TRIGGERS = {
+    "customers_customer_fts_ai": """
+        CREATE TRIGGER IF NOT EXISTS customers_customer_fts_ai AFTER INSERT ON customers_customer BEGIN
+            INSERT INTO customers_customer_fts(rowid, name) VALUES (new.id, new.name);
+        END
+    """,
+    "customers_customer_fts_ad": """
+        CREATE TRIGGER IF NOT EXISTS customers_customer_fts_ad AFTER DELETE ON customers_customer BEGIN
+            INSERT INTO customers_customer_fts(customers_customer_fts, rowid, name)
+            VALUES ('delete', old.id, old.name);
+        END
+    """,
+    "customers_customer_fts_au": """
+        CREATE TRIGGER IF NOT EXISTS customers_customer_fts_au AFTER UPDATE OF name ON customers_customer BEGIN
+            INSERT INTO customers_customer_fts(customers_customer_fts, rowid, name)
+            VALUES ('delete', old.id, old.name);
+            INSERT INTO customers_customer_fts(rowid, name) VALUES (new.id, new.name);
+        END
+    """,
+}
+
+
+def _has_sqlite_fts():
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'customers_customer_fts'"
+        )
+        return cursor.fetchone() is not None
+
+
+def install_sqlite_fts(cursor):
+    """
+    Creates the FTS5 table and its triggers if missing; see
+    catalog.search.install_sqlite_fts for why this runs on post_migrate.
+    """
+    cursor.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS customers_customer_fts USING fts5(
+            name,
+            content='customers_customer', content_rowid='id',
+            prefix='2 3', tokenize='unicode61 remove_diacritics 2'
+        )
+    """)
+    cursor.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'customers_customer'"
+    )
+    existing = {row[0] for row in cursor.fetchall()}
+    missing = [sql for name, sql in SQLITE_FTS_TRIGGERS.items() if name not in existing]
+    for sql in missing:
+        cursor.execute(sql)
+    if missing:
+        cursor.execute("INSERT INTO customers_customer_fts(customers_customer_fts) VALUES ('rebuild')")
+
+
+def ensure_sqlite_fts(sender, using, **kwargs):
+    """post_migrate receiver."""
+    from django.db import connections
+    conn = connections[using]
+    if conn.vendor != "sqlite":
+        return
+    with conn.cursor() as cursor:
+        install_sqlite_fts(cursor)
+
+
+def _search_sqlite(shop_id, term, limit):
+    tokens = _TOKEN.findall(term.lower())
+    if not tokens:
+        return []
+    query = " ".join('"' + token.replace('"', '""') + '"*' for token in tokens)
+    sql = f"""
+        SELECT {_COLUMNS} FROM customers_customer_fts f
+        JOIN customers_customer c ON c.id = f.rowid
+        WHERE customers_customer_fts MATCH %s AND c.shop_id = %s
+        ORDER BY lower(c.name) LIKE %s ESCAPE '\\' DESC, f.rank, c.lifetime_spend DESC
+        LIMIT %s
+    """
+    return list(Customer.objects.raw(sql, [query, shop_id, _like_prefix(term), limit]))
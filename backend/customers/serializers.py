@@ -5,7 +5,7 @@ class CustomerSerializer(serializers.ModelSerializer):
     class Meta:
         model = Customer
         fields = '__all__'
-        read_only_fields = ['shop']
+        read_only_fields = ['shop', 'visit_count', 'lifetime_spend', 'average_basket', 'last_purchase_at']
 
 class LoyaltyAccountSerializer(serializers.ModelSerializer):
     class Meta:
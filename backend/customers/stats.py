@@ -0,0 +1,87 @@
+# backend/customers/stats.py
+"""
+Per-customer purchase statistics, updated incrementally.
+
+The invoice write paths pass purchase changes to record_purchases() inside
+their own transaction; all customers touched are updated by ONE UPDATE
+with a CASE per column, relative to the stored values (F()), so concurrent
+invoices for the same customer cannot lose an update. Only INVOICES that
+are not cancelled count, like the sales rollup.
+
+Edits and deletes can leave last_purchase_at pointing at an invoice that no
+longer counts; manage.py reconcile_customer_stats recomputes everything
+from the invoices.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db.models import Case, DateTimeField, DecimalField, F, IntegerField, Value, When
+from django.db.models.functions import Coalesce, Greatest, NullIf
+
+from .models import Customer
+
+_MONEY = DecimalField(max_digits=14, decimal_places=2)
+
+
+def counts_as_purchase(invoice):
+    return (
+        bool(invoice.customer_id)
+        and invoice.invoice_type == "INVOICE"
+        and invoice.status != "CANCELLED"
+    )
+
+
+def purchase(invoice, sign=1):
+    """(customer_id, visits, spend, purchased_at) for `invoice`, or None if it does not count."""
+    if not counts_as_purchase(invoice):
+        return None
+    return (
+        invoice.customer_id,
+        sign,
+        sign * Decimal(invoice.grand_total),
+        invoice.invoice_date if sign > 0 else None,
+    )
+
+
+def record_purchases(purchases):
+    """Applies (customer_id, visits, spend, purchased_at) changes in one UPDATE."""
+    visits = defaultdict(int)
+    spend = defaultdict(Decimal)
+    last = {}
+    for entry in purchases:
+        if entry is None:
+            continue
+        customer_id, visit_change, spend_change, purchased_at = entry
+        visits[customer_id] += visit_change
+        spend[customer_id] += spend_change
+        if purchased_at and (customer_id not in last or purchased_at > last[customer_id]):
+            last[customer_id] = purchased_at
+    changed = [cid for cid in visits if visits[cid] or spend[cid] or cid in last]
+    if not changed:
+        return
+
+    def case(values, output_field):
+        return Case(
+            *[When(id=cid, then=Value(values[cid])) for cid in changed],
+            default=Value(values.default_factory()), output_field=output_field,
+        )
+
+    new_visits = F("visit_count") + case(visits, IntegerField())
+    new_spend = F("lifetime_spend") + case(spend, _MONEY)
+    update = {
+        "visit_count": new_visits,
+        "lifetime_spend": new_spend,
+        # SET expressions read the old row, so the average uses the new totals
+        "average_basket": Coalesce(new_spend / NullIf(new_visits, 0), Value(0), output_field=_MONEY),
+    }
+    if last:
+        # Never moves back: an edited old invoice keeps the latest date
+        update["last_purchase_at"] = Case(
+            *[
+                When(id=cid, then=Greatest(Coalesce(F("last_purchase_at"), Value(ts)), Value(ts)))
+                for cid, ts in last.items()
+            ],
+            default=F("last_purchase_at"),
+            output_field=DateTimeField(),
+        )
+    Customer.objects.filter(id__in=changed).update(**update)
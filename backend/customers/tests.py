@@ -1,3 +1,83 @@
+from decimal import Decimal
+
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from api.models import UserSubscription
+from catalog.models import Product
+from shops.models import Shop
+from .loyalty import apply_loyalty
+from .models import Customer, LoyaltyAccount, LoyaltyTransaction
+
+MOBILE = "9111111111"
+
+
+class LoyaltyTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.shop = Shop.objects.create(name="Shop", contact_phone="9000000000", config={"loyalty": True})
+        self.user = User.objects.create_user(
+            email="owner@example.com", username="owner", password="Passw0rd!",
+            role="SHOP_OWNER", shop=self.shop,
+        )
+        UserSubscription.objects.update_or_create(
+            user=self.user, defaults={"allowed_by_admin": True, "active": True}
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.product = Product.objects.create(shop=self.shop, name="Rice", price=50, quantity=100)
+
+    def sell(self, qty, **extra):
+        return self.client.post("/api/invoices/", {
+            "customer_name": "Asha",
+            "customer_mobile": MOBILE,
+            "items": [{"product": self.product.id, "qty": qty, "unit_price": "50.00"}],
+            **extra,
+        }, format="json")
+
+    def account(self):
+        return LoyaltyAccount.objects.get(shop=self.shop, customer__mobile=MOBILE)
+
+    def test_earn_then_redeem(self):
+        # ₹500 at the default ₹100 per point
+        self.assertEqual(self.sell(10).status_code, 201)
+        self.assertEqual(self.account().points, 5)
+
+        response = self.sell(2, redeem_points=3)
+        self.assertEqual(response.status_code, 201)
+        # ₹100 less ₹3 of redeemed points earns no whole point
+        self.assertEqual(Decimal(response.data["discount_total"]), Decimal("3.00"))
+        self.assertEqual(self.account().points, 2)
+
+        kinds = list(
+            LoyaltyTransaction.objects.filter(account=self.account()).order_by("id")
+            .values_list("kind", "points")
+        )
+        self.assertEqual(kinds, [("EARN", 5), ("REDEEM", -3)])
+
+        customer = Customer.objects.get(shop=self.shop, mobile=MOBILE)
+        balance = self.client.get(f"/api/customers/{customer.id}/loyalty/")
+        self.assertEqual(balance.data["points"], 2)
+
+    def test_redeeming_more_than_the_balance_is_rejected(self):
+        self.sell(10)
+        response = self.sell(2, redeem_points=6)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("redeem_points", response.data)
+        self.assertEqual(self.account().points, 5)
+        self.assertEqual(LoyaltyTransaction.objects.filter(account=self.account()).count(), 1)
+
+    def test_discount_above_the_total_is_rejected(self):
+        response = self.sell(1, discount_total="60.00")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("discount_total", response.data)
+
+    def test_negative_amount_earns_nothing(self):
+        customer = Customer.objects.create(shop=self.shop, name="Asha", mobile=MOBILE)
+        change = apply_loyalty(self.shop.id, customer.id, Decimal("-40"))
 
-# Create your tests here.
+        self.assertEqual((change.earned, change.balance), (0, 0))
@@ -0,0 +1,146 @@
+# backend/reports/gst.py
+"""
+GSTR-1 style monthly tax summary, one grouped query per section.
+
+- rates: taxable value and tax per tax rate. Every sale is B2C (customers
+  carry no GSTIN), so this is also the B2C (small) summary. Tax is split
+  evenly into central and state tax; supplies are treated as intra-state.
+- hsn: the same per HSN code, unit and rate, with quantities.
+- documents: first and last invoice number, total and cancelled count.
+
+Taxable value is qty * unit_price of each line, the value tax was charged
+on. Only INVOICES count; cancelled ones are reported under documents only.
+"""
+import csv
+from decimal import Decimal
+
+from django.db.models import Count, DecimalField, ExpressionWrapper, F, Max, Min, Q, Sum
+
+from sales.models import Invoice, InvoiceItem
+
+from .stock import CENT, ZERO, end_of_day, start_of_day
+
+_MONEY = DecimalField(max_digits=14, decimal_places=2)
+_TAXABLE = ExpressionWrapper(F("qty") * F("unit_price"), output_field=_MONEY)
+_TAX = ExpressionWrapper(F("qty") * F("unit_price") * F("tax_rate") / 100, output_field=_MONEY)
+
+
+def _cents(value):
+    return Decimal(str(value or 0)).quantize(CENT)
+
+
+def _invoices(shop_id, start, end):
+    return Invoice.objects.filter(
+        shop_id=shop_id,
+        invoice_type="INVOICE",
+        invoice_date__gte=start_of_day(start),
+        invoice_date__lt=end_of_day(end),
+    )
+
+
+def _lines(shop_id, start, end):
+    return InvoiceItem.objects.filter(
+        invoice__in=_invoices(shop_id, start, end).exclude(status="CANCELLED")
+    ).order_by()
+
+
+def _with_tax_split(row):
+    row["taxable_value"] = _cents(row["taxable_value"])
+    tax = _cents(row.pop("tax"))
+    row["central_tax"] = (tax / 2).quantize(CENT)
+    row["state_tax"] = tax - row["central_tax"]
+    row["total_tax"] = tax
+    return row
+
+
+def rate_summary(shop_id, start, end):
+    rows = (
+        _lines(shop_id, start, end)
+        .values("tax_rate")
+        .annotate(taxable_value=Sum(_TAXABLE), tax=Sum(_TAX), lines=Count("id"))
+        .order_by("tax_rate")
+    )
+    return [_with_tax_split(row) for row in rows]
+
+
+def hsn_summary(shop_id, start, end):
+    rows = (
+        _lines(shop_id, start, end)
+        .values(hsn=F("product__hsn_code"), unit=F("product__unit"), rate=F("tax_rate"))
+        .annotate(quantity=Sum("qty"), taxable_value=Sum(_TAXABLE), tax=Sum(_TAX))
+        .order_by("hsn", "rate")
+    )
+    result = []
+    for row in rows:
+        row["hsn"] = row["hsn"] or ""
+        row["quantity"] = _cents(row["quantity"])
+        result.append(_with_tax_split(row))
+    return result
+
+
+def document_summary(shop_id, start, end):
+    invoices = _invoices(shop_id, start, end)
+    summary = invoices.aggregate(
+        first=Min("id"), last=Max("id"),
+        total=Count("id"), cancelled=Count("id", filter=Q(status="CANCELLED")),
+    )
+    numbers = dict(
+        invoices.filter(id__in=[summary["first"], summary["last"]]).values_list("id", "number")
+    ) if summary["total"] else {}
+    return {
+        "from_number": numbers.get(summary["first"], ""),
+        "to_number": numbers.get(summary["last"], ""),
+        "total": summary["total"],
+        "cancelled": summary["cancelled"],
+        "net_issued": summary["total"] - summary["cancelled"],
+    }
+
+
+def gst_report(shop_id, start, end):
+    rates = rate_summary(shop_id, start, end)
+    return {
+        "from": start,
+        "to": end,
+        "totals": {
+            "taxable_value": sum((r["taxable_value"] for r in rates), ZERO),
+            "central_tax": sum((r["central_tax"] for r in rates), ZERO),
+            "state_tax": sum((r["state_tax"] for r in rates), ZERO),
+            "total_tax": sum((r["total_tax"] for r in rates), ZERO),
+        },
+        "rates": rates,
+        "hsn": hsn_summary(shop_id, start, end),
+        "documents": document_summary(shop_id, start, end),
+    }
+
+
+# ========== CSV ==========
+class _Echo:
+    """File-like object for csv.writer that hands each row back instead of storing it."""
+    def write(self, value):
+        return value
+
+
+def csv_rows(report):
+    """Yields the report as CSV lines, one section after another."""
+    writer = csv.writer(_Echo())
+    yield writer.writerow(["Rate-wise summary (B2C)", f"{report['from']} to {report['to']}"])
+    yield writer.writerow(["Rate %", "Taxable value", "Central tax", "State tax", "Total tax"])
+    for r in report["rates"]:
+        yield writer.writerow([r["tax_rate"], r["taxable_value"], r["central_tax"], r["state_tax"], r["total_tax"]])
+    t = report["totals"]
+    yield writer.writerow(["Total", t["taxable_value"], t["central_tax"], t["state_tax"], t["total_tax"]])
+    yield writer.writerow([])
+
+    yield writer.writerow(["HSN summary"])
+    yield writer.writerow(["HSN", "Unit", "Quantity", "Rate %", "Taxable value", "Central tax", "State tax", "Total tax"])
+    for r in report["hsn"]:
+        yield writer.writerow([
+            r["hsn"], r["unit"], r["quantity"], r["rate"],
+            r["taxable_value"], r["central_tax"], r["state_tax"], r["total_tax"],
+        ])
+    yield writer.writerow([])
+
+    d = report["documents"]
+    yield writer.writerow(["Documents issued"])
+    yield writer.writerow(["From", "To", "Total", "Cancelled", "Net issued"])
+    yield writer.writerow([d["from_number"], d["to_number"], d["total"], d["cancelled"], d["net_issued"]])
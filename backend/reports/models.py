@@ -1,3 +1,24 @@
 from django.db import models
 
-# Create your models here.
+
+# Per product per day sales of INVOICES, kept current by the invoice write
+# paths (reports/rollup.py). Report queries read this instead of every line.
+class ProductSalesDaily(models.Model):
+    shop = models.ForeignKey('shops.Shop', on_delete=models.CASCADE, related_name='+')
+    product = models.ForeignKey('catalog.Product', on_delete=models.CASCADE, related_name='+')
+    day = models.DateField()
+    qty = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    sales = models.DecimalField(max_digits=14, decimal_places=2, default=0)   # before tax
+    tax = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    cost = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'day'], name='reports_productsalesdaily_product_day'),
+        ]
+        indexes = [
+            models.Index(fields=['shop', 'day']),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} on {self.day}: {self.qty}"
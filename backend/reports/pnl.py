@@ -0,0 +1,72 @@
+# backend/reports/pnl.py
+"""
+Profit and loss for a period, from three index-backed aggregates:
+
+- sales and cost of goods sold from the daily sales rollup (shop, day);
+- invoice discounts, loyalty redemptions included, from the invoices
+  (shop, invoice_date), as in reports/profit.py;
+- expenses by category (shop, date).
+
+INVENTORY expenses are stock purchases: their cost reaches the P&L as COGS
+when the goods sell, so they are listed but not deducted again.
+"""
+from django.db.models import Sum
+
+from api.models import Expense
+from sales.models import Invoice
+
+from .models import ProductSalesDaily
+from .profit import margin
+from .stock import CENT, ZERO, end_of_day, start_of_day
+
+STOCK_PURCHASES = "INVENTORY"
+
+
+def _money(value):
+    return (value or ZERO).quantize(CENT)
+
+
+def profit_and_loss(shop_id, start, end):
+    sales = ProductSalesDaily.objects.filter(
+        shop_id=shop_id, day__gte=start, day__lte=end,
+    ).aggregate(revenue=Sum("sales"), tax=Sum("tax"), cogs=Sum("cost"))
+
+    discounts = Invoice.objects.filter(
+        shop_id=shop_id,
+        invoice_type="INVOICE",
+        invoice_date__gte=start_of_day(start),
+        invoice_date__lt=end_of_day(end),
+    ).exclude(status="CANCELLED").aggregate(total=Sum("discount_total"))["total"]
+
+    by_category = dict(
+        Expense.objects.filter(shop_id=shop_id, date__gte=start, date__lte=end)
+        .values_list("category").annotate(total=Sum("amount")).order_by()
+    )
+    labels = dict(Expense.CATEGORY_CHOICES)
+    expenses = [
+        {"category": category, "label": labels.get(category, category), "amount": _money(total)}
+        for category, total in sorted(by_category.items(), key=lambda item: item[1], reverse=True)
+        if category != STOCK_PURCHASES
+    ]
+
+    revenue = _money(sales["revenue"])
+    net_revenue = revenue - _money(discounts)
+    gross_profit = net_revenue - _money(sales["cogs"])
+    operating = sum((row["amount"] for row in expenses), ZERO)
+    net_profit = gross_profit - operating
+    return {
+        "from": start,
+        "to": end,
+        "revenue": revenue,
+        "discounts": _money(discounts),
+        "net_revenue": net_revenue,
+        "cogs": _money(sales["cogs"]),
+        "gross_profit": gross_profit,
+        "gross_margin": margin(gross_profit, net_revenue),
+        "expenses": expenses,
+        "total_expenses": operating,
+        "net_profit": net_profit,
+        "net_margin": margin(net_profit, net_revenue),
+        "tax_collected": _money(sales["tax"]),
+        "stock_purchases": _money(by_category.get(STOCK_PURCHASES)),
+    }
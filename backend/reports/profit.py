@@ -0,0 +1,68 @@
+# backend/reports/profit.py
+"""
+Gross profit from the daily sales rollup (ProductSalesDaily).
+
+revenue = qty * unit_price (before tax), cost = qty * cost_price, where
+cost_price is copied from the product when the line is written. Invoice-
+level discounts are not spread over lines; the by-day report lists them
+separately and subtracts them in net_profit.
+"""
+from django.db.models import Sum
+from django.db.models.functions import TruncDate
+
+from sales.models import Invoice
+
+from .models import ProductSalesDaily
+from .stock import CENT, ZERO, end_of_day, start_of_day
+
+# group -> grouping columns
+GROUPS = {
+    "day": ("day",),
+    "product": ("product_id", "product__name"),
+    "category": ("product__category",),
+}
+
+
+def _money(value):
+    return (value or ZERO).quantize(CENT)
+
+
+def profit_by(shop_id, start, end, group):
+    """Rows of {<group columns>, quantity, revenue, cost, profit, margin}."""
+    rows = list(
+        ProductSalesDaily.objects.filter(shop_id=shop_id, day__gte=start, day__lte=end)
+        .values(*GROUPS[group])
+        .annotate(quantity=Sum("qty"), revenue=Sum("sales"), cost=Sum("cost"))
+        .order_by()
+    )
+    for row in rows:
+        row["quantity"] = _money(row["quantity"])
+        row["revenue"] = _money(row["revenue"])
+        row["cost"] = _money(row["cost"])
+        row["profit"] = row["revenue"] - row["cost"]
+        row["margin"] = margin(row["profit"], row["revenue"])
+
+    if group == "day":
+        discounts = dict(
+            Invoice.objects.filter(
+                shop_id=shop_id,
+                invoice_type="INVOICE",
+                invoice_date__gte=start_of_day(start),
+                invoice_date__lt=end_of_day(end),
+            ).exclude(status="CANCELLED")
+            .annotate(day=TruncDate("invoice_date"))
+            .values("day").annotate(total=Sum("discount_total"))
+            .values_list("day", "total").order_by()
+        )
+        for row in rows:
+            row["discount"] = _money(discounts.get(row["day"]))
+            row["net_profit"] = row["profit"] - row["discount"]
+        rows.sort(key=lambda row: row["day"])
+    else:
+        rows.sort(key=lambda row: row["profit"], reverse=True)
+    return rows
+
+
+def margin(profit, revenue):
+    """Profit as a percentage of revenue."""
+    return (profit * 100 / revenue).quantize(CENT) if revenue else ZERO
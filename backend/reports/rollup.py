@@ -0,0 +1,100 @@
+# backend/reports/rollup.py
+"""
+Per product per day sales (ProductSalesDaily), kept current incrementally.
+
+The invoice write paths pass the lines they wrote or removed to
+add_sales() inside their own transaction. Everything goes into ONE
+multi-row `INSERT ... ON CONFLICT (product_id, day) DO UPDATE` that adds
+to the stored totals (PostgreSQL, SQLite); other databases fall back to
+one UPDATE / INSERT per row. Only INVOICES that are not cancelled count,
+and only lines linked to a catalog product.
+
+`manage.py rebuild_sales_rollup` recomputes the table from invoice lines.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import connection
+from django.db.models import F
+from django.utils import timezone
+
+from .models import ProductSalesDaily
+
+ZERO = Decimal("0.00")
+CENT = Decimal("0.01")
+_VALUES = ("qty", "sales", "tax", "cost")
+
+
+def counts_as_sale(invoice):
+    return invoice.invoice_type == "INVOICE" and invoice.status != "CANCELLED"
+
+
+def sales_lines(items, sign=1):
+    """
+    (shop_id, product_id, day, qty, sales, tax, cost) for each item that
+    counts as a sale; sign=-1 for lines being removed. Reads item.invoice,
+    so pass items loaded through invoice.items or built with their invoice.
+    """
+    lines = []
+    for item in items:
+        invoice = item.invoice
+        if not item.product_id or not counts_as_sale(invoice):
+            continue
+        qty = Decimal(item.qty)
+        sales = qty * Decimal(item.unit_price)
+        lines.append((
+            invoice.shop_id,
+            item.product_id,
+            timezone.localdate(invoice.invoice_date),
+            sign * qty,
+            sign * sales,
+            sign * sales * Decimal(item.tax_rate) / 100,
+            sign * qty * Decimal(item.cost_price or 0),
+        ))
+    return lines
+
+
+def add_sales(lines):
+    """Adds `lines` (see sales_lines) to ProductSalesDaily in one statement."""
+    totals = defaultdict(lambda: [ZERO] * len(_VALUES))
+    for shop_id, product_id, day, *values in lines:
+        row = totals[(shop_id, product_id, day)]
+        for i, value in enumerate(values):
+            row[i] += value
+    totals = {
+        key: [value.quantize(CENT) for value in values]
+        for key, values in totals.items() if any(values)
+    }
+    if not totals:
+        return
+    if connection.vendor in ("postgresql", "sqlite"):
+        _upsert(totals)
+    else:
+        _update_or_insert(totals)
+
+
+def _upsert(totals):
+    table = ProductSalesDaily._meta.db_table
+    ops = connection.ops
+    params = []
+    for (shop_id, product_id, day), values in totals.items():
+        params += [shop_id, product_id, ops.adapt_datefield_value(day)]
+        params += [ops.adapt_decimalfield_value(value, 14, 2) for value in values]
+    rows = ", ".join(["(%s, %s, %s, %s, %s, %s, %s)"] * len(totals))
+    updates = ", ".join(f"{name} = {table}.{name} + EXCLUDED.{name}" for name in _VALUES)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} (shop_id, product_id, day, {', '.join(_VALUES)}) VALUES {rows} "
+            f"ON CONFLICT (product_id, day) DO UPDATE SET {updates}",
+            params,
+        )
+
+
+def _update_or_insert(totals):
+    for (shop_id, product_id, day), values in totals.items():
+        changes = dict(zip(_VALUES, values))
+        updated = ProductSalesDaily.objects.filter(product_id=product_id, day=day).update(
+            **{name: F(name) + value for name, value in changes.items()}
+        )
+        if not updated:
+            ProductSalesDaily.objects.create(shop_id=shop_id, product_id=product_id, day=day, **changes)
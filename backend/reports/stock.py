@@ -0,0 +1,85 @@
+# backend/reports/stock.py
+"""
+Point-in-time stock figures from the StockHistory ledger.
+
+Quantity at the end of a day = the shop's latest StockSnapshot on or
+before that day + ledger changes between the snapshot and the end of the
+day. Without a snapshot, the current quantity is rewound by the changes
+made after the day. Either way only a bounded slice of the ledger is
+summed, on the (product, created_at) index.
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db.models import Max, Sum
+from django.utils import timezone
+
+from catalog.models import Product, StockHistory, StockSnapshot
+
+ZERO = Decimal("0.00")
+CENT = Decimal("0.01")
+
+
+def start_of_day(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def end_of_day(day):
+    """Start of the next local day — ledger rows before it belong to `day`."""
+    return start_of_day(day + timedelta(days=1))
+
+
+def stock_on_hand(shop_id, day):
+    """product id -> quantity at the end of `day`, for the shop's current products."""
+    end = end_of_day(day)
+    ledger = StockHistory.objects.filter(product__shop_id=shop_id).order_by()
+
+    snapshot_date = (
+        StockSnapshot.objects.filter(shop_id=shop_id, snapshot_date__lte=day)
+        .aggregate(d=Max("snapshot_date"))["d"]
+    )
+    quantities = defaultdict(lambda: ZERO)
+    if snapshot_date is None:
+        quantities.update(
+            Product.objects.filter(shop_id=shop_id).values_list("id", "quantity")
+        )
+        sign = -1
+        changes = ledger.filter(created_at__gte=end)
+    else:
+        taken_at = None
+        for product_id, quantity, taken in StockSnapshot.objects.filter(
+            shop_id=shop_id, snapshot_date=snapshot_date
+        ).values_list("product_id", "quantity", "taken_at"):
+            quantities[product_id] = quantity
+            taken_at = taken
+        sign = 1
+        changes = ledger.filter(created_at__gt=taken_at, created_at__lt=end)
+
+    for product_id, change in changes.values("product_id").annotate(
+        change=Sum("quantity_change")
+    ).values_list("product_id", "change"):
+        quantities[product_id] += sign * Decimal(change).quantize(CENT)
+    return quantities
+
+
+def stock_movements(shop_id, start, end):
+    """
+    product id -> {action: total change} for ledger rows from the start of
+    `start` to the end of `end`.
+    """
+    rows = (
+        StockHistory.objects.filter(
+            product__shop_id=shop_id,
+            created_at__gte=start_of_day(start),
+            created_at__lt=end_of_day(end),
+        )
+        .order_by()
+        .values("product_id", "action")
+        .annotate(change=Sum("quantity_change"))
+        .values_list("product_id", "action", "change")
+    )
+    movements = defaultdict(dict)
+    for product_id, action, change in rows:
+        movements[product_id][action] = Decimal(change).quantize(CENT)
+    return movements
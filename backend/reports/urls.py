@@ -8,4 +8,10 @@ urlpatterns = [
     path('top-products/', views.top_products, name='top-products'),
     path('low-stock/', views.low_stock, name='low-stock'),
     path('payment-modes/', views.payment_mode_breakdown, name='payment-modes'),
+    path('stock-on-hand/', views.stock_on_hand, name='stock-on-hand'),
+    path('stock-movements/', views.stock_movements, name='stock-movements'),
+    path('stock-valuation/', views.stock_valuation, name='stock-valuation'),
+    path('profit/', views.profit, name='profit'),
+    path('profit-loss/', views.profit_loss, name='profit-loss'),
+    path('gst/', views.gst_summary, name='gst-summary'),
 ]
\ No newline at end of file
@@ -1,17 +1,23 @@
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from django.db.models import Sum, Count, Avg
+from rest_framework.exceptions import ValidationError
+from django.db.models import F, Sum, Count, Avg
+from django.http import StreamingHttpResponse
 from django.utils import timezone
+from django.utils.dateparse import parse_date
 from datetime import timedelta
-from sales.models import Invoice, InvoiceItem
+from decimal import Decimal
+from sales.models import Invoice
 from catalog.models import Product
+from . import gst, pnl, profit as profit_report, stock
+from .models import ProductSalesDaily
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def sales_summary(request):
-    shop = request.user.shop
+    shop = request.user.shop_id
     if not shop:
         return Response({"error": "No shop associated"}, status=400)
 
@@ -35,46 +41,61 @@ def sales_summary(request):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def top_products(request):
-    shop = request.user.shop
+    """
+    ?from=YYYY-MM-DD&to=YYYY-MM-DD (default: all time)&limit=10
+    Best sellers by revenue (incl. tax), from the daily sales rollup.
+    """
+    shop = request.user.shop_id
     if not shop:
         return Response({"error": "No shop associated"}, status=400)
 
-    top = InvoiceItem.objects.filter(
-        invoice__shop=shop
-    ).select_related(          # ✅ add this
-        'product', 'invoice'
-    ).values(
+    rows = ProductSalesDaily.objects.filter(shop_id=shop)
+    start = _param_date(request, 'from', None)
+    end = _param_date(request, 'to', None)
+    if start:
+        rows = rows.filter(day__gte=start)
+    if end:
+        rows = rows.filter(day__lte=end)
+    try:
+        limit = min(max(int(request.query_params.get('limit', 10)), 1), 100)
+    except ValueError:
+        limit = 10
+
+    top = rows.values(
         'product__id', 'product__name'
     ).annotate(
         total_qty=Sum('qty'),
-        total_revenue=Sum('line_total')
-    ).order_by('-total_revenue')[:10]
+        total_revenue=Sum(F('sales') + F('tax')),
+    ).order_by('-total_revenue')[:limit]
 
-    return Response(list(top))
+    return Response([
+        {**row,
+         "total_qty": Decimal(row['total_qty']).quantize(stock.CENT),
+         "total_revenue": Decimal(row['total_revenue']).quantize(stock.CENT)}
+        for row in top
+    ])
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def low_stock(request):
-    shop = request.user.shop
+    shop = request.user.shop_id
     if not shop:
         return Response({"error": "No shop associated"}, status=400)
 
+    # Same condition and order as the catalog_product_low_stock partial index
     products = Product.objects.filter(
-        shop=shop,
+        shop_id=shop,
         is_active=True,
-    ).filter(
-        quantity__lte=models.F('low_stock_threshold')
-    ).values('id', 'name', 'quantity', 'low_stock_threshold')
+        quantity__lte=F('low_stock_threshold'),
+    ).order_by('name').values('id', 'name', 'quantity', 'low_stock_threshold')
 
-    from catalog.models import Product
-    from django.db import models
     return Response(list(products))
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def payment_mode_breakdown(request):
-    shop = request.user.shop
+    shop = request.user.shop_id
     if not shop:
         return Response({"error": "No shop associated"}, status=400)
 
@@ -85,4 +106,190 @@ def payment_mode_breakdown(request):
         total=Sum('grand_total')
     ).order_by('-total')
 
-    return Response(list(breakdown))
\ No newline at end of file
+    return Response(list(breakdown))
+
+
+# ========== STOCK (from the StockHistory ledger) ==========
+MOVEMENT_ACTIONS = {'SALE': 'sold', 'RETURN': 'returned', 'RESTOCK': 'restocked', 'ADJUSTMENT': 'adjusted'}
+
+
+def _param_date(request, name, default):
+    value = request.query_params.get(name)
+    if not value:
+        return default
+    try:
+        day = parse_date(value)
+    except ValueError:      # well formed but not a real date
+        day = None
+    if day is None:
+        raise ValidationError({name: "Use YYYY-MM-DD."})
+    return day
+
+
+def _param_period(request):
+    """(start, end) from ?month=YYYY-MM, else ?from=&to= dates (default: this month)."""
+    month = request.query_params.get('month')
+    if month:
+        try:
+            start = parse_date(f"{month}-01") if len(month) == 7 else None
+        except ValueError:
+            start = None
+        if start is None:
+            raise ValidationError({"month": "Use YYYY-MM."})
+        end = (start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+    else:
+        today = timezone.localdate()
+        start = _param_date(request, 'from', today.replace(day=1))
+        end = _param_date(request, 'to', today)
+    if start > end:
+        raise ValidationError({"from": "Must not be after 'to'."})
+    return start, end
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def stock_on_hand(request):
+    """?date=YYYY-MM-DD (default today) — quantity of every product at the end of that day."""
+    shop = request.user.shop_id
+    if not shop:
+        return Response({"error": "No shop associated"}, status=400)
+
+    day = _param_date(request, 'date', timezone.localdate())
+    quantities = stock.stock_on_hand(shop, day)
+    products = Product.objects.filter(shop_id=shop).order_by('name').values('id', 'name', 'sku', 'unit')
+    return Response({
+        "date": day,
+        "products": [{**p, "quantity": quantities[p['id']]} for p in products],
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def stock_movements(request):
+    """
+    ?from=YYYY-MM-DD&to=YYYY-MM-DD (default: this month) — per product:
+    opening and closing quantity, and the change by action in between.
+    """
+    shop = request.user.shop_id
+    if not shop:
+        return Response({"error": "No shop associated"}, status=400)
+
+    today = timezone.localdate()
+    start = _param_date(request, 'from', today.replace(day=1))
+    end = _param_date(request, 'to', today)
+    if start > end:
+        raise ValidationError({"from": "Must not be after 'to'."})
+
+    movements = stock.stock_movements(shop, start, end)
+    opening = stock.stock_on_hand(shop, start - timedelta(days=1))
+    closing = stock.stock_on_hand(shop, end)
+    products = Product.objects.filter(shop_id=shop, id__in=movements).order_by('name').values('id', 'name', 'sku', 'unit')
+
+    rows = []
+    for p in products:
+        changes = movements[p['id']]
+        rows.append({
+            **p,
+            "opening": opening[p['id']],
+            **{label: changes.get(action, stock.ZERO) for action, label in MOVEMENT_ACTIONS.items()},
+            "closing": closing[p['id']],
+        })
+    return Response({"from": start, "to": end, "products": rows})
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def stock_valuation(request):
+    """?date=YYYY-MM-DD (default today) — stock on hand valued at Product.cost_price."""
+    shop = request.user.shop_id
+    if not shop:
+        return Response({"error": "No shop associated"}, status=400)
+
+    day = _param_date(request, 'date', timezone.localdate())
+    quantities = stock.stock_on_hand(shop, day)
+    rows = []
+    total = stock.ZERO
+    for p in Product.objects.filter(shop_id=shop).values('id', 'name', 'sku', 'cost_price'):
+        quantity = quantities[p['id']]
+        if not quantity:
+            continue
+        value = (quantity * p['cost_price']).quantize(stock.CENT)
+        total += value
+        rows.append({**p, "quantity": quantity, "value": value})
+    rows.sort(key=lambda row: row['value'], reverse=True)
+    return Response({"date": day, "total_value": total, "products": rows})
+
+
+# ========== PROFIT ==========
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def profit(request):
+    """
+    ?from=YYYY-MM-DD&to=YYYY-MM-DD (default: this month)&group=day|product|category
+    Revenue (before tax), cost at sale time, profit and margin %.
+    """
+    shop = request.user.shop_id
+    if not shop:
+        return Response({"error": "No shop associated"}, status=400)
+
+    today = timezone.localdate()
+    start = _param_date(request, 'from', today.replace(day=1))
+    end = _param_date(request, 'to', today)
+    if start > end:
+        raise ValidationError({"from": "Must not be after 'to'."})
+    group = request.query_params.get('group', 'day')
+    if group not in profit_report.GROUPS:
+        raise ValidationError({"group": f"One of: {', '.join(profit_report.GROUPS)}."})
+
+    rows = profit_report.profit_by(shop, start, end, group)
+    revenue = sum((row['revenue'] for row in rows), stock.ZERO)
+    cost = sum((row['cost'] for row in rows), stock.ZERO)
+    return Response({
+        "from": start,
+        "to": end,
+        "group": group,
+        "totals": {
+            "revenue": revenue,
+            "cost": cost,
+            "profit": revenue - cost,
+            "margin": profit_report.margin(revenue - cost, revenue),
+        },
+        "rows": rows,
+    })
+
+
+# ========== PROFIT AND LOSS ==========
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def profit_loss(request):
+    """
+    ?month=YYYY-MM (default: this month), or ?from=&to= dates.
+    Sales, discounts, cost of goods sold, expenses by category and net profit.
+    """
+    shop = request.user.shop_id
+    if not shop:
+        return Response({"error": "No shop associated"}, status=400)
+
+    start, end = _param_period(request)
+    return Response(pnl.profit_and_loss(shop, start, end))
+
+
+# ========== GST ==========
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def gst_summary(request):
+    """
+    ?month=YYYY-MM (default: this month), or ?from=&to= dates.
+    Rate-wise, HSN-wise and document summaries; ?export=csv streams a CSV.
+    """
+    shop = request.user.shop_id
+    if not shop:
+        return Response({"error": "No shop associated"}, status=400)
+
+    start, end = _param_period(request)
+    report = gst.gst_report(shop, start, end)
+    if request.query_params.get('export') == 'csv':
+        response = StreamingHttpResponse(gst.csv_rows(report), content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="gst-{start:%Y-%m-%d}-{end:%Y-%m-%d}.csv"'
+        return response
+    return Response(report)
@@ -1,5 +1,7 @@
 # backend/sales/admin.py
 from django.contrib import admin
+
+from api.admin_pagination import LargeTableAdminMixin, shop_filter_link
 from .models import Invoice, InvoiceItem
 
 class InvoiceItemInline(admin.TabularInline):
@@ -9,10 +11,17 @@ class InvoiceItemInline(admin.TabularInline):
     readonly_fields = ('line_total',)
 
 @admin.register(Invoice)
-class InvoiceAdmin(admin.ModelAdmin):
-    list_display = ('number', 'shop', 'customer_name', 'grand_total', 'status', 'invoice_date')
-    list_filter = ('status', 'shop', 'invoice_date')
-    search_fields = ('number', 'customer_name', 'customer_mobile', 'shop__name')
-    raw_id_fields = ('shop', 'customer', 'created_by')
+class InvoiceAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    list_display = ('number', shop_filter_link, 'customer_name', 'grand_total', 'status', 'invoice_date')
+    list_filter = ('status', 'invoice_type')
+    list_select_related = ('shop',)
+    # No join to the shop; on PostgreSQL each column has a matching index
+    # (migration 0017)
+    search_fields = ('^number', '^customer_mobile', 'customer_name')
+    search_help_text = 'Invoice number or customer mobile (prefix), or customer name.'
+    date_hierarchy = 'invoice_date'
+    ordering = ('-invoice_date',)
+    autocomplete_fields = ('shop', 'customer')
+    raw_id_fields = ('created_by',)
     inlines = [InvoiceItemInline]
-    readonly_fields = ('created_at', 'updated_at')
\ No newline at end of file
+    readonly_fields = ('created_at', 'updated_at')
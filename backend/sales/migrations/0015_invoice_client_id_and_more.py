@@ -0,0 +1,26 @@
+# Generated by Django 6.0.3 on 2026-10-19 15:34
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('customers', '0002_customer_customers_c_shop_id_b7c2d3_idx_and_more'),
+        ('sales', '0014_invoiceitem_original_price'),
+        ('shops', '0009_shop_shops_shop_contact_7e5a43_idx'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='invoice',
+            name='client_id',
+            field=models.UUIDField(blank=True, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='invoice',
+            constraint=models.UniqueConstraint(condition=models.Q(('client_id__isnull', False)), fields=('shop', 'client_id'), name='sales_invoice_shop_client_id'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 6.0.3 on 2026-10-19 15:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0015_invoice_client_id_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['invoice_date'], name='sales_invoice_date'),
+        ),
+    ]
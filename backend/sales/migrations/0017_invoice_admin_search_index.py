@@ -0,0 +1,44 @@
+# Indexes for the invoice admin search (PostgreSQL only). The admin's
+# '^number' / '^customer_mobile' compile to UPPER(col::text) LIKE 'X%',
+# served by text_pattern_ops btrees on that expression; 'customer_name'
+# compiles to UPPER(col::text) LIKE '%X%', served by a trigram GIN index.
+# SQLite has no equivalent and scans, as before.
+
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS sales_invoice_number_prefix "
+        "ON sales_invoice (UPPER(number::text) text_pattern_ops)"
+    )
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS sales_invoice_mobile_prefix "
+        "ON sales_invoice (UPPER(customer_mobile::text) text_pattern_ops)"
+    )
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS sales_invoice_customer_name_trgm "
+        "ON sales_invoice USING gin (UPPER(customer_name::text) gin_trgm_ops)"
+    )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute("DROP INDEX IF EXISTS sales_invoice_number_prefix")
+    schema_editor.execute("DROP INDEX IF EXISTS sales_invoice_mobile_prefix")
+    schema_editor.execute("DROP INDEX IF EXISTS sales_invoice_customer_name_trgm")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0016_invoice_date_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
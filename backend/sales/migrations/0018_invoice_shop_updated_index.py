@@ -0,0 +1,17 @@
+# Generated by Django 6.0.3 on 2026-10-19 16:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('sales', '0017_invoice_admin_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='invoice',
+            index=models.Index(fields=['shop', 'updated_at'], name='sales_invoice_shop_updated'),
+        ),
+    ]
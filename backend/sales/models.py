@@ -14,6 +14,8 @@ class Invoice(models.Model):
     customer_mobile = models.CharField(max_length=15, null=True, blank=True)
 
     number = models.CharField(max_length=64, unique=True)
+    # Generated by offline billing counters; makes bulk sync retries safe
+    client_id = models.UUIDField(null=True, blank=True)
     invoice_date = models.DateTimeField(auto_now_add=True)
 
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
@@ -35,6 +37,17 @@ class Invoice(models.Model):
             models.Index(fields=['shop', 'invoice_date']),
             models.Index(fields=['shop', 'status']),
             models.Index(fields=['shop', 'payment_mode']),
+            # Admin changelist: date hierarchy and newest-first ordering across shops
+            models.Index(fields=['invoice_date'], name='sales_invoice_date'),
+            # refresh_shop_activity --changed: invoices written since a refresh
+            models.Index(fields=['shop', 'updated_at'], name='sales_invoice_shop_updated'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['shop', 'client_id'],
+                condition=models.Q(client_id__isnull=False),
+                name='sales_invoice_shop_client_id',
+            ),
         ]
 
     def __str__(self):
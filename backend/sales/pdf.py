@@ -6,23 +6,14 @@ from io import BytesIO
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image # Update imports
 import os
 
-def generate_invoice_pdf(invoice):
+def generate_invoice_pdf(invoice, shop):
+    """`shop` is the invoice's ShopContext (shops.context)."""
     buffer = BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=A4)
     styles = getSampleStyleSheet()
     elements = []
 
     # Shop Info
-    shop = invoice.shop
-    if shop.logo:
-        try:
-            # Adjust width and height to fit the header
-            logo = Image(shop.logo.path, width=60, height=60)
-            logo.hAlign = 'LEFT'
-            elements.append(logo)
-            elements.append(Spacer(1, 6))
-        except Exception:
-            pass
     elements.append(Paragraph(f"<b>{shop.name}</b>", styles['Title']))
     elements.append(Paragraph(shop.address, styles['Normal']))
     elements.append(Paragraph(f"Phone: {shop.contact_phone}", styles['Normal']))
@@ -39,7 +30,7 @@ def generate_invoice_pdf(invoice):
     elements.append(Spacer(1, 12))
 
     # Items Table
-    currency = shop.config.get('tax', {}).get('currency', '₹')
+    currency = shop.display_currency
     table_data = [['#', 'Product', 'Qty', 'Unit Price', 'Tax %', 'Total']]
     for i, item in enumerate(invoice.items.select_related('product'), 1):
         table_data.append([
@@ -0,0 +1,283 @@
+# backend/sales/services.py
+"""
+Invoice write path, shared by POST /api/invoices/ and /api/invoices/bulk/.
+
+create_invoices() writes any number of invoices for one shop with a fixed
+number of statements, however many invoices and items there are:
+
+1. Lock the shop row (held until commit, serialising numbering and
+   client_id checks), then SELECT invoices whose client_id was already
+   synced (retried uploads). Two retries of one upload cannot both miss.
+2. SELECT the referenced products, limited to the shop.
+3. Loyalty redemptions, only when an entry redeems points: one SELECT of
+   the existing customers, then one statement per redeeming invoice
+   (customers/loyalty.py). A failed redemption drops the entry before
+   any customer is created for it.
+   Customers: one INSERT ... ON CONFLICT (shop, mobile) returning the ids
+   of new and existing ones, for the entries still pending. Then, for
+   shops with loyalty on, one statement per other invoice earning points.
+4. One UPDATE reserving a block of invoice/quotation numbers.
+5. Multi-row INSERTs for the headers and for the items.
+6. One UPDATE ... RETURNING applying the net stock change of every
+   product, and one INSERT of the StockHistory rows (catalog/stock.py).
+7. One upsert into the per product per day sales rollup (reports/rollup.py).
+8. One UPDATE of the customers' purchase statistics (customers/stats.py).
+9. One INSERT of the loyalty ledger rows.
+
+Entries are InvoiceSerializer validated data; an item's `product` may be
+a Product or a primary key.
+"""
+from collections import defaultdict
+from dataclasses import dataclass, field
+
+from django.db import transaction
+from django.db.models import F
+
+from catalog.models import Product
+from catalog.stock import move_stock
+from customers.loyalty import LoyaltyError, apply_loyalty, loyalty_enabled, record_loyalty
+from customers.models import Customer
+from customers.stats import purchase, record_purchases
+from reports.rollup import add_sales, sales_lines
+from shops.models import Shop
+from .models import Invoice, InvoiceItem
+
+# invoice_type -> (number prefix, Shop counter field)
+NUMBERING = {
+    "INVOICE": ("INV", "counter_invoice"),
+    "QUOTATION": ("QUA", "counter_quotation"),
+}
+
+
+@dataclass
+class InvoiceResult:
+    invoice: Invoice = None
+    created: bool = False            # False with an invoice: client_id was already synced
+    errors: dict = field(default_factory=dict)
+
+
+def _product_id(value):
+    return getattr(value, "pk", value)
+
+
+def _invoice_type(entry):
+    return entry.get("invoice_type") or "INVOICE"
+
+
+@transaction.atomic
+def create_invoices(shop_id, user, entries):
+    """Returns one InvoiceResult per entry, in order."""
+    results = [InvoiceResult() for _ in entries]
+    pending = list(range(len(entries)))
+
+    # 1. client_ids already synced, or repeated within this batch. The shop
+    # lock comes first, and always: a concurrent retry then commits before
+    # the SELECT, and the lock order (shop, then customers) never varies.
+    list(Shop.objects.select_for_update().filter(id=shop_id).values_list("id"))
+    client_ids = [e.get("client_id") for e in entries if e.get("client_id")]
+    if client_ids:
+        synced = {
+            inv.client_id: inv
+            for inv in Invoice.objects.filter(shop_id=shop_id, client_id__in=client_ids)
+        }
+        seen = set()
+        for i in list(pending):
+            client_id = entries[i].get("client_id")
+            if not client_id:
+                continue
+            if client_id in synced:
+                results[i].invoice = synced[client_id]
+                pending.remove(i)
+            elif client_id in seen:
+                results[i].errors = {"client_id": ["Repeated in this batch."]}
+                pending.remove(i)
+            seen.add(client_id)
+
+    # 2. Products — only the shop's own
+    wanted = {
+        _product_id(item.get("product"))
+        for i in pending for item in entries[i]["items"] if item.get("product")
+    }
+    products = (
+        Product.objects.filter(shop_id=shop_id, id__in=wanted)
+        .only("id", "name", "cost_price").in_bulk()
+    )
+    for i in list(pending):
+        unknown = sorted({
+            _product_id(item["product"]) for item in entries[i]["items"] if item.get("product")
+        } - products.keys())
+        if unknown:
+            results[i].errors = {"items": [f"Unknown product(s): {', '.join(map(str, unknown))}"]}
+            pending.remove(i)
+
+    if not pending:
+        return results
+
+    loyalty = _redeem_loyalty(shop_id, entries, pending, results)
+    if not pending:
+        return results
+    customers = _resolve_customers(shop_id, [entries[i] for i in pending])
+    loyalty.update(_earn_loyalty(shop_id, entries, pending, customers, loyalty))
+    numbers = _reserve_numbers(shop_id, [_invoice_type(entries[i]) for i in pending])
+
+    # 3. Headers and items
+    invoices, items = [], []
+    stock = []                       # (product id, change, invoice number)
+    for i, number in zip(pending, numbers):
+        entry = entries[i]
+        inv_type = _invoice_type(entry)
+        c_name = entry.get("customer_name", "Walk-in")
+        c_mobile = entry.get("customer_mobile")
+        discount_amount = entry.get("discount_total", 0)
+        if i in loyalty:
+            discount_amount += loyalty[i].discount       # redeemed points
+
+        invoice = Invoice(
+            shop_id=shop_id,
+            customer_id=customers.get(c_mobile) if c_mobile else None,
+            customer_name=c_name,
+            customer_mobile=c_mobile,
+            status=entry.get("status", "PAID"),
+            invoice_type=inv_type,
+            number=number,
+            payment_mode=entry.get("payment_mode", "cash"),
+            created_by=user,
+            discount_total=discount_amount,
+            client_id=entry.get("client_id"),
+        )
+
+        total_calc = 0
+        tax_calc = 0
+        for item in entry["items"]:
+            prod = products.get(_product_id(item.get("product")))
+            qty = item["qty"]
+            price = item["unit_price"]
+            tax = item.get("tax_rate", 0)
+
+            line_total = price * qty
+            line_tax = (line_total * tax) / 100
+            total_calc += line_total
+            tax_calc += line_tax
+
+            items.append(InvoiceItem(
+                invoice=invoice,
+                product=prod,
+                product_name=item.get("product_name") or (prod.name if prod else None),
+                qty=qty,
+                unit_price=price,
+                original_price=item.get("original_price"),
+                tax_rate=tax,
+                cost_price=prod.cost_price if prod else 0,   # cost at sale time, for profit reports
+                line_total=line_total + line_tax,
+            ))
+            # Stock moves only for INVOICES and only for linked products
+            if inv_type == "INVOICE" and prod:
+                stock.append((prod.id, -qty, number))
+
+        invoice.subtotal = total_calc
+        invoice.tax_total = tax_calc
+        invoice.grand_total = (total_calc + tax_calc) - discount_amount
+        invoices.append(invoice)
+        results[i].invoice = invoice
+        results[i].created = True
+
+    Invoice.objects.bulk_create(invoices)
+    InvoiceItem.objects.bulk_create(items)
+    move_stock(stock, "SALE", user=user)
+    add_sales(sales_lines(items))
+    record_purchases(purchase(invoice) for invoice in invoices)
+    record_loyalty([(results[i].invoice, change) for i, change in loyalty.items()])
+    return results
+
+
+def _resolve_customers(shop_id, entries):
+    """mobile -> customer id, creating the missing ones — one INSERT ... ON CONFLICT."""
+    names = {}
+    for entry in entries:
+        mobile = entry.get("customer_mobile")
+        if mobile:
+            names.setdefault(mobile, entry.get("customer_name", "Walk-in"))
+    return Customer.objects.resolve_ids(shop_id, names)
+
+
+def _grand_total(entry):
+    total = sum(
+        item["unit_price"] * item["qty"] * (100 + item.get("tax_rate", 0)) / 100
+        for item in entry["items"]
+    )
+    return total - entry.get("discount_total", 0)
+
+
+def _earns_loyalty(enabled, entry):
+    return bool(
+        enabled and entry.get("customer_mobile")
+        and _invoice_type(entry) == "INVOICE" and entry.get("status") != "CANCELLED"
+    )
+
+
+def _redeem_loyalty(shop_id, entries, pending, results):
+    """
+    index -> LoyaltyChange for the pending entries redeeming points (which
+    also earn on the rest of their total). Only existing customers can hold
+    points, so no customer is created here. An entry whose redemption
+    cannot be applied gets an error and leaves `pending`.
+    """
+    redeeming = [i for i in pending if entries[i].get("redeem_points")]
+    if not redeeming:
+        return {}
+    enabled = loyalty_enabled(shop_id)
+    existing = dict(
+        Customer.objects.filter(
+            shop_id=shop_id,
+            mobile__in={entries[i]["customer_mobile"] for i in redeeming if entries[i].get("customer_mobile")},
+        ).values_list("mobile", "id")
+    )
+    changes = {}
+    for i in redeeming:
+        entry = entries[i]
+        redeem = entry["redeem_points"]
+        if not _earns_loyalty(enabled, entry):
+            results[i].errors = {"redeem_points": ["Loyalty points cannot be redeemed on this invoice."]}
+            pending.remove(i)
+            continue
+        try:
+            customer_id = existing.get(entry["customer_mobile"])
+            if customer_id is None:
+                raise LoyaltyError(f"Not enough loyalty points to redeem {redeem}.")
+            changes[i] = apply_loyalty(shop_id, customer_id, _grand_total(entry), redeem)
+        except LoyaltyError as exc:
+            results[i].errors = {"redeem_points": [str(exc)]}
+            pending.remove(i)
+    return changes
+
+
+def _earn_loyalty(shop_id, entries, pending, customers, redeemed):
+    """index -> LoyaltyChange for the other pending invoices with a customer."""
+    if not loyalty_enabled(shop_id):
+        return {}
+    return {
+        i: apply_loyalty(shop_id, customers[entries[i]["customer_mobile"]], _grand_total(entries[i]))
+        for i in pending if i not in redeemed and _earns_loyalty(True, entries[i])
+    }
+
+
+def _reserve_numbers(shop_id, invoice_types):
+    """Numbers for `invoice_types`, in order, from one UPDATE of the shop counters."""
+    counts = defaultdict(int)
+    for inv_type in invoice_types:
+        counts[inv_type] += 1
+    counter_fields = {inv_type: NUMBERING[inv_type][1] for inv_type in counts}
+
+    shops = Shop.objects.filter(id=shop_id)
+    shops.update(**{name: F(name) + counts[inv_type] for inv_type, name in counter_fields.items()})
+    ends = shops.values(*counter_fields.values()).get()
+
+    next_counter = {
+        inv_type: ends[name] - counts[inv_type] + 1 for inv_type, name in counter_fields.items()
+    }
+    numbers = []
+    for inv_type in invoice_types:
+        numbers.append(f"{NUMBERING[inv_type][0]}-{shop_id}-{next_counter[inv_type]}")
+        next_counter[inv_type] += 1
+    return numbers
+
@@ -1,3 +1,126 @@
+import uuid
+from decimal import Decimal
+
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from accounts.models import User
+from api.models import UserSubscription
+from catalog.models import Product, StockHistory
+from customers.models import Customer
+from shops.models import Shop
+from .models import Invoice
+
+
+class InvoiceTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.shop = Shop.objects.create(name="Shop", contact_phone="9000000000")
+        self.user = User.objects.create_user(
+            email="owner@example.com", username="owner", password="Passw0rd!",
+            role="SHOP_OWNER", shop=self.shop,
+        )
+        UserSubscription.objects.update_or_create(
+            user=self.user, defaults={"allowed_by_admin": True, "active": True}
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.product = Product.objects.create(shop=self.shop, name="Soap", price=10, quantity=50)
+
+    def entry(self, qty=1, **extra):
+        return {
+            "customer_name": "Asha",
+            "items": [{"product": self.product.id, "qty": qty, "unit_price": "10.00"}],
+            **extra,
+        }
+
+    def bulk(self, *entries):
+        response = self.client.post("/api/invoices/bulk/", {"invoices": list(entries)}, format="json")
+        self.assertEqual(response.status_code, 200)
+        return response.data["results"]
+
+    def quantity(self):
+        self.product.refresh_from_db()
+        return self.product.quantity
+
+
+class BulkSyncTests(InvoiceTestCase):
+    def test_replayed_client_id_returns_the_synced_invoice(self):
+        entry = self.entry(client_id=str(uuid.uuid4()))
+        first, = self.bulk(entry)
+        again, = self.bulk(entry)
+
+        self.assertEqual(first["status"], "created")
+        self.assertEqual(again["status"], "exists")
+        self.assertEqual(again["id"], first["id"])
+        self.assertEqual(Invoice.objects.filter(shop=self.shop).count(), 1)
+        self.assertEqual(self.quantity(), 49)
+
+    def test_client_id_repeated_in_one_batch(self):
+        client_id = str(uuid.uuid4())
+        first, second = self.bulk(self.entry(client_id=client_id), self.entry(client_id=client_id))
+
+        self.assertEqual(first["status"], "created")
+        self.assertEqual(second["status"], "error")
+        self.assertEqual(Invoice.objects.filter(shop=self.shop).count(), 1)
+
+    def test_failing_entry_does_not_affect_the_others(self):
+        other = Product.objects.create(
+            shop=Shop.objects.create(name="Other", contact_phone="9000000001"),
+            name="Not ours", price=5, quantity=5,
+        )
+        bad = self.entry(client_id=str(uuid.uuid4()), customer_mobile="9111111111")
+        bad["items"][0]["product"] = other.id
+        results = self.bulk(
+            self.entry(client_id=str(uuid.uuid4())),
+            bad,
+            {"client_id": str(uuid.uuid4()), "items": [{"product": self.product.id, "qty": 1}]},
+            self.entry(qty=2, client_id=str(uuid.uuid4())),
+        )
+
+        self.assertEqual([r["status"] for r in results], ["created", "error", "error", "created"])
+        self.assertEqual(Invoice.objects.filter(shop=self.shop).count(), 2)
+        self.assertEqual(self.quantity(), 47)
+        # The failed entry leaves no customer behind
+        self.assertFalse(Customer.objects.filter(shop=self.shop, mobile="9111111111").exists())
+
+    def test_failed_redemption_creates_no_customer(self):
+        self.shop.config = {**(self.shop.config or {}), "loyalty": True}
+        self.shop.save()
+        result, = self.bulk(self.entry(
+            client_id=str(uuid.uuid4()), customer_mobile="9222222222", redeem_points=5,
+        ))
+
+        self.assertEqual(result["status"], "error")
+        self.assertIn("redeem_points", result["errors"])
+        self.assertFalse(Customer.objects.filter(shop=self.shop, mobile="9222222222").exists())
+
+
+class StockLedgerTests(InvoiceTestCase):
+    def ledger(self):
+        return list(
+            StockHistory.objects.filter(product=self.product).order_by("id")
+            .values_list("action", "quantity_change", "quantity_before", "quantity_after")
+        )
+
+    def test_create_update_and_delete(self):
+        response = self.client.post("/api/invoices/", self.entry(qty=3), format="json")
+        self.assertEqual(response.status_code, 201)
+        invoice_id = response.data["id"]
+        self.assertEqual(self.quantity(), 47)
+
+        response = self.client.put(f"/api/invoices/{invoice_id}/", self.entry(qty=5), format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.quantity(), 45)
+
+        response = self.client.delete(f"/api/invoices/{invoice_id}/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.quantity(), 50)
 
-# Create your tests here.
+        ledger = self.ledger()
+        self.assertEqual(ledger[0], ("SALE", Decimal("-3"), Decimal("50"), Decimal("47")))
+        # The update records only the net change
+        self.assertEqual(ledger[1][1:], (Decimal("-2"), Decimal("47"), Decimal("45")))
+        self.assertEqual(ledger[-1], ("RETURN", Decimal("5"), Decimal("45"), Decimal("50")))
+        self.assertEqual(sum(row[1] for row in ledger), 0)
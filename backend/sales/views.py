@@ -6,13 +6,14 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from .models import Invoice
 from .pdf import generate_invoice_pdf
+from shops.context import get_shop_context
 from urllib.parse import quote
 
 # ✅ Keep your existing one — but add shop filter (it was missing!)
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def invoice_report(request):
-    shop = request.user.shop  # ✅ added — was missing before
+    shop = request.user.shop_id  # ✅ added — was missing before
     today = now().date()
     month = today.month
     year = today.year
@@ -36,14 +37,14 @@ def invoice_pdf(request, invoice_id):
     try:
         invoice = Invoice.objects.prefetch_related(
             'items__product'
-        ).select_related('shop', 'customer').get(
+        ).select_related('customer').get(
             id=invoice_id,
-            shop=request.user.shop
+            shop_id=request.user.shop_id
         )
     except Invoice.DoesNotExist:
         return Response({"error": "Invoice not found"}, status=404)
 
-    buffer = generate_invoice_pdf(invoice)
+    buffer = generate_invoice_pdf(invoice, get_shop_context(invoice.shop_id))
     return FileResponse(
         buffer,
         as_attachment=True,
@@ -54,16 +55,16 @@ def invoice_pdf(request, invoice_id):
 @permission_classes([IsAuthenticated])
 def invoice_whatsapp(request, invoice_id):
     try:
-        invoice = Invoice.objects.select_related('shop').get(
+        invoice = Invoice.objects.get(
             id=invoice_id,
-            shop=request.user.shop
+            shop_id=request.user.shop_id
         )
     except Invoice.DoesNotExist:
         from rest_framework.response import Response
         return Response({"error": "Invoice not found"}, status=404)
 
-    shop = invoice.shop
-    currency = shop.config.get('tax', {}).get('currency', '₹')
+    shop = get_shop_context(invoice.shop_id)
+    currency = shop.display_currency
     mobile = invoice.customer_mobile or ''
 
     message = (
@@ -1,6 +1,8 @@
 # backend/shops/admin.py
 from django.contrib import admin
-from .models import Shop, TaxProfile # <-- Removed SubscriptionPlan
+
+from api.admin_pagination import LargeTableAdminMixin
+from .models import Shop, ShopActivitySummary, TaxProfile # <-- Removed SubscriptionPlan
 
 # This model is registered in api/admin.py, so we remove it from here
 # @admin.register(SubscriptionPlan)
@@ -10,14 +12,19 @@ from .models import Shop, TaxProfile # <-- Removed SubscriptionPlan
 
 
 @admin.register(Shop)
-class ShopAdmin(admin.ModelAdmin):
+class ShopAdmin(LargeTableAdminMixin, admin.ModelAdmin):
     list_display = (
         "name",
         "business_type",
+        "active_subscription",
         "is_active", # Removed fields that aren't on this model
+        "created_at",
     )
     list_filter = ("business_type", "language", "is_active")
-    search_fields = ("name", "contact_phone", "contact_email")
+    list_select_related = ("active_subscription",)
+    # Also what the shop autocomplete of the other admins searches
+    search_fields = ("name", "^contact_phone", "contact_email")
+    ordering = ("-id",)
     
     # This makes it easier to find shops when linking them to users
     raw_id_fields = () 
@@ -26,4 +33,22 @@ class ShopAdmin(admin.ModelAdmin):
 @admin.register(TaxProfile)
 class TaxProfileAdmin(admin.ModelAdmin):
     list_display = ("shop", "default_rates")
-    search_fields = ("shop__name",)
\ No newline at end of file
+    search_fields = ("shop__name",)
+    list_select_related = ("shop",)
+
+
+@admin.register(ShopActivitySummary)
+class ShopActivitySummaryAdmin(admin.ModelAdmin):
+    """Read-only: rebuilt by manage.py refresh_shop_activity."""
+    list_display = ("shop", "invoice_count", "gmv", "gmv_30d", "last_invoice_at",
+                    "subscription_status", "refreshed_at")
+    list_filter = ("subscription_status", "converted")
+    raw_id_fields = ("shop",)
+    list_select_related = ("shop",)
+    ordering = ("-gmv",)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
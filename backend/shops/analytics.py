@@ -0,0 +1,124 @@
+# backend/shops/analytics.py
+"""
+Cross-shop analytics for site admins, served from ShopActivitySummary.
+
+refresh_activity() recomputes the summaries of a batch of shops with two
+grouped queries (invoices on the (shop, invoice_date) index, and the shop
+owners' subscriptions) and ONE upsert. manage.py refresh_shop_activity runs
+it over all shops nightly, or with --changed over the shops whose invoices
+(new, edited or cancelled) or subscriptions changed since their last
+refresh. Deleted invoices leave no row behind and wait for the nightly run.
+
+Counted like the customer statistics: INVOICES that are not cancelled.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db.models import Count, Exists, Max, OuterRef, Q, Sum
+from django.utils import timezone
+
+from api.models import UserSubscription
+from sales.models import Invoice
+from .models import Shop, ShopActivitySummary
+
+ACTIVE_DAYS = 30
+CENT = Decimal("0.01")
+
+# When a shop has several owners, the best subscription wins
+_STATUS_RANK = ["none", "expired", "grace", "trial", "active", "admin_override"]
+
+_UPDATE_FIELDS = [
+    "invoice_count", "gmv", "invoices_30d", "gmv_30d", "last_invoice_at",
+    "subscription_status", "plan_type", "trial_used", "converted", "refreshed_at",
+]
+
+
+def refresh_activity(shop_ids):
+    """Recomputes the summaries of `shop_ids`; returns how many were written."""
+    shop_ids = list(shop_ids)
+    if not shop_ids:
+        return 0
+    now = timezone.now()
+    recent = Q(invoice_date__gte=now - timedelta(days=ACTIVE_DAYS))
+
+    sales = {
+        row["shop_id"]: row
+        for row in Invoice.objects.filter(shop_id__in=shop_ids, invoice_type="INVOICE")
+        .exclude(status="CANCELLED")
+        .values("shop_id")
+        .annotate(
+            count=Count("id"), gmv=Sum("grand_total"), last=Max("invoice_date"),
+            count_30d=Count("id", filter=recent), gmv_30d=Sum("grand_total", filter=recent),
+        ).order_by()
+    }
+
+    subscriptions = {}
+    for sub in (
+        UserSubscription.objects.filter(user__shop_id__in=shop_ids, user__role="SHOP_OWNER")
+        .select_related("plan", "user").only(
+            "allowed_by_admin", "active", "trial_used", "trial_end_date", "start_date",
+            "end_date", "grace_period_end", "plan__plan_type", "user__shop_id",
+        )
+    ):
+        status = sub.get_status()
+        current = subscriptions.get(sub.user.shop_id)
+        if current is None or _STATUS_RANK.index(status) > _STATUS_RANK.index(current[0]):
+            subscriptions[sub.user.shop_id] = (status, sub)
+
+    rows = []
+    for shop_id in shop_ids:
+        row = sales.get(shop_id, {})
+        status, sub = subscriptions.get(shop_id, ("none", None))
+        plan_type = sub.plan.plan_type if sub and sub.plan else ""
+        rows.append(ShopActivitySummary(
+            shop_id=shop_id,
+            invoice_count=row.get("count", 0),
+            gmv=row.get("gmv") or 0,
+            invoices_30d=row.get("count_30d", 0),
+            gmv_30d=row.get("gmv_30d") or 0,
+            last_invoice_at=row.get("last"),
+            subscription_status=status,
+            plan_type=plan_type,
+            trial_used=bool(sub and sub.trial_used),
+            converted=bool(sub and sub.trial_used and sub.start_date and plan_type not in ("", "FREE")),
+            refreshed_at=now,
+        ))
+    ShopActivitySummary.objects.bulk_create(
+        rows, update_conflicts=True, unique_fields=["shop"], update_fields=_UPDATE_FIELDS,
+    )
+    return len(rows)
+
+
+def changed_shops():
+    """Shops with no summary yet, or with invoice or subscription changes since it."""
+    refreshed = OuterRef("activity__refreshed_at")
+    return Shop.objects.filter(
+        Q(activity__isnull=True)
+        | Exists(Invoice.objects.filter(shop_id=OuterRef("pk"), updated_at__gte=refreshed))
+        | Exists(UserSubscription.objects.filter(user__shop_id=OuterRef("pk"), updated_at__gte=refreshed))
+    )
+
+
+def overview():
+    """Platform totals from the summary table — one aggregate and one grouped query."""
+    summaries = ShopActivitySummary.objects.all()
+    totals = summaries.aggregate(
+        shops=Count("pk"),
+        active_shops=Count("pk", filter=Q(invoices_30d__gt=0)),
+        invoices=Sum("invoice_count"),
+        gmv=Sum("gmv"),
+        gmv_30d=Sum("gmv_30d"),
+        trials=Count("pk", filter=Q(trial_used=True)),
+        converted=Count("pk", filter=Q(converted=True)),
+        refreshed_at=Max("refreshed_at"),
+    )
+    totals["invoices"] = totals["invoices"] or 0
+    totals["gmv"] = Decimal(totals["gmv"] or 0).quantize(CENT)
+    totals["gmv_30d"] = Decimal(totals["gmv_30d"] or 0).quantize(CENT)
+    totals["trial_conversion"] = (
+        round(totals["converted"] * 100 / totals["trials"], 2) if totals["trials"] else 0
+    )
+    totals["by_subscription"] = dict(
+        summaries.values_list("subscription_status").annotate(count=Count("pk")).order_by()
+    )
+    return totals
@@ -0,0 +1,157 @@
+# backend/shops/context.py
+"""
+Per-shop context cache.
+
+ShopContext is an immutable snapshot of what request handling needs to
+know about a shop: the shop row, its config, the tax profile and the
+features of its active plan. Entries are keyed by the shop, tax profile
+and plans versions from api.versioning, so any save makes the old entry
+unreachable — nothing is ever deleted explicitly.
+
+Lookup order: per-process LRU -> django cache (Redis in production) ->
+one DB query. Once warm, resolving the shop for a request costs one cache
+round trip for the versions and no queries.
+"""
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from types import MappingProxyType
+
+from django.conf import settings
+from django.core.cache import cache
+
+from api.versioning import VERSION_TIMEOUT, get_versions, version_key
+from .models import Shop
+
+SHOP_FIELDS = (
+    "id", "name", "address", "gstin", "contact_phone", "contact_email",
+    "language", "business_type", "whatsapp_number", "config", "currency",
+    "currency_symbol", "is_active", "subscription_end_date",
+)
+_RELATED_FIELDS = {
+    "active_subscription__plan_type": "plan_type",
+    "active_subscription__features": "plan_features",
+    "tax_profile__default_rates": "tax_rates",
+    "tax_profile__overrides": "tax_overrides",
+}
+
+
+@dataclass(frozen=True)
+class ShopContext:
+    id: int
+    name: str
+    address: str
+    gstin: str
+    contact_phone: str
+    contact_email: str
+    language: str
+    business_type: str
+    whatsapp_number: str
+    config: MappingProxyType
+    currency: str
+    currency_symbol: str
+    is_active: bool
+    subscription_end_date: object
+    plan_type: str
+    plan_features: MappingProxyType
+    tax_rates: tuple
+    tax_overrides: MappingProxyType
+
+    @property
+    def display_currency(self):
+        """Currency prefix printed on invoices and messages."""
+        return self.config.get("tax", {}).get("currency", "₹")
+
+    def has_feature(self, name):
+        return bool(self.plan_features.get(name, False))
+
+
+def _freeze(value):
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+# ========== PER-PROCESS LRU ==========
+class _LRU:
+    def __init__(self, size):
+        self.size = size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.size:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+_local = _LRU(settings.SHOP_CONTEXT_LRU_SIZE)
+
+
+# ========== LOOKUP ==========
+def _load(shop_id):
+    """One query: the shop row LEFT JOINed to its plan and tax profile, as plain data."""
+    row = (
+        Shop.objects.filter(pk=shop_id)
+        .values(*SHOP_FIELDS, *_RELATED_FIELDS)
+        .first()
+    )
+    if row is None:
+        return None
+    for source, target in _RELATED_FIELDS.items():
+        row[target] = row.pop(source)
+    row["config"] = row["config"] or {}
+    row["plan_features"] = row["plan_features"] or {}
+    row["tax_rates"] = row["tax_rates"] or []
+    row["tax_overrides"] = row["tax_overrides"] or {}
+    return row
+
+
+def get_shop_context(shop_id):
+    """Returns the ShopContext for `shop_id`, or None when there is no such shop."""
+    if not shop_id:
+        return None
+
+    versions = tuple(get_versions(
+        version_key("shop", shop_id),
+        version_key("taxprofile", shop_id),
+        version_key("plans"),
+    ))
+    local_key = (shop_id, versions)
+    context = _local.get(local_key)
+    if context is not None:
+        return context
+
+    # The shared cache holds plain data: mapping proxies do not pickle
+    cache_key = f"shop_ctx_{shop_id}_" + "_".join(map(str, versions))
+    try:
+        data = cache.get(cache_key)
+    except Exception:
+        data = None
+    if data is None:
+        data = _load(shop_id)
+        if data is None:
+            return None
+        try:
+            cache.set(cache_key, data, timeout=VERSION_TIMEOUT)
+        except Exception:
+            pass
+
+    context = ShopContext(**{key: _freeze(value) for key, value in data.items()})
+    _local.put(local_key, context)
+    return context
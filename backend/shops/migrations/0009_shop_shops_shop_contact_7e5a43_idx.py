@@ -0,0 +1,17 @@
+# Generated by Django 6.0.3 on 2026-10-19 15:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shops', '0008_shop_counter_quotation'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='shop',
+            index=models.Index(fields=['contact_phone'], name='shops_shop_contact_7e5a43_idx'),
+        ),
+    ]
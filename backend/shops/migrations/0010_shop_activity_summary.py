@@ -0,0 +1,33 @@
+# Generated by Django 6.0.3 on 2026-10-19 15:53
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shops', '0009_shop_shops_shop_contact_7e5a43_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ShopActivitySummary',
+            fields=[
+                ('shop', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='activity', serialize=False, to='shops.shop')),
+                ('invoice_count', models.PositiveIntegerField(default=0)),
+                ('gmv', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('invoices_30d', models.PositiveIntegerField(default=0)),
+                ('gmv_30d', models.DecimalField(decimal_places=2, default=0, max_digits=16)),
+                ('last_invoice_at', models.DateTimeField(blank=True, null=True)),
+                ('subscription_status', models.CharField(choices=[('trial', 'Trial'), ('active', 'Active'), ('grace', 'Grace'), ('expired', 'Expired'), ('admin_override', 'Admin override'), ('none', 'No subscription')], default='none', max_length=20)),
+                ('plan_type', models.CharField(blank=True, max_length=20)),
+                ('trial_used', models.BooleanField(default=False)),
+                ('converted', models.BooleanField(default=False)),
+                ('refreshed_at', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-gmv'], name='shops_shopa_gmv_20eece_idx'), models.Index(fields=['-gmv_30d'], name='shops_shopa_gmv_30d_546883_idx'), models.Index(fields=['-invoice_count'], name='shops_shopa_invoice_97dd98_idx'), models.Index(fields=['-last_invoice_at'], name='shops_shopa_last_in_e2e8b4_idx'), models.Index(fields=['subscription_status', '-gmv'], name='shops_shopa_subscri_0ec79b_idx')],
+            },
+        ),
+    ]
@@ -29,6 +29,11 @@ class Shop(models.Model):
     last_payment_date = models.DateField(null=True, blank=True)
     created_at = models.DateTimeField(default=timezone.now)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['contact_phone']),  # signup availability check
+        ]
+
     def __str__(self):
         return self.name
 
@@ -39,4 +44,41 @@ class TaxProfile(models.Model):
     overrides = models.JSONField(default=dict, blank=True)
 
     def __str__(self):
-        return f"TaxProfile({self.shop.name})"
\ No newline at end of file
+        return f"TaxProfile({self.shop.name})"
+
+# Cross-shop activity for the site admin dashboard, one row per shop.
+# Rebuilt by manage.py refresh_shop_activity (shops/analytics.py) — the
+# admin endpoints never scan invoices or subscriptions live.
+class ShopActivitySummary(models.Model):
+    SUBSCRIPTION_CHOICES = [
+        ('trial', 'Trial'),
+        ('active', 'Active'),
+        ('grace', 'Grace'),
+        ('expired', 'Expired'),
+        ('admin_override', 'Admin override'),
+        ('none', 'No subscription'),
+    ]
+    shop = models.OneToOneField(Shop, on_delete=models.CASCADE, primary_key=True, related_name='activity')
+    invoice_count = models.PositiveIntegerField(default=0)
+    gmv = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    invoices_30d = models.PositiveIntegerField(default=0)
+    gmv_30d = models.DecimalField(max_digits=16, decimal_places=2, default=0)
+    last_invoice_at = models.DateTimeField(null=True, blank=True)
+    subscription_status = models.CharField(max_length=20, choices=SUBSCRIPTION_CHOICES, default='none')
+    plan_type = models.CharField(max_length=20, blank=True)
+    trial_used = models.BooleanField(default=False)
+    converted = models.BooleanField(default=False)     # took a paid plan after the trial
+    refreshed_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            # Sort orders of GET /api/admin/shop-activity/
+            models.Index(fields=['-gmv']),
+            models.Index(fields=['-gmv_30d']),
+            models.Index(fields=['-invoice_count']),
+            models.Index(fields=['-last_invoice_at']),
+            models.Index(fields=['subscription_status', '-gmv']),
+        ]
+
+    def __str__(self):
+        return f"Activity({self.shop_id})"
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Shop, TaxProfile
+from .models import Shop, ShopActivitySummary, TaxProfile
 from api.models import SubscriptionPlan
 from accounts.models import User
 from django.contrib.auth.hashers import make_password
@@ -51,8 +51,24 @@ class ShopSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 # Admin Shop Serializer
+# Admin analytics — one ShopActivitySummary row
+class ShopActivitySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ShopActivitySummary
+        exclude = ("shop",)
+
+
+class AdminShopActivitySerializer(ShopActivitySerializer):
+    shop_id = serializers.IntegerField(read_only=True)
+    shop_name = serializers.CharField(source="shop.name", read_only=True)
+    contact_phone = serializers.CharField(source="shop.contact_phone", read_only=True)
+    is_active = serializers.BooleanField(source="shop.is_active", read_only=True)
+    created_at = serializers.DateTimeField(source="shop.created_at", read_only=True)
+
+
 class AdminShopSerializer(serializers.ModelSerializer):
     active_subscription = SubscriptionPlanSerializer(read_only=True)
+    activity = ShopActivitySerializer(read_only=True)
     active_subscription_id = serializers.PrimaryKeyRelatedField(
         source="active_subscription",
         queryset=SubscriptionPlan.objects.all(),
@@ -1,17 +1,23 @@
+from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.filters import OrderingFilter, SearchFilter
 from rest_framework.response import Response
 from django.contrib.auth.hashers import make_password
 
-from .models import Shop, TaxProfile
+from .models import Shop, ShopActivitySummary, TaxProfile
 from api.models import SubscriptionPlan
 from .serializers import (
-    ShopSerializer, AdminShopSerializer,
+    ShopSerializer, AdminShopSerializer, AdminShopActivitySerializer,
     SubscriptionPlanSerializer, TaxProfileSerializer,
     ShopRegistrationSerializer
 )
 from .permissions import IsSiteAdmin, IsShopOwner, IsShopkeeperOrOwner
 from accounts.models import User
+from api.conditional import ConditionalGetMixin
+from api.pagination import StandardPagination
+from api.versioning import version_key
+from .analytics import overview
 
 
 # ✅ Corrected Register Shop API View
@@ -51,16 +57,21 @@ class ShopViewSet(viewsets.ModelViewSet):
         user = self.request.user
         if user.role == "SITE_ADMIN":
             return Shop.objects.all().select_related("active_subscription")
-        if user.shop:
-            return Shop.objects.filter(pk=user.shop.id).select_related("active_subscription")
+        if user.shop_id:
+            return Shop.objects.filter(pk=user.shop_id).select_related("active_subscription")
         return Shop.objects.none()
 
 
 # Admin Shop ViewSet (No changes needed)
 class AdminShopViewSet(viewsets.ModelViewSet):
-    queryset = Shop.objects.all().select_related("active_subscription")
+    queryset = Shop.objects.all().select_related("active_subscription", "activity")
     serializer_class = AdminShopSerializer
     permission_classes = [IsSiteAdmin]
+    pagination_class = StandardPagination
+    filter_backends = [SearchFilter, OrderingFilter]
+    search_fields = ["name", "contact_phone", "contact_email"]
+    ordering_fields = ["id", "name", "created_at"]
+    ordering = ["-id"]
 
     def perform_update(self, serializer):
         shop = serializer.save()
@@ -70,6 +81,30 @@ class AdminShopViewSet(viewsets.ModelViewSet):
         return shop
 
 
+# ========== ADMIN ANALYTICS ==========
+class AdminShopActivityViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Per-shop activity from ShopActivitySummary (manage.py refresh_shop_activity).
+    ?ordering=-gmv (default), -gmv_30d, -invoice_count, -last_invoice_at
+    ?subscription_status=trial|active|grace|expired|admin_override|none
+    """
+    queryset = ShopActivitySummary.objects.select_related("shop")
+    serializer_class = AdminShopActivitySerializer
+    permission_classes = [IsSiteAdmin]
+    pagination_class = StandardPagination
+    filter_backends = [DjangoFilterBackend, OrderingFilter]
+    filterset_fields = ["subscription_status", "plan_type", "converted"]
+    ordering_fields = ["gmv", "gmv_30d", "invoice_count", "last_invoice_at"]
+    ordering = ["-gmv"]
+
+
+@api_view(["GET"])
+@permission_classes([IsSiteAdmin])
+def admin_analytics(request):
+    """Platform totals: shops, active shops (billed in 30 days), GMV, trial conversion."""
+    return Response(overview())
+
+
 # Subscription Plan ViewSet (No changes needed)
 class SubscriptionPlanViewSet(viewsets.ModelViewSet):
     queryset = SubscriptionPlan.objects.all()
@@ -78,13 +113,17 @@ class SubscriptionPlanViewSet(viewsets.ModelViewSet):
 
 
 # TaxProfile ViewSet (No changes needed)
-class TaxProfileViewSet(viewsets.ModelViewSet):
+class TaxProfileViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     queryset = TaxProfile.objects.all()
     serializer_class = TaxProfileSerializer
     permission_classes = [permissions.IsAuthenticated, IsShopkeeperOrOwner]
 
+    def get_version_keys(self, request):
+        user = request.user
+        return [version_key("user", user.pk), version_key("taxprofile", user.shop_id)]
+
     def get_queryset(self):
         user = self.request.user
-        if user.is_authenticated and user.shop:
-            return TaxProfile.objects.filter(shop=user.shop)
+        if user.is_authenticated and user.shop_id:
+            return TaxProfile.objects.filter(shop_id=user.shop_id)
         return TaxProfile.objects.none()
\ No newline at end of file
@@ -23,7 +23,9 @@ export const fetchAllInvoices = async (params = {}) => {
 };
 
 // Create invoice
-export const createInvoice = async (data) => {
+// idempotencyKey: reuse the same key when retrying one bill — the server
+// then replays the first result instead of creating a second invoice
+export const createInvoice = async (data, idempotencyKey) => {
   const payload = {
     shop: data.shop,
     customer_name: data.customer_name || "Walk-in",
@@ -41,7 +43,9 @@ export const createInvoice = async (data) => {
     grand_total: data.grand_total,
     invoice_type: data.invoice_type || "INVOICE",
   };
-  const res = await client.post("/invoices/", payload);
+  const res = await client.post("/invoices/", payload, {
+    headers: idempotencyKey ? { "Idempotency-Key": idempotencyKey } : {},
+  });
   return res.data;
 };
 
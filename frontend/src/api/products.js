@@ -38,4 +38,25 @@ export const updateProduct = async (id, product) => {
 export const deleteProduct = async (id) => {
   const res = await client.delete(`/products/${id}/`);
   return res.data;
-};
\ No newline at end of file
+};
+
+// ── Catalog sync: columnar snapshot + changes since a version ─────────────
+// Returns null when the server answers 304 (local catalog is current).
+export const fetchCatalogSnapshot = async (etag) => {
+  const res = await client.get("/products/snapshot/", {
+    headers: etag ? { "If-None-Match": etag } : {},
+    validateStatus: (s) => s === 200 || s === 304,
+  });
+  if (res.status === 304) return null;
+  return { ...res.data, etag: res.headers.etag };
+};
+
+// Returns { resync: true } when the server no longer has the deletions
+// since `since` (410) — download a new snapshot then.
+export const fetchCatalogChanges = async (since) => {
+  const res = await client.get("/products/changes/", {
+    params: { since },
+    validateStatus: (s) => s === 200 || s === 410,
+  });
+  return res.data;
+};
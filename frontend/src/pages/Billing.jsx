@@ -3,6 +3,7 @@ import React, { useState, useEffect, useRef } from "react";
 import { useSubscription } from "../context/SubscriptionContext.jsx";
 import { useLocation, useNavigate } from "react-router-dom";
 import { fetchAllProducts } from "../api/products.js";
+import { syncCatalog, searchLocalCatalog } from "../utils/catalogSync.js";
 import { createInvoice, updateInvoice, createQuotation, updateQuotation } from "../api/invoices.js";
 import { fetchAllCustomers } from "../api/customers.js";
 import toast from "react-hot-toast";
@@ -78,11 +79,18 @@ export default function Billing() {
   const { hasFeature } = useSubscription();
   const onAndroid = isAndroidWebView();
   const nameRef = useRef();
+  // One Idempotency-Key per bill: kept across retries, dropped once the bill changes or is saved
+  const idempotencyKeyRef = useRef(null);
   const searchRef = useRef();
 
   const location = useLocation();
   const navigate = useNavigate();
 
+  // A changed bill is a new request — it must not reuse the last attempt's key
+  useEffect(() => {
+    idempotencyKeyRef.current = null;
+  }, [cart, customerName, customerMobile, applyTax, applyDiscount, discountPercent, invoiceType]);
+
   // ── Handle incoming EDIT state ──
   useEffect(() => {
     if (location.state?.editMode && location.state?.invoiceId) {
@@ -140,13 +148,15 @@ export default function Billing() {
 
   const loadProducts = async () => {
     try {
-      const data = await fetchAllProducts();
+      // Local catalog brought up to date with a delta; full listing if sync fails
+      const data = await syncCatalog(currentShop.id).catch(() => fetchAllProducts());
       const normalized = data.map((p) => ({
         id: p.id,
         name: p.name,
         price: Number(p.price),
         unit: p.unit,
         tax_rate: Number(p.tax_rate || p.gst_percent || 0),
+        sku: p.sku,
         stock: Number(p.quantity),
       }));
       setProducts(normalized);
@@ -297,7 +307,9 @@ export default function Billing() {
         if (isEditMode && editInvoiceId) {
           res = await updateInvoice(editInvoiceId, payload);
         } else {
-          res = await createInvoice(payload);
+          idempotencyKeyRef.current ??= crypto.randomUUID();
+          res = await createInvoice(payload, idempotencyKeyRef.current);
+          idempotencyKeyRef.current = null;
         }
       }
       
@@ -556,9 +568,9 @@ export default function Billing() {
     nameRef.current?.focus();
   };
 
-  const filteredProducts = (products || []).filter((p) =>
-    p.name.toLowerCase().includes(search.toLowerCase())
-  );
+  const filteredProducts = search.trim()
+    ? searchLocalCatalog(products || [], search, 50)
+    : products || [];
 
   return (
     <div className="bg-slate-50 min-h-screen pb-44 font-sans text-slate-800">
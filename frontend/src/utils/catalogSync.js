@@ -0,0 +1,82 @@
+// frontend/src/utils/catalogSync.js
+// Keeps a local copy of the product catalog (localStorage — also persisted
+// inside the Android WebView) and searches it without a network round trip.
+import { fetchCatalogSnapshot, fetchCatalogChanges } from "../api/products";
+
+// One local catalog per shop: versions are per shop
+const storageKey = (shopId) => `catalog_v1_${shopId}`;
+
+const columnsToRows = (columns = {}) => {
+  const fields = Object.keys(columns);
+  const count = fields.length ? columns[fields[0]].length : 0;
+  const rows = [];
+  for (let i = 0; i < count; i++) {
+    const row = {};
+    for (const f of fields) row[f] = columns[f][i];
+    rows.push(row);
+  }
+  return rows;
+};
+
+const load = (key) => {
+  try {
+    return JSON.parse(localStorage.getItem(key)) || null;
+  } catch {
+    return null;
+  }
+};
+
+const save = (key, catalog) => {
+  try {
+    localStorage.setItem(key, JSON.stringify(catalog));
+  } catch {
+    // Quota exceeded — keep working from memory
+  }
+};
+
+/**
+ * Brings the local catalog up to date and returns its products.
+ * First run downloads a snapshot; later runs only fetch changes.
+ */
+export const syncCatalog = async (shopId) => {
+  const key = storageKey(shopId);
+  const local = load(key);
+
+  const download = async () => {
+    const snap = await fetchCatalogSnapshot();
+    const catalog = { version: snap.version, etag: snap.etag, products: columnsToRows(snap.columns) };
+    save(key, catalog);
+    return catalog.products;
+  };
+
+  if (!local) return download();
+
+  const delta = await fetchCatalogChanges(local.version);
+  if (delta.resync) return download();
+  if (delta.count || delta.removed.length) {
+    const byId = new Map(local.products.map((p) => [p.id, p]));
+    delta.removed.forEach((id) => byId.delete(id));
+    columnsToRows(delta.columns).forEach((p) => byId.set(p.id, p));
+    local.products = [...byId.values()];
+  }
+  local.version = delta.version;
+  save(key, local);
+  return local.products;
+};
+
+/** Exact SKU/barcode first, then name prefix, then substring matches. */
+export const searchLocalCatalog = (products, term, limit = 20) => {
+  const q = (term || "").trim().toLowerCase();
+  if (!q) return [];
+  const exact = products.find((p) => (p.sku || "").toLowerCase() === q);
+  if (exact) return [exact];
+
+  const prefix = [];
+  const contains = [];
+  for (const p of products) {
+    const name = p.name.toLowerCase();
+    if (name.startsWith(q)) prefix.push(p);
+    else if (name.includes(q)) contains.push(p);
+  }
+  return prefix.concat(contains).slice(0, limit);
+};